@@ -3,14 +3,40 @@ Pytest configuration and shared fixtures.
 """
 
 import pytest
+import gc
+import json
 import logging
 import sys
+import time
+import tracemalloc
 from pathlib import Path
 
 # Add src directory to Python path so we can import modules
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 
+def pytest_addoption(parser):
+    """Add command line options for the benchmark suite."""
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark-baseline",
+        default=str(Path(__file__).parent / "benchmarks" / "baseline.json"),
+        help="JSON file holding benchmark baselines",
+    )
+    group.addoption(
+        "--benchmark-compare", action="store_true",
+        help="fail benchmarks that regress against the stored baselines",
+    )
+    group.addoption(
+        "--benchmark-tolerance", type=float, default=0.5,
+        help="allowed fractional throughput regression before a benchmark fails",
+    )
+    group.addoption(
+        "--benchmark-update", action="store_true",
+        help="overwrite stored baselines with the measured results",
+    )
+
+
 def pytest_configure(config):
     """Configure pytest settings."""
     # Add custom markers
@@ -68,4 +94,119 @@ def pytest_collection_modifyitems(config, items):
     # Automatically mark tests that take longer as slow
     for item in items:
         if "large" in item.name or "benchmark" in item.name:
-            item.add_marker(pytest.mark.slow)
\ No newline at end of file
+            item.add_marker(pytest.mark.slow)
+
+
+class BenchmarkBaseline:
+    """
+    Measure benchmarks and compare them against stored baselines.
+    
+    Without --benchmark-compare or --benchmark-update, benchmarks only
+    check that the measured code runs, so timing noise never fails a
+    plain test run.
+    """
+    
+    def __init__(self, path, tolerance, compare, update):
+        self.path = Path(path)
+        self.tolerance = tolerance
+        self.compare = compare
+        self.update = update
+        self.results = {}
+        if self.path.exists():
+            self.results = json.loads(self.path.read_text())
+    
+    @staticmethod
+    def measure(func, min_time=0.02, repeat=3, memory_calls=1000):
+        """
+        Measure throughput and memory of a zero-argument callable.
+        
+        Returns:
+            Dictionary with ops_per_sec (best of repeat runs of at least
+            min_time each, with garbage collection paused as timeit does)
+            and bytes_per_op (memory still allocated per call afterwards,
+            traced by tracemalloc over up to memory_calls calls)
+        """
+        def run(number):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            return time.perf_counter() - start
+        
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            number = 1
+            while True:
+                best = run(number)
+                if best >= min_time:
+                    break
+                number *= 2
+            for _ in range(repeat - 1):
+                best = min(best, run(number))
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        
+        calls = min(number, memory_calls)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        run(calls)
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        
+        return {
+            'ops_per_sec': number / best,
+            'bytes_per_op': max(0.0, (after - before) / calls),
+        }
+    
+    def check(self, name, func, **kwargs):
+        """
+        Measure func and fail if it regressed against the stored baseline.
+        
+        With --benchmark-update the measurement is stored instead; with
+        neither that nor --benchmark-compare it is only returned.
+        """
+        result = self.measure(func, **kwargs)
+        if self.update:
+            self.results[name] = result
+            return result
+        if not self.compare:
+            return result
+        baseline = self.results.get(name)
+        if baseline is None:
+            pytest.fail(f"{name}: no stored baseline in {self.path}; "
+                        f"record one with --benchmark-update")
+        
+        minimum = baseline['ops_per_sec'] * (1 - self.tolerance)
+        assert result['ops_per_sec'] >= minimum, (
+            f"{name}: {result['ops_per_sec']:.0f} ops/sec is more than "
+            f"{self.tolerance:.0%} below the baseline of {baseline['ops_per_sec']:.0f}"
+        )
+        # Allow 1 KiB of slack so allocator noise does not cause failures
+        maximum = baseline['bytes_per_op'] * (1 + self.tolerance) + 1024
+        assert result['bytes_per_op'] <= maximum, (
+            f"{name}: {result['bytes_per_op']:.0f} bytes/op exceeds the "
+            f"baseline of {baseline['bytes_per_op']:.0f}"
+        )
+        return result
+    
+    def save(self):
+        """Write the baselines back to disk after --benchmark-update."""
+        if not self.update:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.results, indent=2, sort_keys=True))
+
+
+@pytest.fixture(scope="session")
+def benchmark_baseline(request):
+    """Provide the benchmark baseline store, saving it after the session."""
+    options = request.config.option
+    baseline = BenchmarkBaseline(
+        options.benchmark_baseline,
+        options.benchmark_tolerance,
+        options.benchmark_compare,
+        options.benchmark_update,
+    )
+    yield baseline
+    baseline.save()
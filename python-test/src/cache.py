@@ -0,0 +1,254 @@
+"""
+Bounded memoization cache for calculator results and loaded files.
+
+Entries are evicted least-recently-used first once the cache is full
+(by entry count, or by an estimated memory budget), and optionally
+expire after a fixed time-to-live.
+
+``freeze`` turns JSON-like data into read-only dict and list subclasses,
+so a cached value can be handed to many callers without any of them
+being able to change it for the others.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import sys
+import threading
+import time
+
+_MISSING = object()
+
+
+def _read_only(self: Any, *args: Any, **kwargs: Any) -> None:
+    raise TypeError(f"{type(self).__name__} is read-only; copy it before modifying")
+
+
+class FrozenDict(dict):
+    """A dict that cannot be modified; copies are ordinary dicts."""
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        raise TypeError("unhashable type: 'FrozenDict'")
+
+    def copy(self) -> dict:
+        return dict(self)
+
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> dict:
+        return thaw(self)
+
+    def __reduce__(self) -> tuple:
+        return (dict, (dict(self),))
+
+
+class FrozenList(list):
+    """A list that cannot be modified; copies are ordinary lists."""
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        raise TypeError("unhashable type: 'FrozenList'")
+
+    def copy(self) -> list:
+        return list(self)
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> list:
+        return thaw(self)
+
+    def __reduce__(self) -> tuple:
+        return (list, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """
+    Recursively convert dicts and lists to FrozenDict and FrozenList.
+
+    Frozen values still compare equal to, and pass isinstance checks as,
+    plain dicts and lists. Other values are returned unchanged.
+    """
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Recursively copy frozen (or plain) dicts and lists into mutable ones."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
+
+
+def deep_sizeof(value: Any) -> int:
+    """
+    Estimate the memory used by a value and everything it contains.
+
+    Objects reachable more than once are counted once.
+    """
+    seen = set()
+    total = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return total
+
+
+class ResultCache:
+    """
+    LRU cache with optional TTL, memory budget and hit/miss/eviction
+    statistics.
+
+    Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 1024, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 max_bytes: Optional[int] = None) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize: Maximum number of entries kept, or None for no limit
+            ttl: Seconds an entry stays valid, or None for no expiry
+            clock: Time source used for expiry
+            max_bytes: Memory budget for the sizes passed to ``put``, or
+                None for no budget
+
+        Raises:
+            ValueError: If maxsize, ttl or max_bytes is not positive
+        """
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError("Cache size must be positive")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("Cache TTL must be positive")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("Cache memory budget must be positive")
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            The cached value, or default if absent or expired
+        """
+        value = self._get(key)
+        return default if value is _MISSING else value
+
+    def _get(self, key: Hashable) -> Any:
+        """Look up key, counting the hit or miss; returns _MISSING on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires, nbytes = entry
+                if expires is None or self._clock() < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.nbytes -= nbytes
+                self.expirations += 1
+            self.misses += 1
+            return _MISSING
+
+    def put(self, key: Hashable, value: Any, nbytes: int = 0) -> None:
+        """
+        Store a value, evicting least recently used entries if full.
+
+        A value larger than the whole memory budget is not stored.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            nbytes: Memory charged against max_bytes for this value
+        """
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return
+        expires = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            self._entries[key] = (value, expires, nbytes)
+            self.nbytes += nbytes
+            while ((self.maxsize is not None and len(self._entries) > self.maxsize)
+                   or (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+                self.nbytes -= self._entries.popitem(last=False)[1][2]
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument callable producing the value
+
+        Returns:
+            Cached or freshly computed value
+        """
+        value = self._get(key)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, evictions, expirations, size and
+            bytes
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'size': len(self._entries),
+            'bytes': self.nbytes,
+        }
+
+    def clear(self) -> None:
+        """Remove all entries (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
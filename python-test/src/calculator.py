@@ -8,22 +8,128 @@ This module provides basic arithmetic operations and demonstrates:
 - Class structure
 """
 
-from typing import Union, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Union, Iterator, List, NamedTuple, Optional, Sequence, Any
+from time import perf_counter
+import functools
+import itertools
 import logging
+import math
+import numbers
+import operator
+import os
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch operations fall back to lists
+    np = None
+
+try:
+    from . import history as ops
+    from .cache import ResultCache
+    from .expression import compile_expression
+    from .instrumentation import Instrumentation, LoggingSink, get_instrumentation
+    from .journal import HistoryJournal, JournaledHistory
+except ImportError:  # running as a script or with src/ on sys.path
+    import history as ops
+    from cache import ResultCache
+    from expression import compile_expression
+    from instrumentation import Instrumentation, LoggingSink, get_instrumentation
+    from journal import HistoryJournal, JournaledHistory
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+Number = Union[int, float]
+Batch = Union[Sequence[Number], Number, Any]
+
+
+class BatchDivision(NamedTuple):
+    """Result of a batch division.
+
+    Attributes:
+        values: Quotients, with NaN wherever the divisor was zero
+        zero_mask: True for every element whose divisor was zero
+    """
+    values: Any
+    zero_mask: Any
+
+
+def _is_array(value: Any) -> bool:
+    """Return True if value is a NumPy array (and NumPy is available)."""
+    return np is not None and isinstance(value, np.ndarray)
+
+
+def _pairwise(a: Batch, b: Batch) -> tuple:
+    """
+    Normalize batch operands into two equal-length sequences.
+
+    A scalar on either side is broadcast against the other operand.
+
+    Raises:
+        ValueError: If both operands are sequences of different lengths
+    """
+    # numbers.Number also covers NumPy scalars such as np.int64
+    a_scalar = isinstance(a, numbers.Number)
+    b_scalar = isinstance(b, numbers.Number)
+    if a_scalar and b_scalar:
+        return [a], [b]
+    if a_scalar:
+        return [a] * len(b), b
+    if b_scalar:
+        return a, [b] * len(a)
+    if len(a) != len(b):
+        raise ValueError(f"Operand length mismatch: {len(a)} != {len(b)}")
+    return a, b
+
 
 class Calculator:
     """A simple calculator class with history tracking."""
     
-    def __init__(self) -> None:
-        """Initialize the calculator with empty history."""
-        self.history: List[str] = []
+    def __init__(self, history_size: Optional[int] = ops.DEFAULT_CAPACITY,
+                 instrumentation: Optional[Instrumentation] = None,
+                 cache: Optional[ResultCache] = None,
+                 thread_safe: bool = False,
+                 journal: Optional[HistoryJournal] = None) -> None:
+        """
+        Initialize the calculator with empty history.
+        
+        Args:
+            history_size: Maximum number of history entries kept (the oldest
+                are evicted first), or None for unbounded history
+            instrumentation: Metrics and tracing for operations (defaults to
+                the shared instance from ``get_instrumentation()``)
+            cache: Optional memoization cache for operation results; hits
+                are still recorded in history
+            thread_safe: Record history in per-thread shards so one
+                calculator can be shared by many threads without a
+                global lock
+            journal: Optional persistent journal; its existing records are
+                replayed into the history and every new entry is appended
+        """
+        if thread_safe:
+            self.history = ops.ShardedHistory(history_size)
+        else:
+            self.history = ops.OperationHistory(history_size)
+        if journal is not None:
+            journal.replay(self.history)
+            self.history = JournaledHistory(self.history, journal)
+        self.instrumentation = instrumentation or get_instrumentation()
+        self.cache = cache
         logger.info("Calculator initialized")
     
+    def _memoized(self, opcode: int, func: Any, a: Any, b: Any) -> Any:
+        """Compute func(a, b) through the result cache."""
+        # Types are part of the key so that e.g. 2 + 3 and 2.0 + 3 differ
+        key = (opcode, type(a), a, type(b), b)
+        try:
+            hash(key)
+        except TypeError:
+            return func(a, b)
+        return self.cache.get_or_compute(key, lambda: func(a, b))
+    
     def add(self, a: Union[int, float], b: Union[int, float]) -> Union[int, float]:
         """
         Add two numbers.
@@ -35,10 +141,14 @@ class Calculator:
         Returns:
             Sum of a and b
         """
-        result = a + b 
-        operation = f"{a} + {b} = {result}"
-        self.history.append(operation)
-        logger.info(f"Addition: {operation}")
+        start = perf_counter() if self.instrumentation.enabled else None
+        if self.cache is None:
+            result = a + b
+        else:
+            result = self._memoized(ops.ADD, operator.add, a, b)
+        self.history.record(ops.ADD, a, b, result)
+        if start is not None:
+            self.instrumentation.observe("add", start, (a, b), result)
         return result
     
     def subtract(self, a: Union[int, float], b: Union[int, float]) -> Union[int, float]:
@@ -52,10 +162,14 @@ class Calculator:
         Returns:
             Difference of a and b
         """
-        result = a - b
-        operation = f"{a} - {b} = {result}"
-        self.history.append(operation)
-        logger.info(f"Subtraction: {operation}")
+        start = perf_counter() if self.instrumentation.enabled else None
+        if self.cache is None:
+            result = a - b
+        else:
+            result = self._memoized(ops.SUBTRACT, operator.sub, a, b)
+        self.history.record(ops.SUBTRACT, a, b, result)
+        if start is not None:
+            self.instrumentation.observe("subtract", start, (a, b), result)
         return result
     
     def multiply(self, a: Union[int, float], b: Union[int, float]) -> Union[int, float]:
@@ -69,10 +183,14 @@ class Calculator:
         Returns:
             Product of a and b
         """
-        result = a * b
-        operation = f"{a} * {b} = {result}"
-        self.history.append(operation)
-        logger.info(f"Multiplication: {operation}")
+        start = perf_counter() if self.instrumentation.enabled else None
+        if self.cache is None:
+            result = a * b
+        else:
+            result = self._memoized(ops.MULTIPLY, operator.mul, a, b)
+        self.history.record(ops.MULTIPLY, a, b, result)
+        if start is not None:
+            self.instrumentation.observe("multiply", start, (a, b), result)
         return result
     
     def divide(self, a: Union[int, float], b: Union[int, float]) -> Union[int, float]:
@@ -94,37 +212,257 @@ class Calculator:
             logger.error(error_msg)
             raise ValueError(error_msg)
         
-        result = a / b
-        operation = f"{a} / {b} = {result}"
-        self.history.append(operation)
-        logger.info(f"Division: {operation}")
+        start = perf_counter() if self.instrumentation.enabled else None
+        if self.cache is None:
+            result = a / b
+        else:
+            result = self._memoized(ops.DIVIDE, operator.truediv, a, b)
+        self.history.record(ops.DIVIDE, a, b, result)
+        if start is not None:
+            self.instrumentation.observe("divide", start, (a, b), result)
         return result
     
-    def power(self, base: Union[int, float], exponent: Union[int, float]) -> Union[int, float]:
+    def power(self, base: Union[int, float], exponent: Union[int, float],
+              mod: Optional[int] = None) -> Union[int, float]:
         """
         Raise base to the power of exponent.
         
         Args:
             base: Base number
             exponent: Exponent
+            mod: Optional modulus; the result is reduced at every step of
+                the exponentiation, so the full power is never built
             
         Returns:
-            base raised to the power of exponent
+            base raised to the power of exponent (modulo mod if given)
+            
+        Raises:
+            ValueError: If mod is given with non-integer operands, is zero,
+                or the base is not invertible for a negative exponent
         """
-        result = base ** exponent
-        operation = f"{base} ** {exponent} = {result}"
-        self.history.append(operation)
-        logger.info(f"Power: {operation}")
+        if mod is not None:
+            return self._mod_power(base, exponent, mod)
+        
+        start = perf_counter() if self.instrumentation.enabled else None
+        if self.cache is None:
+            result = base ** exponent
+        else:
+            result = self._memoized(ops.POWER, operator.pow, base, exponent)
+        self.history.record(ops.POWER, base, exponent, result)
+        if start is not None:
+            self.instrumentation.observe("power", start, (base, exponent), result)
         return result
     
+    def _mod_power(self, base: int, exponent: int, mod: int) -> int:
+        """Modular exponentiation for ``power(..., mod=...)``."""
+        if not all(isinstance(value, int) for value in (base, exponent, mod)):
+            raise ValueError("Modular power requires integer operands")
+        if mod == 0:
+            raise ValueError("Modulus cannot be zero")
+        
+        start = perf_counter() if self.instrumentation.enabled else None
+        modular_pow = functools.partial(pow, base, exponent, mod)
+        if self.cache is None:
+            result = modular_pow()
+        else:
+            result = self.cache.get_or_compute((ops.MOD_POWER, base, exponent, mod), modular_pow)
+        self.history.record_mod_power(base, exponent, mod, result)
+        if start is not None:
+            self.instrumentation.observe("mod_power", start, (base, exponent, mod), result)
+        return result
+    
+    def _apply_many(self, name: str, opcode: int, func: Any, a: Batch, b: Batch) -> Any:
+        """
+        Apply a binary operation element-wise and record a single history entry.
+
+        NumPy arrays are computed in one vectorized pass and an array is
+        returned; any other input is processed with ``map`` and a list is
+        returned.
+        """
+        start = perf_counter() if self.instrumentation.enabled else None
+        if _is_array(a) or _is_array(b):
+            result = func(np.asarray(a), np.asarray(b))
+            count = result.size
+        else:
+            a, b = _pairwise(a, b)
+            result = list(map(func, a, b))
+            count = len(result)
+
+        self.history.record_batch(opcode, count)
+        if start is not None:
+            self.instrumentation.observe(name, start, (count,))
+        return result
+
+    def add_many(self, a: Batch, b: Batch) -> Any:
+        """
+        Add two batches of numbers element-wise.
+
+        Args:
+            a: First operands (sequence, NumPy array or scalar)
+            b: Second operands (sequence, NumPy array or scalar)
+
+        Returns:
+            Element-wise sums, as a NumPy array if either input was one,
+            otherwise as a list
+
+        Raises:
+            ValueError: If the operand sequences differ in length
+        """
+        return self._apply_many("add_many", ops.ADD, operator.add, a, b)
+
+    def subtract_many(self, a: Batch, b: Batch) -> Any:
+        """
+        Subtract two batches of numbers element-wise.
+
+        Args:
+            a: First operands (sequence, NumPy array or scalar)
+            b: Second operands (sequence, NumPy array or scalar)
+
+        Returns:
+            Element-wise differences (array or list, see ``add_many``)
+
+        Raises:
+            ValueError: If the operand sequences differ in length
+        """
+        return self._apply_many("subtract_many", ops.SUBTRACT, operator.sub, a, b)
+
+    def multiply_many(self, a: Batch, b: Batch) -> Any:
+        """
+        Multiply two batches of numbers element-wise.
+
+        Args:
+            a: First operands (sequence, NumPy array or scalar)
+            b: Second operands (sequence, NumPy array or scalar)
+
+        Returns:
+            Element-wise products (array or list, see ``add_many``)
+
+        Raises:
+            ValueError: If the operand sequences differ in length
+        """
+        return self._apply_many("multiply_many", ops.MULTIPLY, operator.mul, a, b)
+
+    def power_many(self, base: Batch, exponent: Batch) -> Any:
+        """
+        Raise a batch of bases to a batch of exponents element-wise.
+
+        Args:
+            base: Bases (sequence, NumPy array or scalar)
+            exponent: Exponents (sequence, NumPy array or scalar)
+
+        Returns:
+            Element-wise powers (array or list, see ``add_many``)
+
+        Raises:
+            ValueError: If the operand sequences differ in length
+        """
+        return self._apply_many("power_many", ops.POWER, operator.pow, base, exponent)
+
+    def divide_many(self, a: Batch, b: Batch) -> BatchDivision:
+        """
+        Divide two batches of numbers element-wise.
+
+        Unlike ``divide``, a zero divisor does not abort the batch: the
+        affected elements are set to NaN and flagged in the returned mask.
+
+        Args:
+            a: Dividends (sequence, NumPy array or scalar)
+            b: Divisors (sequence, NumPy array or scalar)
+
+        Returns:
+            BatchDivision with the quotients and the division-by-zero mask
+
+        Raises:
+            ValueError: If the operand sequences differ in length
+        """
+        start = perf_counter() if self.instrumentation.enabled else None
+        if _is_array(a) or _is_array(b):
+            a, b = np.broadcast_arrays(np.asarray(a), np.asarray(b))
+            zero_mask = b == 0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = np.true_divide(a, np.where(zero_mask, 1, b))
+            # np.where rather than assignment, which 0-d results do not support
+            values = np.where(zero_mask, np.nan, values)
+            count = values.size
+            zeros = int(np.count_nonzero(zero_mask))
+        else:
+            a, b = _pairwise(a, b)
+            zero_mask = [y == 0 for y in b]
+            values = [math.nan if zero else x / y
+                      for x, y, zero in zip(a, b, zero_mask)]
+            count = len(values)
+            zeros = sum(zero_mask)
+
+        self.history.record_batch(ops.DIVIDE, count)
+        if start is not None:
+            self.instrumentation.observe("divide_many", start, (count,))
+        if zeros:
+            logger.error("Batch division: %d divisions by zero", zeros)
+        return BatchDivision(values, zero_mask)
+
+    def evaluate(self, expr: str, /, **variables: Any) -> Any:
+        """
+        Evaluate an arithmetic expression.
+        
+        The expression is compiled on first use and cached, so evaluating
+        the same formula again skips parsing.
+        
+        Args:
+            expr: Expression using numbers, variables, parentheses and
+                the operators + - * / **
+            **variables: Value for every variable in the expression
+            
+        Returns:
+            Result of the expression
+            
+        Raises:
+            ValueError: If the expression is invalid, a variable is missing
+                or a division by zero occurs
+        """
+        start = perf_counter() if self.instrumentation.enabled else None
+        compiled = compile_expression(expr)
+        result = compiled.evaluate(**variables)
+        used = {name: variables[name] for name in compiled.variables}
+        self.history.record_expression(expr, used, result)
+        if start is not None:
+            self.instrumentation.observe("evaluate", start, (expr,), result)
+        return result
+    
+    def evaluate_many(self, expr: str, bindings: Optional[Any] = None, /,
+                      **columns: Any) -> Any:
+        """
+        Evaluate an arithmetic expression for many sets of variable values.
+        
+        Args:
+            expr: Expression (see ``evaluate``)
+            bindings: Iterable of variable mappings, one per evaluation
+            **columns: Alternatively, one sequence or NumPy array per
+                variable; a scalar is broadcast to every evaluation, and
+                NumPy columns are evaluated in a single vectorized pass
+            
+        Returns:
+            List of results, or a NumPy array for NumPy columns
+            
+        Raises:
+            ValueError: If the expression is invalid, a variable is missing,
+                columns differ in length or a division by zero occurs
+        """
+        start = perf_counter() if self.instrumentation.enabled else None
+        results = compile_expression(expr).evaluate_many(bindings, **columns)
+        count = len(results)
+        self.history.record_expression_batch(expr, count)
+        if start is not None:
+            self.instrumentation.observe("evaluate_many", start, (expr, count))
+        return results
+    
     def get_history(self) -> List[str]:
         """
         Get calculation history.
         
         Returns:
-            List of calculation strings
+            List of calculation strings, oldest first
         """
-        return self.history.copy()
+        return self.history.render()
     
     def clear_history(self) -> None:
         """Clear calculation history."""
@@ -132,12 +470,190 @@ class Calculator:
         logger.info("History cleared")
 
 
-def factorial(n: int) -> int:
+# Factorials below this are served from a precomputed table
+SMALL_FACTORIAL_LIMIT = 256
+
+# Ranges with at most this many odd factors are multiplied out directly
+_PRODUCT_LEAF_SIZE = 16
+
+# Below this n, factorial(parallel=True) stays in the calling process
+PARALLEL_FACTORIAL_THRESHOLD = 50_000
+
+# Multiplications whose smaller operand has fewer bits are not split
+# across the process pool
+_PARALLEL_MULTIPLY_BITS = 1 << 18
+
+
+def _build_factorial_table(limit: int) -> List[int]:
+    """Precompute 0! .. (limit - 1)!."""
+    table = [1]
+    for i in range(1, limit):
+        table.append(table[-1] * i)
+    return table
+
+
+_FACTORIAL_TABLE = _build_factorial_table(SMALL_FACTORIAL_LIMIT)
+
+
+def _odd_product(lo: int, hi: int) -> int:
+    """
+    Multiply the odd integers in [lo, hi) with a balanced product tree.
+    
+    Splitting the range in halves keeps both operands of every
+    multiplication about the same size, which is where big-integer
+    multiplication (Karatsuba) is efficient.
+    
+    Args:
+        lo: First odd factor
+        hi: Odd upper bound (exclusive)
+    """
+    count = (hi - lo) // 2
+    if count <= _PRODUCT_LEAF_SIZE:
+        result = 1
+        for i in range(lo, hi, 2):
+            result *= i
+        return result
+    mid = (lo + count) | 1
+    return _odd_product(lo, mid) * _odd_product(mid, hi)
+
+
+def _factorial_groups(n: int) -> List[tuple]:
+    """
+    Split the odd factors of n! by how many times they appear.
+    
+    The odd numbers in (n / 2**(i+1), n / 2**i] appear i + 1 times. Groups
+    are returned as odd-aligned [lo, hi) ranges, most repeated first.
+    """
+    return [(((n >> (i + 1)) + 1) | 1, ((n >> i) + 1) | 1)
+            for i in range(n.bit_length() - 2, -1, -1)]
+
+
+def _fold_groups(products: Iterator[int]) -> int:
+    """
+    Combine the group products into the odd part of n!.
+    
+    Repeatedly multiplying the running product into the result gives each
+    group its multiplicity (the binary-splitting scheme CPython also uses).
+    """
+    inner = outer = 1
+    for product in products:
+        inner *= product
+        outer *= inner
+    return outer
+
+
+def _split_multiply(pool: ProcessPoolExecutor, a: int, b: int,
+                    pieces: int) -> List[tuple]:
+    """
+    Start computing a * b on a pool as pieces partial products.
+    
+    The larger operand is cut into bit slices and every slice is
+    multiplied by the other operand in a worker. Each piece costs much
+    less than the whole product, because Karatsuba multiplication is
+    superlinear, so even a single huge multiplication keeps every worker
+    busy.
+    
+    Returns:
+        (future, shift) pairs; see ``_join_products``
+    """
+    if a.bit_length() < b.bit_length():
+        a, b = b, a
+    if pieces <= 1 or b.bit_length() < _PARALLEL_MULTIPLY_BITS:
+        return [(pool.submit(operator.mul, a, b), 0)]
+    width = -(-a.bit_length() // pieces)
+    mask = (1 << width) - 1
+    return [(pool.submit(operator.mul, (a >> shift) & mask, b), shift)
+            for shift in range(0, a.bit_length(), width)]
+
+
+def _join_products(parts: List[tuple]) -> int:
+    """Add up the shifted partial products started by ``_split_multiply``."""
+    result = 0
+    for future, shift in parts:
+        result += future.result() << shift
+    return result
+
+
+def _pool_multiply(pool: ProcessPoolExecutor, a: int, b: int, workers: int) -> int:
+    """Multiply on the pool if both operands are large, else right here."""
+    if min(a.bit_length(), b.bit_length()) < _PARALLEL_MULTIPLY_BITS:
+        return a * b
+    return _join_products(_split_multiply(pool, a, b, workers))
+
+
+def _pool_products(pool: ProcessPoolExecutor, workers: int,
+                   factor_lists: List[List[int]]) -> List[int]:
+    """
+    Multiply out several lists of factors at once on a pool.
+    
+    All lists are reduced with balanced product trees, level by level.
+    The multiplications of a level run concurrently; once a level has
+    fewer of them than there are workers, each one is split across the
+    spare workers.
+    """
+    lists = [list(factors) or [1] for factors in factor_lists]
+    while True:
+        pairs = [(i, j) for i, factors in enumerate(lists)
+                 for j in range(0, len(factors) - 1, 2)]
+        if not pairs:
+            return [factors[0] for factors in lists]
+        pieces = max(1, workers // len(pairs))
+        pending = [(i, j, _split_multiply(pool, lists[i][j], lists[i][j + 1], pieces))
+                   for i, j in pairs]
+        reduced: List[List[int]] = [[] for _ in lists]
+        for i, j, parts in pending:
+            reduced[i].append(_join_products(parts))
+        for i, factors in enumerate(lists):
+            if len(factors) % 2:
+                reduced[i].append(factors[-1])
+        lists = reduced
+
+
+def _parallel_odd_part(groups: List[tuple], max_workers: Optional[int]) -> int:
+    """
+    Compute the odd part of n! on a process pool.
+    
+    Workers compute whole group products; groups with more than their
+    share of the odd factors are cut into chunks first, and the chunks
+    are multiplied together on the pool as well. The group products are
+    then folded as in ``_fold_groups``, with the large multiplications
+    of the fold split across the workers.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    total = sum((hi - lo) // 2 for lo, hi in groups)
+    step = 2 * max(_PRODUCT_LEAF_SIZE, total // workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = []
+        for lo, hi in groups:
+            bounds = list(range(lo, hi, step)) + [hi]
+            chunks.append([pool.submit(_odd_product, a, b)
+                           for a, b in zip(bounds, bounds[1:])])
+        products = _pool_products(
+            pool, workers, [[future.result() for future in futures] for futures in chunks]
+        )
+        
+        inner = outer = 1
+        for product in products:
+            inner = _pool_multiply(pool, inner, product, workers)
+            outer = _pool_multiply(pool, outer, inner, workers)
+        return outer
+
+
+def factorial(n: int, parallel: bool = False, max_workers: Optional[int] = None) -> int:
     """
     Calculate factorial of a number.
     
+    Small values come from a precomputed table; larger ones use binary
+    splitting over the odd factors, with the power of two applied as a
+    single shift.
+    
     Args:
         n: Non-negative integer
+        parallel: Compute the product tree on a process pool, splitting
+            its largest multiplications across the workers; ignored below
+            PARALLEL_FACTORIAL_THRESHOLD, where pool start-up would cost
+            more than it saves
+        max_workers: Number of worker processes (defaults to the CPU count)
         
     Returns:
         Factorial of n
@@ -148,14 +664,226 @@ def factorial(n: int) -> int:
     if n < 0:
         raise ValueError("Factorial is not defined for negative numbers")
     
-    if n == 0 or n == 1:
-        return 1
+    instrumentation = get_instrumentation()
+    start = perf_counter() if instrumentation.enabled else None
+    
+    if n < SMALL_FACTORIAL_LIMIT:
+        result = _FACTORIAL_TABLE[n]
+    else:
+        groups = _factorial_groups(n)
+        if parallel and n >= PARALLEL_FACTORIAL_THRESHOLD:
+            odd_part = _parallel_odd_part(groups, max_workers)
+        else:
+            odd_part = _fold_groups(_odd_product(lo, hi) for lo, hi in groups)
+        # n! contains n - popcount(n) factors of two (Legendre's formula)
+        result = odd_part << (n - bin(n).count("1"))
+    
+    if start is not None:
+        instrumentation.observe("factorial", start, (n,), result)
+    return result
+
+
+# Miller-Rabin with these witnesses is exact for every n < 3.3 * 10**24
+_PRIME_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def _is_prime(n: int) -> bool:
+    """Deterministic Miller-Rabin primality test for word-sized moduli."""
+    if n < 2:
+        return False
+    for q in _PRIME_WITNESSES:
+        if n % q == 0:
+            return n == q
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _PRIME_WITNESSES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def factorial_mod(n: int, p: int) -> int:
+    """
+    Calculate n! modulo a prime without building n!.
+    
+    For n >= p the result is 0. Otherwise Wilson's theorem,
+    (p - 1)! = -1 (mod p), lets the product run over whichever of
+    2..n or n+1..p-1 is shorter, so the cost is O(min(n, p - n))
+    multiplications of word-sized numbers.
+    
+    Args:
+        n: Non-negative integer
+        p: Prime modulus
+        
+    Returns:
+        n! mod p
+        
+    Raises:
+        ValueError: If n is negative or p is not a prime
+    """
+    if n < 0:
+        raise ValueError("Factorial is not defined for negative numbers")
+    # Wilson's theorem only holds for a prime modulus
+    if not _is_prime(p):
+        raise ValueError("Modulus must be a prime")
+    
+    instrumentation = get_instrumentation()
+    start = perf_counter() if instrumentation.enabled else None
+    
+    if n >= p:
+        result = 0
+    elif n < p - 1 - n:
+        result = 1
+        for i in range(2, n + 1):
+            result = result * i % p
+    else:
+        # n! * (n+1) * ... * (p-1) = -1, so n! = -1 / ((n+1) * ... * (p-1))
+        tail = 1
+        for i in range(n + 1, p):
+            tail = tail * i % p
+        result = -pow(tail, -1, p) % p
+    
+    if start is not None:
+        instrumentation.observe("factorial_mod", start, (n, p), result)
+    return result
+
+
+# Terms below this index are kept in a shared, lazily extended prefix
+FIBONACCI_CACHE_LIMIT = 1000
+
+_FIBONACCI_CACHE: List[int] = [0, 1]
+_FIBONACCI_CACHE_LOCK = threading.Lock()
+
+
+def _fibonacci_prefix(n: int) -> List[int]:
+    """
+    Return the shared cached prefix, extended to at least n terms.
+    
+    The returned list is shared; callers must copy before handing it out.
+    """
+    cache = _FIBONACCI_CACHE
+    if len(cache) < n:
+        with _FIBONACCI_CACHE_LOCK:
+            while len(cache) < n:
+                cache.append(cache[-1] + cache[-2])
+    return cache
+
+
+def iter_fibonacci(n: Optional[int] = None) -> Iterator[int]:
+    """
+    Lazily yield Fibonacci numbers in constant memory.
+    
+    Args:
+        n: Number of terms to yield, or None for an endless sequence
+        
+    Returns:
+        Iterator over F(0), F(1), ...
+        
+    Raises:
+        ValueError: If n is negative
+    """
+    if n is not None and n < 0:
+        raise ValueError("Number of terms cannot be negative")
+    
+    def terms() -> Iterator[int]:
+        a, b = 0, 1
+        while True:
+            yield a
+            a, b = b, a + b
+    
+    return terms() if n is None else itertools.islice(terms(), n)
+
+
+def _fibonacci_doubling(n: int, mod: Optional[int] = None) -> tuple:
+    """Return (F(n), F(n + 1)), optionally reduced mod, using fast doubling."""
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        # F(2k) = F(k) * (2F(k+1) - F(k)), F(2k+1) = F(k)^2 + F(k+1)^2
+        c = a * (2 * b - a)
+        d = a * a + b * b
+        if mod is not None:
+            c %= mod
+            d %= mod
+        if bit == "1":
+            a, b = d, c + d
+        else:
+            a, b = c, d
+        if mod is not None:
+            b %= mod
+    return a, b
+
+
+def fibonacci_nth(n: int) -> int:
+    """
+    Calculate the n-th Fibonacci number, with F(0) = 0 and F(1) = 1.
+    
+    Small indices are answered from the shared cached prefix; larger ones
+    use fast doubling, which needs O(log n) big-integer multiplications.
+    
+    Args:
+        n: Non-negative index
+        
+    Returns:
+        F(n)
+        
+    Raises:
+        ValueError: If n is negative
+    """
+    if n < 0:
+        raise ValueError("Fibonacci index cannot be negative")
+    
+    instrumentation = get_instrumentation()
+    start = perf_counter() if instrumentation.enabled else None
+    
+    if n < FIBONACCI_CACHE_LIMIT:
+        result = _fibonacci_prefix(n + 1)[n]
+    else:
+        result = _fibonacci_doubling(n)[0]
+    
+    if start is not None:
+        instrumentation.observe("fibonacci_nth", start, (n,))
+    return result
+
+
+def fibonacci_mod(n: int, m: int) -> int:
+    """
+    Calculate F(n) modulo m without building F(n).
+    
+    Fast doubling with every intermediate reduced mod m takes O(log n)
+    word-sized multiplications, so indices in the billions (or far
+    beyond) take microseconds.
+    
+    Args:
+        n: Non-negative index
+        m: Positive modulus
+        
+    Returns:
+        F(n) mod m
+        
+    Raises:
+        ValueError: If n is negative or m is not positive
+    """
+    if n < 0:
+        raise ValueError("Fibonacci index cannot be negative")
+    if m <= 0:
+        raise ValueError("Modulus must be positive")
+    
+    instrumentation = get_instrumentation()
+    start = perf_counter() if instrumentation.enabled else None
     
-    result = 1
-    for i in range(2, n + 1):
-        result *= i
+    result = _fibonacci_doubling(n, m)[0] % m
     
-    logger.info(f"Factorial: {n}! = {result}")
+    if start is not None:
+        instrumentation.observe("fibonacci_mod", start, (n, m), result)
     return result
 
 
@@ -175,23 +903,24 @@ def fibonacci(n: int) -> List[int]:
     if n < 0:
         raise ValueError("Number of terms cannot be negative")
     
-    if n == 0:
-        return []
-    elif n == 1:
-        return [0]
-    elif n == 2:
-        return [0, 1]
+    instrumentation = get_instrumentation()
+    start = perf_counter() if instrumentation.enabled else None
     
-    sequence = [0, 1]
-    for i in range(2, n):
-        sequence.append(sequence[i-1] + sequence[i-2])
+    if n <= FIBONACCI_CACHE_LIMIT:
+        sequence = _fibonacci_prefix(n)[:n]
+    else:
+        sequence = list(iter_fibonacci(n))
     
-    logger.info(f"Generated Fibonacci sequence with {n} terms")
+    if start is not None:
+        instrumentation.observe("fibonacci", start, (n,), sequence)
     return sequence
 
 
 if __name__ == "__main__":
-    # Demo the calculator
+    # Demo the calculator, logging every operation
+    get_instrumentation().enable()
+    get_instrumentation().set_sample_rate(1.0)
+    get_instrumentation().subscribe(LoggingSink())
     calc = Calculator()
     
     print("=== Calculator Demo ===")
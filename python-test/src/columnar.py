@@ -0,0 +1,435 @@
+"""
+Typed columnar storage for tabular data.
+
+A ``ColumnTable`` keeps every column as one compact typed array instead
+of one dictionary per row: ints, floats and bools use ``array.array``
+(or NumPy arrays), dates are stored as day ordinals, and only string
+columns remain Python lists.
+
+Tables can be saved in a binary columnar file and loaded back through
+mmap without parsing or copying. Layout (every block starts at a
+multiple of ALIGNMENT bytes)::
+
+    b"COLTAB01" | schema length (u32) | reserved (u32) | schema (UTF-8 JSON)
+    column blocks: raw typed values; str columns are an i64 offsets
+    block (rows + 1) followed by a UTF-8 data block
+
+The schema records the row count, byte order and every column's name,
+type and block positions.
+"""
+
+from array import array
+from collections.abc import Sequence
+from datetime import date
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+import json
+import math
+import mmap
+import struct
+import sys
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; columns fall back to array.array
+    np = None
+
+# Column type -> array.array typecode (str columns are plain lists)
+TYPECODES = {
+    'int': 'q',
+    'float': 'd',
+    'bool': 'b',
+    'date': 'i',
+}
+
+COLUMN_TYPES = ('bool', 'int', 'float', 'date', 'str')
+
+_NUMPY_DTYPES = {
+    'int': 'int64',
+    'float': 'float64',
+    'bool': 'bool',
+}
+
+# date.toordinal() of the Unix epoch, used for datetime64[D] views
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+MAGIC = b"COLTAB01"
+_FILE_HEADER = struct.Struct("<8sII")
+
+# Block alignment in bytes (a cache line, and a multiple of every item size)
+ALIGNMENT = 64
+
+
+def _parse_bool(value: str) -> bool:
+    lowered = value.strip().lower()
+    if lowered in ('true', '1', 'yes'):
+        return True
+    if lowered in ('false', '0', 'no'):
+        return False
+    raise ValueError(f"Invalid boolean: {value!r}")
+
+
+def _parse_float(value: Optional[str]) -> float:
+    # csv.DictReader fills the cells missing from a short row with None
+    return float(value) if value is not None and value.strip() else math.nan
+
+
+def _parse_str(value: Optional[str]) -> str:
+    return value if value is not None else ''
+
+
+def _parse_date(value: str) -> int:
+    return date.fromisoformat(value.strip()).toordinal()
+
+
+PARSERS = {
+    'int': int,
+    'float': _parse_float,
+    'bool': _parse_bool,
+    'date': _parse_date,
+    'str': _parse_str,
+}
+
+
+def _matches(column_type: str, value: str) -> bool:
+    """Return True if value can be stored in a column of column_type."""
+    if column_type == 'str':
+        return True
+    if column_type == 'bool' and value.strip() in ('0', '1'):
+        # Keep 0/1 columns numeric rather than boolean
+        return False
+    try:
+        PARSERS[column_type](value)
+    except ValueError:
+        return False
+    return True
+
+
+def infer_schema(rows: Iterable[Dict[str, str]]) -> Dict[str, str]:
+    """
+    Infer the narrowest type of every column from string rows.
+
+    Each column starts as a candidate for every type and drops the ones
+    its values cannot be parsed as. Empty cells are allowed in float
+    columns (as NaN), so a numeric column with gaps becomes float.
+
+    Args:
+        rows: Iterable of row dictionaries with string values
+
+    Returns:
+        Mapping of column name to one of COLUMN_TYPES
+    """
+    candidates: Dict[str, List[str]] = {}
+    for row in rows:
+        for name, value in row.items():
+            remaining = candidates.setdefault(name, list(COLUMN_TYPES))
+            if len(remaining) == 1:
+                continue
+            if value is None or not value.strip():
+                remaining[:] = [t for t in remaining if t in ('float', 'str')]
+            else:
+                remaining[:] = [t for t in remaining if _matches(t, value)]
+    return {name: remaining[0] for name, remaining in candidates.items()}
+
+
+class ColumnTable:
+    """A table stored as one typed column per field."""
+
+    def __init__(self, schema: Dict[str, str], columns: Dict[str, Any]) -> None:
+        """
+        Initialize a table from existing columns.
+
+        Args:
+            schema: Column name -> type (one of COLUMN_TYPES)
+            columns: Column name -> typed array, NumPy array or list
+
+        Raises:
+            ValueError: If columns differ in length
+        """
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Column length mismatch: {sorted(lengths)}")
+        self.schema = dict(schema)
+        self.columns = columns
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]], schema: Dict[str, str],
+                  use_numpy: Optional[bool] = None) -> "ColumnTable":
+        """
+        Build a table by parsing string rows into typed columns.
+
+        Args:
+            rows: Iterable of row dictionaries with string values
+            schema: Column name -> type (one of COLUMN_TYPES)
+            use_numpy: Convert columns to NumPy arrays; None means "if
+                NumPy is installed"
+
+        Returns:
+            New ColumnTable
+
+        Raises:
+            ValueError: If a type is unknown or a value does not parse
+        """
+        for name, column_type in schema.items():
+            if column_type not in PARSERS:
+                raise ValueError(f"Unknown column type for {name!r}: {column_type!r}")
+
+        columns = {name: array(TYPECODES[t]) if t in TYPECODES else []
+                   for name, t in schema.items()}
+        appenders = [(name, columns[name].append, PARSERS[t]) for name, t in schema.items()]
+        for line, row in enumerate(rows, start=1):
+            for name, append, parse in appenders:
+                try:
+                    append(parse(row[name]))
+                except (ValueError, TypeError, KeyError) as e:
+                    raise ValueError(f"Row {line}, column {name!r}: {e}") from e
+
+        table = cls(schema, columns)
+        if use_numpy or (use_numpy is None and np is not None):
+            table = table.to_numpy()
+        return table
+
+    def __len__(self) -> int:
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def __getitem__(self, name: str) -> Any:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    @property
+    def column_names(self) -> List[str]:
+        """Column names in schema order."""
+        return list(self.schema)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the column data."""
+        total = 0
+        for column in self.columns.values():
+            if hasattr(column, 'nbytes'):
+                total += column.nbytes
+            elif isinstance(column, array):
+                total += column.itemsize * len(column)
+            else:
+                total += sum(len(value) for value in column)
+        return total
+
+    def to_numpy(self) -> "ColumnTable":
+        """
+        Get a table whose typed columns are NumPy arrays.
+
+        Numeric columns are wrapped without copying; dates become
+        ``datetime64[D]`` arrays.
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        if np is None:
+            raise ImportError("NumPy is required for to_numpy()")
+        columns = {}
+        for name, column_type in self.schema.items():
+            column = self.columns[name]
+            if isinstance(column, (array, memoryview)):
+                if column_type == 'date':
+                    days = np.frombuffer(column, dtype='int32').astype('int64') - _EPOCH_ORDINAL
+                    column = days.astype('datetime64[D]')
+                else:
+                    column = np.frombuffer(column, dtype=_NUMPY_DTYPES[column_type])
+            columns[name] = column
+        return ColumnTable(self.schema, columns)
+
+    def _value(self, column_type: str, value: Any) -> Any:
+        """Convert a stored value back to its Python representation."""
+        if column_type == 'date':
+            if np is not None and isinstance(value, np.datetime64):
+                return value.astype(date)
+            return date.fromordinal(value)
+        if column_type == 'bool':
+            return bool(value)
+        if np is not None and isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        """Yield rows as dictionaries of Python values."""
+        names = self.column_names
+        types = [self.schema[name] for name in names]
+        for values in zip(*(self.columns[name] for name in names)):
+            yield {name: self._value(t, value) for name, t, value in zip(names, types, values)}
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Get all rows as a list of dictionaries of Python values."""
+        return list(self.iter_rows())
+
+
+class StringColumn(Sequence):
+    """Read-only str column decoded on access from UTF-8 buffers."""
+
+    def __init__(self, offsets: memoryview, data: memoryview) -> None:
+        """
+        Initialize a column over existing buffers.
+
+        Args:
+            offsets: rows + 1 int64 offsets into data
+            data: Concatenated UTF-8 encoded values
+        """
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("column index out of range")
+        return str(self._data[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the offsets and data buffers."""
+        return self._offsets.nbytes + self._data.nbytes
+
+
+def _padding(offset: int) -> int:
+    return -offset % ALIGNMENT
+
+
+def _column_buffer(column_type: str, column: Any) -> Any:
+    """Get the raw values of a typed column as a buffer in its file typecode."""
+    typecode = TYPECODES[column_type]
+    if np is not None and isinstance(column, np.ndarray):
+        if column_type == 'date' and column.dtype.kind == 'M':
+            days = column.astype('datetime64[D]').astype('int64') + _EPOCH_ORDINAL
+            return days.astype('int32')
+        return np.ascontiguousarray(column, dtype=np.dtype(typecode))
+    if isinstance(column, memoryview) and column.format == typecode:
+        return column
+    if isinstance(column, array) and column.typecode == typecode:
+        return column
+    return array(typecode, column)
+
+
+def write_columnar(table: ColumnTable, f: BinaryIO) -> int:
+    """
+    Write a table in the binary columnar format.
+
+    Args:
+        table: Table to write
+        f: Binary file object positioned at the start of the file
+
+    Returns:
+        Number of bytes written
+    """
+    blocks = []
+    columns = []
+    for name, column_type in table.schema.items():
+        column = table.columns[name]
+        if column_type == 'str':
+            encoded = [value.encode('utf-8') for value in column]
+            offsets = array('q', [0])
+            total = 0
+            for value in encoded:
+                total += len(value)
+                offsets.append(total)
+            blocks.append((name, 'offsets', offsets))
+            blocks.append((name, 'data', b''.join(encoded)))
+        else:
+            blocks.append((name, 'values', _column_buffer(column_type, column)))
+        columns.append({'name': name, 'type': column_type})
+
+    # Lay out the blocks after the schema; the schema size depends on the
+    # offsets it contains, so grow the reserved space until it fits
+    reserved = ALIGNMENT
+    while True:
+        position = _FILE_HEADER.size + reserved
+        entries = {entry['name']: entry for entry in columns}
+        for name, role, buffer in blocks:
+            position += _padding(position)
+            length = memoryview(buffer).nbytes
+            entries[name][role] = [position, length]
+            position += length
+        schema = json.dumps({
+            'rows': len(table),
+            'byteorder': sys.byteorder,
+            'columns': columns,
+        }).encode('utf-8')
+        if len(schema) <= reserved:
+            break
+        reserved = len(schema) + _padding(_FILE_HEADER.size + len(schema))
+
+    f.write(_FILE_HEADER.pack(MAGIC, len(schema), 0))
+    f.write(schema.ljust(reserved, b' '))
+    written = _FILE_HEADER.size + reserved
+    for name, role, buffer in blocks:
+        f.write(bytes(_padding(written)))
+        written += _padding(written)
+        view = memoryview(buffer)
+        f.write(view)
+        written += view.nbytes
+    return written
+
+
+def read_columnar(path: str, use_numpy: Optional[bool] = None) -> ColumnTable:
+    """
+    Memory-map a binary columnar file as a table, without copying.
+
+    Numeric and bool columns are memoryviews (or NumPy arrays) over the
+    mapping, and dates are int32 day ordinals. With NumPy, dates are
+    converted to ``datetime64[D]``, which copies them. String columns
+    decode values on access. Pages are only read from disk when a column
+    is used, so opening even a very large file is nearly instant. The
+    mapping stays open as long as any column is referenced.
+
+    Args:
+        path: File written by ``write_columnar``
+        use_numpy: Return NumPy arrays; None means "if NumPy is installed"
+
+    Returns:
+        Read-only ColumnTable
+
+    Raises:
+        ValueError: If the file is not a valid columnar file
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        magic, schema_length, _ = _FILE_HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a columnar file: {path}")
+        start = _FILE_HEADER.size
+        schema = json.loads(mapped[start:start + schema_length])
+        if schema['byteorder'] != sys.byteorder:
+            raise ValueError(f"Columnar file has {schema['byteorder']}-endian data")
+    except (struct.error, KeyError, ValueError) as e:
+        mapped.close()
+        raise ValueError(f"Invalid columnar file {path}: {e}") from e
+
+    view = memoryview(mapped)
+    types = {}
+    columns = {}
+    for entry in schema['columns']:
+        name, column_type = entry['name'], entry['type']
+        types[name] = column_type
+        if column_type == 'str':
+            (offset, length), (data_offset, data_length) = entry['offsets'], entry['data']
+            columns[name] = StringColumn(view[offset:offset + length].cast('q'),
+                                         view[data_offset:data_offset + data_length])
+        elif column_type in TYPECODES:
+            offset, length = entry['values']
+            columns[name] = view[offset:offset + length].cast(TYPECODES[column_type])
+        else:
+            raise ValueError(f"Unknown column type for {name!r}: {column_type!r}")
+
+    table = ColumnTable(types, columns)
+    if len(table) != schema['rows']:
+        raise ValueError(f"Invalid columnar file {path}: row count mismatch")
+    if use_numpy or (use_numpy is None and np is not None):
+        table = table.to_numpy()
+    return table
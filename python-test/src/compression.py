@@ -0,0 +1,118 @@
+"""
+Transparent gzip, bz2 and lzma file compression.
+
+``open_file`` is a drop-in replacement for ``open`` for reading and
+writing. When reading, compression is detected from the file's magic
+bytes, so a compressed file is read correctly whatever its name. When
+writing, the codec is taken from the ``compression`` argument or else
+from the file extension. The returned objects are ordinary streaming
+file objects, so data is compressed and decompressed incrementally.
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, NamedTuple, Optional, Union
+import bz2
+import gzip
+import lzma
+
+
+class Codec(NamedTuple):
+    """A supported compression format.
+
+    Attributes:
+        extension: File name suffix, including the dot
+        magic: Bytes every compressed file starts with
+        opener: Function opening a compressed file, like gzip.open
+        level_arg: Name of the opener's compression level argument
+    """
+    extension: str
+    magic: bytes
+    opener: Callable[..., Any]
+    level_arg: str
+
+
+CODECS: Dict[str, Codec] = {
+    'gzip': Codec('.gz', b'\x1f\x8b', gzip.open, 'compresslevel'),
+    'bz2': Codec('.bz2', b'BZh', bz2.open, 'compresslevel'),
+    'lzma': Codec('.xz', b'\xfd7zXZ\x00', lzma.open, 'preset'),
+}
+
+_MAGIC_LENGTH = max(len(codec.magic) for codec in CODECS.values())
+
+
+def check_codec(compression: Optional[str]) -> None:
+    """
+    Validate a codec name.
+
+    Raises:
+        ValueError: If compression is not None or a key of CODECS
+    """
+    if compression is not None and compression not in CODECS:
+        raise ValueError(f"Unknown compression {compression!r}; "
+                         f"expected one of {', '.join(CODECS)}")
+
+
+def codec_from_extension(path: Union[str, Path]) -> Optional[str]:
+    """Return the codec implied by a file name, or None."""
+    suffix = Path(path).suffix
+    for name, codec in CODECS.items():
+        if codec.extension == suffix:
+            return name
+    return None
+
+
+def detect(path: Union[str, Path]) -> Optional[str]:
+    """
+    Detect the compression of a file from its magic bytes.
+
+    Returns:
+        Codec name, or None for an uncompressed file
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with open(path, 'rb') as f:
+        head = f.read(_MAGIC_LENGTH)
+    for name, codec in CODECS.items():
+        if head.startswith(codec.magic):
+            return name
+    return None
+
+
+def open_file(path: Union[str, Path], mode: str = 'r', compression: Optional[str] = None,
+              level: Optional[int] = None, **kwargs: Any) -> Any:
+    """
+    Open a file, compressing or decompressing it transparently.
+
+    Args:
+        path: File path
+        mode: Mode as for open(); text modes ('r', 'w', 'x') read and
+            write text, binary modes ('rb', 'wb', 'xb') bytes
+        compression: Codec for writing (see CODECS); None picks it from
+            the file extension. Ignored when reading, where the magic
+            bytes decide.
+        level: Compression level (1-9; 0-9 for lzma), or None for the
+            codec default
+        **kwargs: Extra text-mode arguments for open() (encoding,
+            newline, ...)
+
+    Returns:
+        File object
+
+    Raises:
+        ValueError: If compression is unknown
+    """
+    check_codec(compression)
+    if 'r' in mode:
+        compression = detect(path)
+    elif compression is None:
+        compression = codec_from_extension(path)
+    if compression is None:
+        return open(path, mode, **kwargs)
+
+    codec = CODECS[compression]
+    if 'b' not in mode and 't' not in mode:
+        mode += 't'
+    if level is not None and 'r' not in mode:
+        kwargs[codec.level_arg] = level
+    return codec.opener(path, mode, **kwargs)
@@ -0,0 +1,281 @@
+"""
+Row-offset index for random access into CSV files.
+
+``RowIndex.build`` scans a memory-mapped CSV file once and records the
+byte offset at which every data row starts. With the index, any range
+of rows can be read by seeking straight to it and parsing only those
+rows. Newlines inside quoted fields are not row boundaries, quotes
+inside unquoted fields are plain characters, and empty lines are not
+rows, matching ``csv.DictReader``.
+
+The index is stored as a sidecar file::
+
+    header: b"CSVIDX03" | csv size (u64) | csv mtime ns (u64) | csv inode (u64) | rows (u64)
+    body:   rows + 1 offsets (i64); the last one is the end of the data
+
+The size, modification time and inode of the CSV file are recorded, so
+an index is recognized as stale once the file changes.
+"""
+
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+import csv
+import io
+import mmap
+import os
+import re
+import struct
+import sys
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the scan falls back to re
+    np = None
+
+# Version 03 ignores quotes inside unquoted fields; older indexes are rebuilt
+MAGIC = b"CSVIDX03"
+_HEADER = struct.Struct("<8sQQQQ")
+
+# Bytes scanned at a time
+_BLOCK_SIZE = 16 * 1024 * 1024
+
+_DELIMITERS = re.compile(rb'[\n",]')
+
+# Scanner states carried from one block to the next
+_FIELD_START, _IN_FIELD, _IN_QUOTES, _QUOTE_IN_QUOTES = range(4)
+
+Stamp = Tuple[int, int, int]
+
+
+def file_stamp(path: str) -> Stamp:
+    """Return the (size, mtime_ns, inode) of a file."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+def _scan_block(block: Any, base: int, state: int, offsets: array) -> int:
+    """
+    Append base + i + 1 for every row-ending newline at block[i].
+
+    Quotes follow the csv module: a quote opens a quoted field only at
+    the start of a field, ``""`` inside one is an escaped quote, and any
+    other quote is an ordinary character.
+
+    Args:
+        block: Bytes-like block of the file
+        base: File offset of the block
+        state: Scanner state at the start of the block
+        offsets: Array receiving the offsets
+
+    Returns:
+        Scanner state at the end of the block
+    """
+    if np is not None and state != _QUOTE_IN_QUOTES:
+        scanned = _scan_block_numpy(block, base, state, offsets)
+        if scanned is not None:
+            return scanned
+
+    last = -1
+    for match in _DELIMITERS.finditer(block):
+        position = match.start()
+        if position > last + 1 and state in (_FIELD_START, _QUOTE_IN_QUOTES):
+            state = _IN_FIELD
+        last = position
+        char = match.group()
+        if char == b'"':
+            if state == _FIELD_START or state == _QUOTE_IN_QUOTES:
+                state = _IN_QUOTES
+            elif state == _IN_QUOTES:
+                state = _QUOTE_IN_QUOTES
+        elif state != _IN_QUOTES:
+            if char == b'\n':
+                offsets.append(base + position + 1)
+            state = _FIELD_START
+    if len(block) > last + 1 and state in (_FIELD_START, _QUOTE_IN_QUOTES):
+        state = _IN_FIELD
+    return state
+
+
+def _scan_block_numpy(block: Any, base: int, state: int, offsets: array) -> Optional[int]:
+    """
+    Vectorized ``_scan_block`` for blocks whose quotes are well formed.
+
+    Counting quote parity is exact when every opening quote starts a
+    field and every closing quote ends one (or is the first half of an
+    escaped ``""``). Returns None without touching offsets for any other
+    block, which is then scanned byte by byte.
+    """
+    data = np.frombuffer(block, dtype=np.uint8)
+    if not len(data):
+        return state
+    newlines = np.flatnonzero(data == 10)
+    quotes = np.flatnonzero(data == 34)
+    quoted = int(state == _IN_QUOTES)
+    if len(quotes):
+        is_opening = (np.arange(len(quotes)) + quoted) % 2 == 0
+        opening, closing = quotes[is_opening], quotes[~is_opening]
+        if len(opening) and opening[0] == 0:
+            if state != _FIELD_START:
+                return None
+            opening = opening[1:]
+        # An opening quote follows a delimiter, a newline or a closing quote
+        if not np.isin(data[opening - 1], (44, 10, 34)).all():
+            return None
+        # A closing quote precedes one of those or a carriage return; one
+        # at the end of the block depends on the next block
+        if len(closing) and closing[-1] == len(data) - 1:
+            return None
+        if not np.isin(data[closing + 1], (44, 10, 13, 34)).all():
+            return None
+    if len(quotes) or quoted:
+        # A newline ends a row if an even number of quotes precede it
+        parity = (np.searchsorted(quotes, newlines) + quoted) % 2
+        newlines = newlines[parity == 0]
+    offsets.extend((newlines + (base + 1)).tolist())
+    if (quoted + len(quotes)) % 2:
+        return _IN_QUOTES
+    return _FIELD_START if data[-1] in (44, 10) else _IN_FIELD
+
+
+def _drop_empty_rows(data: Any, starts: array) -> array:
+    """
+    Remove the start offsets of empty lines, which csv readers skip.
+
+    Args:
+        data: Bytes-like contents of the whole file
+        starts: Row start offsets in ascending order
+
+    Returns:
+        The offsets of rows that are not empty lines
+    """
+    size = len(data)
+    if np is not None:
+        contents = np.frombuffer(data, dtype=np.uint8)
+        positions = np.frombuffer(starts, dtype=np.int64)
+        inside = positions[positions < size]
+        empty = contents[inside] == 10
+        crlf = np.flatnonzero((contents[inside] == 13) & (inside + 1 < size))
+        empty[crlf] = contents[inside[crlf] + 1] == 10
+        kept = array('q')
+        kept.frombytes(np.concatenate([inside[~empty], positions[len(inside):]]).tobytes())
+        return kept
+    return array('q', (start for start in starts
+                       if data[start:start + 1] != b"\n" and data[start:start + 2] != b"\r\n"))
+
+
+class RowIndex:
+    """Byte offsets of the data rows of a CSV file."""
+
+    def __init__(self, offsets: array, stamp: Stamp) -> None:
+        """
+        Initialize an index.
+
+        Args:
+            offsets: Start offset of every data row, followed by the end
+                offset of the data
+            stamp: (size, mtime_ns, inode) of the indexed file
+        """
+        self.offsets = offsets
+        self.stamp = stamp
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @classmethod
+    def build(cls, path: str) -> "RowIndex":
+        """
+        Index a CSV file with a header row by scanning it through mmap.
+
+        Args:
+            path: CSV file path
+
+        Returns:
+            New RowIndex
+        """
+        stamp = file_stamp(path)
+        size = stamp[0]
+        ends = array('q')
+        if size:
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    state = _FIELD_START
+                    for base in range(0, size, _BLOCK_SIZE):
+                        with view[base:base + _BLOCK_SIZE] as block:
+                            state = _scan_block(block, base, state, ends)
+                    ends = _drop_empty_rows(view, ends)
+
+        # The first row is the header; a final row without a newline ends at EOF
+        offsets = array('q', ends[:1] or [size])
+        offsets.extend(ends[1:])
+        if offsets[-1] != size:
+            offsets.append(size)
+        return cls(offsets, stamp)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the index in the sidecar format."""
+        header = _HEADER.pack(MAGIC, *self.stamp, len(self))
+        offsets = array('q', self.offsets)
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+        return header + offsets.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RowIndex":
+        """
+        Read an index serialized by ``to_bytes``.
+
+        Raises:
+            ValueError: If data is not a valid index
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Row index is truncated")
+        magic, size, mtime_ns, inode, rows = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a row index")
+        offsets = array('q')
+        body = data[_HEADER.size:]
+        if len(body) != (rows + 1) * offsets.itemsize:
+            raise ValueError("Row index is truncated")
+        offsets.frombytes(body)
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+        return cls(offsets, (size, mtime_ns, inode))
+
+    def read_rows(self, path: str, start: int, stop: int) -> List[Dict[str, Any]]:
+        """
+        Parse rows [start, stop) of the indexed file.
+
+        Args:
+            path: CSV file path
+            start: First row (0 is the first data row); negative values
+                count from the end, as with list slicing
+            stop: Row after the last one to return
+
+        Returns:
+            List of row dictionaries with string values
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return []
+        offsets = self.offsets
+        with open(path, 'rb') as f:
+            header = f.read(offsets[0]).decode('utf-8-sig')
+            f.seek(offsets[start])
+            data = f.read(offsets[stop] - offsets[start]).decode('utf-8')
+        fieldnames = next(csv.reader(io.StringIO(header, newline='')), [])
+        return list(csv.DictReader(io.StringIO(data, newline=''), fieldnames=fieldnames))
+
+
+def load_index(index_path: str, csv_path: str) -> Optional[RowIndex]:
+    """
+    Load a sidecar index if it is current for the CSV file.
+
+    Returns:
+        The index, or None if it is missing, unreadable or stale
+    """
+    try:
+        with open(index_path, 'rb') as f:
+            index = RowIndex.from_bytes(f.read())
+    except (OSError, ValueError):
+        return None
+    return index if index.stamp == file_stamp(csv_path) else None
@@ -9,44 +9,168 @@ This module shows:
 - Context managers
 """
 
-import json
 import csv
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Union,
+)
 import logging
 
+try:
+    from .cache import ResultCache, deep_sizeof, freeze
+    from .columnar import ColumnTable, infer_schema, read_columnar, write_columnar
+    from .compression import CODECS, check_codec, codec_from_extension, detect, open_file
+    from .csv_index import RowIndex, file_stamp, load_index
+    from .groupby import DEFAULT_CHUNK_BYTES, group_by
+    from .json_stream import DEFAULT_CHUNK_SIZE, iter_json_array
+    from .serializers import get_backend
+    from .quantiles import KLLSketch
+    from .stats import StreamingStats, array_summary, as_numeric_array, sequence_summary
+except ImportError:  # running as a script or with src/ on sys.path
+    from cache import ResultCache, deep_sizeof, freeze
+    from columnar import ColumnTable, infer_schema, read_columnar, write_columnar
+    from compression import CODECS, check_codec, codec_from_extension, detect, open_file
+    from csv_index import RowIndex, file_stamp, load_index
+    from groupby import DEFAULT_CHUNK_BYTES, group_by
+    from json_stream import DEFAULT_CHUNK_SIZE, iter_json_array
+    from serializers import get_backend
+    from quantiles import KLLSketch
+    from stats import StreamingStats, array_summary, as_numeric_array, sequence_summary
+
 logger = logging.getLogger(__name__)
 
+FILE_FORMATS = ('json', 'csv')
+
+_MISSING = object()
+
+
+class FileResult(NamedTuple):
+    """Outcome of one file in a bulk save or load.
+    
+    Attributes:
+        filename: Name of the file (without extension)
+        value: Path written by a save, or data read by a load; None on error
+        error: Exception raised for this file, or None on success
+    """
+    filename: str
+    value: Any
+    error: Optional[Exception]
+    
+    @property
+    def ok(self) -> bool:
+        """True if the file was saved or loaded successfully."""
+        return self.error is None
+
+
+def _atomic_write(file_path: Path, write: Callable[[Any], None], mode: str = 'xb',
+                  level: Optional[int] = None, **open_kwargs: Any) -> None:
+    """
+    Write a file through a temporary sibling that is renamed into place.
+    
+    Readers see either the old file or the complete new one, never a
+    partial write. A compressed extension (.gz, .bz2, .xz) compresses
+    the file.
+    
+    Args:
+        file_path: Destination path
+        write: Callable receiving the open temporary file
+        mode: Exclusive-create mode for the temporary file ('xb' or 'x')
+        level: Compression level for compressed files
+        **open_kwargs: Extra arguments for open()
+    """
+    temp_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex}.tmp")
+    compression = codec_from_extension(file_path)
+    try:
+        with open_file(temp_path, mode, compression, level, **open_kwargs) as f:
+            write(f)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
 
 class DataProcessor:
     """Process and manipulate data from various sources."""
     
-    def __init__(self, data_dir: str = "data") -> None:
+    def __init__(self, data_dir: str = "data", json_backend: Optional[str] = None,
+                 pretty_json: bool = True, cache: Optional[ResultCache] = None,
+                 compression: Optional[str] = None,
+                 compression_level: Optional[int] = None) -> None:
         """
         Initialize data processor.
         
         Args:
             data_dir: Directory to store data files
+            json_backend: JSON serializer ("orjson", "ujson" or "json"),
+                or None for the fastest installed one
+            pretty_json: Indent saved JSON; False writes compact JSON,
+                which is smaller and faster to save and load
+            cache: Optional cache for loaded files (e.g.
+                ``ResultCache(maxsize=None, max_bytes=256 * 2**20)``); see
+                ``load_json``
+            compression: Compress saved files with "gzip", "bz2" or
+                "lzma", adding .gz, .bz2 or .xz to their names. Loading
+                finds and decompresses compressed files regardless.
+            compression_level: Compression level (1-9; 0-9 for lzma), or
+                None for the codec default
+            
+        Raises:
+            ValueError: If json_backend or compression is unknown
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
+        self.json_backend = get_backend(json_backend)
+        self.pretty_json = pretty_json
+        self.cache = cache
+        check_codec(compression)
+        self.compression = compression
+        self.compression_level = compression_level
+        self._row_indexes: Dict[Path, RowIndex] = {}
         logger.info(f"DataProcessor initialized with data_dir: {self.data_dir}")
     
-    def save_json(self, data: Dict[str, Any], filename: str) -> bool:
+    def _save_path(self, filename: str, extension: str) -> Path:
+        """Path a file is saved to, including the compression suffix."""
+        suffix = CODECS[self.compression].extension if self.compression else ''
+        return self.data_dir / f"{filename}.{extension}{suffix}"
+    
+    def _find_path(self, filename: str, extension: str) -> Path:
+        """
+        Path of an existing file to load, compressed or not.
+        
+        Prefers the name files are currently saved under; returns the
+        uncompressed name if no candidate exists.
+        """
+        plain = self.data_dir / f"{filename}.{extension}"
+        candidates = [self._save_path(filename, extension), plain]
+        candidates += [plain.with_name(plain.name + codec.extension) for codec in CODECS.values()]
+        for path in candidates:
+            if path.exists():
+                return path
+        return plain
+    
+    def save_json(self, data: Dict[str, Any], filename: str,
+                  pretty: Optional[bool] = None) -> bool:
         """
         Save data to JSON file.
         
         Args:
             data: Data to save
             filename: Name of the file
+            pretty: Indent the output; None uses the processor's
+                pretty_json setting
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            file_path = self.data_dir / f"{filename}.json"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            file_path = self._write_json(data, filename, pretty)
             logger.info(f"Data saved to {file_path}")
             return True
         except Exception as e:
@@ -57,6 +181,12 @@ class DataProcessor:
         """
         Load data from JSON file.
         
+        With a cache, repeated loads of an unchanged file are served from
+        memory; a file is re-read when its modification time, size or
+        inode changes. Cached data is shared between callers and is
+        therefore read-only (see ``cache.freeze``); use ``cache.thaw`` or
+        ``copy.deepcopy`` to get a modifiable copy.
+        
         Args:
             filename: Name of the file
             
@@ -64,21 +194,83 @@ class DataProcessor:
             Loaded data or None if error
         """
         try:
-            file_path = self.data_dir / f"{filename}.json"
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            file_path = self._find_path(filename, 'json')
+            data = self._load_cached(file_path, self._read_json)
             logger.info(f"Data loaded from {file_path}")
             return data
         except FileNotFoundError:
             logger.warning(f"File not found: {filename}.json")
             return None
-        except json.JSONDecodeError as e:
+        except ValueError as e:
+            # json, orjson and ujson decode errors all derive from ValueError
             logger.error(f"JSON decode error: {e}")
             return None
         except Exception as e:
             logger.error(f"Error loading JSON: {e}")
             return None
     
+    def _write_json(self, data: Any, filename: str, pretty: Optional[bool] = None) -> Path:
+        """Atomically write a JSON file, raising on error."""
+        if pretty is None:
+            pretty = self.pretty_json
+        file_path = self._save_path(filename, 'json')
+        payload = self.json_backend.dumps(data, pretty)
+        _atomic_write(file_path, lambda f: f.write(payload), level=self.compression_level)
+        return file_path
+    
+    def _read_json(self, file_path: Path) -> Any:
+        """Read a JSON file, raising on error."""
+        with open_file(file_path, 'rb') as f:
+            return self.json_backend.loads(f.read())
+    
+    def iter_json(self, filename: str, path: Optional[str] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Optional[Iterator[Any]]:
+        """
+        Lazily iterate over the items of an array inside a JSON file.
+        
+        The file is parsed incrementally, so only the current item is held
+        in memory. The file is opened immediately, so a missing file is
+        reported the same way as by ``load_json``.
+        
+        Args:
+            filename: Name of the file
+            path: Dotted object keys leading to the array (e.g. "users");
+                None for a top-level array
+            chunk_size: Number of characters read at a time
+            
+        Returns:
+            Iterator over the array items, or None if the file cannot be
+            opened. A decode error or a missing path is logged and
+            re-raised by the iterator, so it is never mistaken for the end
+            of the array.
+        """
+        try:
+            file_path = self._find_path(filename, 'json')
+            f = open_file(file_path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            logger.warning(f"File not found: {filename}.json")
+            return None
+        except Exception as e:
+            logger.error(f"Error loading JSON: {e}")
+            return None
+        
+        def items() -> Iterator[Any]:
+            count = 0
+            try:
+                with f:
+                    for item in iter_json_array(f, path, chunk_size):
+                        count += 1
+                        yield item
+                logger.info(f"JSON data streamed from {file_path} ({count} items)")
+            except ValueError as e:
+                logger.error(f"JSON decode error after {count} items: {e}")
+                raise
+            except Exception as e:
+                logger.error(f"Error loading JSON after {count} items: {e}")
+                raise
+        
+        return items()
+    
     def save_csv(self, data: List[Dict[str, Any]], filename: str) -> bool:
         """
         Save data to CSV file.
@@ -95,14 +287,7 @@ class DataProcessor:
             return False
         
         try:
-            file_path = self.data_dir / f"{filename}.csv"
-            fieldnames = data[0].keys()
-            
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(data)
-            
+            file_path = self._write_csv(data, filename)
             logger.info(f"CSV data saved to {file_path}")
             return True
         except Exception as e:
@@ -113,6 +298,8 @@ class DataProcessor:
         """
         Load data from CSV file.
         
+        Uses the cache like ``load_json``.
+        
         Args:
             filename: Name of the file
             
@@ -120,13 +307,8 @@ class DataProcessor:
             List of dictionaries or None if error
         """
         try:
-            file_path = self.data_dir / f"{filename}.csv"
-            data = []
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                data = list(reader)
-            
+            file_path = self._find_path(filename, 'csv')
+            data = self._load_cached(file_path, self._read_csv)
             logger.info(f"CSV data loaded from {file_path}")
             return data
         except FileNotFoundError:
@@ -136,34 +318,444 @@ class DataProcessor:
             logger.error(f"Error loading CSV: {e}")
             return None
     
-    def analyze_numbers(self, numbers: List[float]) -> Dict[str, float]:
+    def _load_cached(self, file_path: Path, read: Callable[[Path], Any]) -> Any:
+        """
+        Read a file through the cache, raising on error.
+        
+        The cache key includes the file's modification time, size and
+        inode, so a changed file misses and its stale entry ages out.
+        """
+        if self.cache is None:
+            return read(file_path)
+        stat = os.stat(file_path)
+        key = ('load', str(file_path.resolve()), stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        data = self.cache.get(key, _MISSING)
+        if data is _MISSING:
+            data = freeze(read(file_path))
+            self.cache.put(key, data, deep_sizeof(data))
+        return data
+    
+    def _write_csv(self, data: List[Dict[str, Any]], filename: str) -> Path:
+        """Atomically write a CSV file, raising on error."""
+        if not data:
+            raise ValueError("No data to save")
+        file_path = self._save_path(filename, 'csv')
+        fieldnames = data[0].keys()
+        
+        def write(f: Any) -> None:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(data)
+        
+        _atomic_write(file_path, write, 'x', self.compression_level, newline='', encoding='utf-8')
+        return file_path
+    
+    def _read_csv(self, file_path: Path) -> List[Dict[str, Any]]:
+        """Read a CSV file into a list of rows, raising on error."""
+        with open_file(file_path, 'r', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+    
+    def build_row_index(self, filename: str) -> Optional[int]:
+        """
+        Build (or refresh) the row-offset index of a CSV file.
+        
+        The index is written next to the file as ``<filename>.csv.idx``
+        and used by ``get_rows``. Building it scans the file once through
+        mmap; ``get_rows`` calls this automatically when the index is
+        missing or the CSV file has changed since it was built.
+        
+        Args:
+            filename: Name of the file
+            
+        Returns:
+            Number of data rows, or None if error
+        """
+        try:
+            index = self._row_index(filename, rebuild=True)
+            return len(index)
+        except FileNotFoundError:
+            logger.warning(f"File not found: {filename}.csv")
+            return None
+        except Exception as e:
+            logger.error(f"Error indexing CSV: {e}")
+            return None
+    
+    def get_rows(self, filename: str, start: int, stop: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Load a range of rows from a CSV file without parsing the rest.
+        
+        Seeks straight to the rows using the row-offset index, which is
+        built on first use and rebuilt whenever the file changes.
+        Compressed files cannot be indexed.
+        
+        Args:
+            filename: Name of the file
+            start: First row to return (0 is the first data row);
+                negative values count from the end, as with slicing
+            stop: Row after the last one to return
+            
+        Returns:
+            List of dictionaries (like ``load_csv``) or None if error
+        """
+        try:
+            file_path = self._find_path(filename, 'csv')
+            rows = self._row_index(filename).read_rows(str(file_path), start, stop)
+            logger.info(f"Rows {start}:{stop} loaded from {filename}.csv ({len(rows)} rows)")
+            return rows
+        except FileNotFoundError:
+            logger.warning(f"File not found: {filename}.csv")
+            return None
+        except Exception as e:
+            logger.error(f"Error loading CSV rows: {e}")
+            return None
+    
+    def _row_index(self, filename: str, rebuild: bool = False) -> RowIndex:
+        """Get a current row index for a CSV file, raising on error."""
+        file_path = self._find_path(filename, 'csv')
+        index_path = file_path.with_name(f"{file_path.name}.idx")
+        index = self._row_indexes.get(file_path)
+        if not rebuild and index is not None and index.stamp == file_stamp(str(file_path)):
+            return index
+        
+        index = None if rebuild else load_index(str(index_path), str(file_path))
+        if index is None:
+            if detect(file_path) is not None:
+                raise ValueError(f"Cannot index compressed file {file_path.name}")
+            index = RowIndex.build(str(file_path))
+            payload = index.to_bytes()
+            _atomic_write(index_path, lambda f: f.write(payload))
+            logger.info(f"Row index built for {file_path} ({len(index)} rows)")
+        self._row_indexes[file_path] = index
+        return index
+    
+    def save_many(self, items: Mapping[str, Any], file_format: str = 'json',
+                  max_workers: Optional[int] = None) -> Dict[str, FileResult]:
         """
-        Analyze a list of numbers.
+        Save many files concurrently on a thread pool.
+        
+        Every file is written atomically, so an interrupted job never
+        leaves a truncated file behind. A failure affects only its own
+        file.
         
         Args:
-            numbers: List of numbers to analyze
+            items: Mapping of filename to data (a list of rows for CSV)
+            file_format: "json" or "csv"
+            max_workers: Maximum number of files written at once (defaults
+                to the ThreadPoolExecutor default)
             
         Returns:
-            Dictionary with statistics
+            Mapping of filename to FileResult holding the written path or
+            the error
+            
+        Raises:
+            ValueError: If file_format is not supported
         """
-        if not numbers:
-            return {}
+        write = self._bulk_operation(file_format, save=True)
         
-        result = {
-            'count': len(numbers),
-            'sum': sum(numbers),
-            'mean': sum(numbers) / len(numbers),
-            'min': min(numbers),
-            'max': max(numbers),
-        }
+        def save(item: tuple) -> FileResult:
+            filename, data = item
+            try:
+                return FileResult(filename, write(data, filename), None)
+            except Exception as e:
+                return FileResult(filename, None, e)
+        
+        return self._run_bulk(save, items.items(), "Saved", file_format, max_workers)
+    
+    def load_many(self, filenames: Iterable[str], file_format: str = 'json',
+                  max_workers: Optional[int] = None) -> Dict[str, FileResult]:
+        """
+        Load many files concurrently on a thread pool.
+        
+        Uses the cache like ``load_json``.
+        
+        Args:
+            filenames: Names of the files to load
+            file_format: "json" or "csv"
+            max_workers: Maximum number of files read at once (defaults
+                to the ThreadPoolExecutor default)
+            
+        Returns:
+            Mapping of filename to FileResult holding the loaded data or
+            the error (e.g. FileNotFoundError)
+            
+        Raises:
+            ValueError: If file_format is not supported
+        """
+        read = self._bulk_operation(file_format, save=False)
+        
+        def load(filename: str) -> FileResult:
+            try:
+                return FileResult(filename, read(self._find_path(filename, file_format)), None)
+            except Exception as e:
+                return FileResult(filename, None, e)
+        
+        return self._run_bulk(load, filenames, "Loaded", file_format, max_workers)
+    
+    def _bulk_operation(self, file_format: str, save: bool) -> Callable:
+        """Get the raising writer or reader for file_format."""
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"Unsupported file format: {file_format!r}")
+        if file_format == 'json':
+            write, read = self._write_json, self._read_json
+        else:
+            write, read = self._write_csv, self._read_csv
+        return write if save else lambda file_path: self._load_cached(file_path, read)
+    
+    def _run_bulk(self, task: Callable[[Any], FileResult], work: Iterable[Any], verb: str,
+                  file_format: str, max_workers: Optional[int]) -> Dict[str, FileResult]:
+        """Run task over work on a thread pool and log a summary."""
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = {result.filename: result for result in pool.map(task, work)}
+        
+        failed = [name for name, result in results.items() if not result.ok]
+        logger.info(f"{verb} {len(results) - len(failed)} {file_format.upper()} files in {self.data_dir}")
+        if failed:
+            logger.warning(f"{len(failed)} {file_format.upper()} files failed: {', '.join(failed[:10])}")
+        return results
+    
+    def iter_csv(self, filename: str, chunk_size: Optional[int] = None
+                 ) -> Optional[Iterator[Union[Dict[str, Any], List[Dict[str, Any]]]]]:
+        """
+        Lazily iterate over a CSV file without loading it into memory.
+        
+        The file is opened immediately, so a missing file is reported the
+        same way as by ``load_csv``. Rows are then read on demand; only
+        one row (or one chunk) is held in memory at a time.
+        
+        Args:
+            filename: Name of the file
+            chunk_size: If given, yield lists of up to chunk_size rows
+                instead of single rows
+            
+        Returns:
+            Iterator over row dictionaries (or chunks of them), or None if
+            the file cannot be opened. An error while reading is logged
+            and re-raised by the iterator, so a truncated read is never
+            mistaken for the end of the file.
+            
+        Raises:
+            ValueError: If chunk_size is not positive
+        """
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        
+        try:
+            file_path = self._find_path(filename, 'csv')
+            f = open_file(file_path, 'r', newline='', encoding='utf-8')
+        except FileNotFoundError:
+            logger.warning(f"File not found: {filename}.csv")
+            return None
+        except Exception as e:
+            logger.error(f"Error loading CSV: {e}")
+            return None
+        
+        def rows() -> Iterator[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+            count = 0
+            try:
+                with f:
+                    reader = csv.DictReader(f)
+                    if chunk_size is None:
+                        for row in reader:
+                            count += 1
+                            yield row
+                    else:
+                        while True:
+                            chunk = list(islice(reader, chunk_size))
+                            if not chunk:
+                                break
+                            count += len(chunk)
+                            yield chunk
+                logger.info(f"CSV data streamed from {file_path} ({count} rows)")
+            except Exception as e:
+                logger.error(f"Error loading CSV after {count} rows: {e}")
+                raise
+        
+        return rows()
+    
+    def load_csv_columns(self, filename: str, schema: Optional[Dict[str, str]] = None,
+                         use_numpy: Optional[bool] = None) -> Optional[ColumnTable]:
+        """
+        Load a CSV file into typed columns.
+        
+        Every column is stored as one compact array (see ``ColumnTable``)
+        instead of a dictionary per row, so numeric columns can be passed
+        straight to ``analyze_numbers``. Without a schema the file is read
+        twice: once to infer the column types and once to load them.
+        
+        Args:
+            filename: Name of the file
+            schema: Column name -> 'int', 'float', 'bool', 'str' or 'date';
+                inferred from the data if omitted
+            use_numpy: Return NumPy arrays; None means "if NumPy is installed"
+            
+        Returns:
+            ColumnTable or None if error
+        """
+        try:
+            file_path = self._find_path(filename, 'csv')
+            if schema is None:
+                schema = infer_schema(self._iter_csv_rows(file_path))
+            table = ColumnTable.from_rows(self._iter_csv_rows(file_path), schema,
+                                          use_numpy=use_numpy)
+            logger.info(f"CSV columns loaded from {file_path} ({len(table)} rows)")
+            return table
+        except FileNotFoundError:
+            logger.warning(f"File not found: {filename}.csv")
+            return None
+        except Exception as e:
+            logger.error(f"Error loading CSV columns: {e}")
+            return None
+    
+    def _iter_csv_rows(self, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """Lazily read the rows of a CSV file, raising on error."""
+        with open_file(file_path, 'r', newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+    
+    def save_columnar(self, table: ColumnTable, filename: str) -> bool:
+        """
+        Save a table in the binary columnar format.
+        
+        Columns are written as aligned blocks of raw typed values, so
+        ``load_columnar`` can map them back without parsing. Columnar
+        files are never compressed, since that would defeat memory
+        mapping.
+        
+        Args:
+            table: Table to save (e.g. from ``load_csv_columns``)
+            filename: Name of the file (saved as ``<filename>.col``)
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            file_path = self.data_dir / f"{filename}.col"
+            _atomic_write(file_path, lambda f: write_columnar(table, f))
+            logger.info(f"Columnar data saved to {file_path} ({len(table)} rows)")
+            return True
+        except Exception as e:
+            logger.error(f"Error saving columnar data: {e}")
+            return False
+    
+    def load_columnar(self, filename: str,
+                      use_numpy: Optional[bool] = None) -> Optional[ColumnTable]:
+        """
+        Memory-map a columnar file saved by ``save_columnar``.
+        
+        Numeric columns are zero-copy ``memoryview`` or NumPy views of the
+        file, so loading takes the same time whatever the file size, and
+        the columns can be passed straight to ``analyze_numbers``.
+        
+        Args:
+            filename: Name of the file
+            use_numpy: Return NumPy arrays; None means "if NumPy is installed"
+            
+        Returns:
+            Read-only ColumnTable or None if error
+        """
+        try:
+            file_path = self.data_dir / f"{filename}.col"
+            table = read_columnar(str(file_path), use_numpy=use_numpy)
+            logger.info(f"Columnar data mapped from {file_path} ({len(table)} rows)")
+            return table
+        except FileNotFoundError:
+            logger.warning(f"File not found: {filename}.col")
+            return None
+        except Exception as e:
+            logger.error(f"Error loading columnar data: {e}")
+            return None
+    
+    def group_by(self, filename: str, keys: Union[str, List[str]],
+                 aggregations: Dict[str, Union[str, List[str]]],
+                 max_workers: Optional[int] = None,
+                 chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Optional[Dict[Any, Dict[str, Dict[str, Any]]]]:
+        """
+        Aggregate numeric CSV columns per group, in parallel for large files.
+        
+        The file is split into byte ranges of about chunk_bytes that are
+        aggregated on a process pool and merged, so the rows are never
+        loaded at once. See ``groupby.group_by`` for the aggregations.
+        
+        Args:
+            filename: Name of the file
+            keys: Column name or names to group by
+            aggregations: Column name -> aggregation name or names, e.g.
+                {"salary": ["mean", "p90"], "age": "max"}
+            max_workers: Worker processes (defaults to the CPU count)
+            chunk_bytes: Approximate size of each byte range
+            
+        Returns:
+            Group key -> column -> aggregation -> result, or None if error
+        """
+        file_path = self._find_path(filename, 'csv')
+        try:
+            result = group_by(str(file_path), keys, aggregations,
+                              max_workers=max_workers, chunk_bytes=chunk_bytes)
+            logger.info(f"Grouped {filename}.csv into {len(result)} groups")
+            return result
+        except FileNotFoundError:
+            logger.warning(f"File not found: {filename}.csv")
+            return None
+        except Exception as e:
+            logger.error(f"Error grouping CSV: {e}")
+            return None
+    
+    def analyze_numbers(self, numbers: Iterable[float],
+                        percentiles: Optional[Iterable[float]] = None,
+                        approximate: bool = False) -> Dict[str, float]:
+        """
+        Analyze a sequence of numbers.
+        
+        Accepts any iterable, including generators and typed columns.
+        NumPy arrays and numeric buffers such as ``array('d')`` are
+        summarized with vectorized NumPy operations when NumPy is
+        installed. Lists and other sized collections are copied and
+        sorted once, with the statistics taken by C-level builtins.
+        Iterators are consumed number by number in a single pass. Use
+        ``StreamingStats`` directly for the variance or to merge
+        statistics computed over separate chunks.
+        
+        Args:
+            numbers: Numbers to analyze
+            percentiles: Percentiles to add, between 0 and 100 (e.g.
+                (50, 90, 99) adds 'p50', 'p90' and 'p99')
+            approximate: Estimate the median and percentiles with a KLL
+                sketch in bounded memory (about ±1.7% rank error) instead
+                of keeping every number
+            
+        Returns:
+            Dictionary with count, sum, mean, min, max, median and any
+            requested percentiles; empty if there are no numbers
+        """
+        percentiles = list(percentiles or ())
+        keys = ('count', 'sum', 'mean', 'min', 'max', 'median')
+        
+        # Numbers already in memory are summarized exactly with C-level
+        # reductions, which beat a Python loop over every number
+        summary = None
+        if not approximate:
+            quantiles = [p / 100 for p in percentiles]
+            if as_numeric_array(numbers) is not None:
+                summary = array_summary(numbers, quantiles)
+            elif hasattr(numbers, '__len__'):
+                summary = sequence_summary(numbers, quantiles)
         
-        # Calculate median
-        sorted_nums = sorted(numbers)
-        n = len(sorted_nums)
-        if n % 2 == 0:
-            result['median'] = (sorted_nums[n//2 - 1] + sorted_nums[n//2]) / 2
+        if summary is not None:
+            if not summary:
+                return {}
+            result = {key: summary[key] for key in keys}
+            for p, value in zip(percentiles, summary.get('quantiles', ())):
+                result[f"p{p:g}"] = value
         else:
-            result['median'] = sorted_nums[n//2]
+            if approximate:
+                stats = StreamingStats(numbers, keep_values=False, sketch=KLLSketch())
+            else:
+                stats = StreamingStats(numbers)
+            summary = stats.summary()
+            if not summary:
+                return {}
+            result = {key: summary[key] for key in keys}
+            for p in percentiles:
+                result[f"p{p:g}"] = stats.quantile(p / 100)
         
         logger.info("Number analysis completed")
         return result
@@ -0,0 +1,192 @@
+"""
+Compiled arithmetic expressions for the calculator.
+
+An expression such as ``"(a + b) * c ** 2"`` is parsed once, checked
+against the operators the calculator supports and compiled into a plain
+Python function of its variables. Compiled expressions are cached by
+source text, so evaluating a formula again skips parsing entirely.
+"""
+
+from functools import lru_cache
+from itertools import repeat
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+import ast
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only list columns are then possible
+    np = None
+
+# Number of distinct expressions kept compiled
+EXPRESSION_CACHE_SIZE = 256
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Name, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.UAdd, ast.USub,
+)
+
+
+def _is_column(value: Any) -> bool:
+    """Whether a value is a sequence of values rather than a scalar."""
+    return hasattr(value, "__len__") and not isinstance(value, (str, bytes))
+
+
+class CompiledExpression:
+    """An arithmetic expression compiled into a function of its variables."""
+
+    def __init__(self, source: str) -> None:
+        """
+        Parse and compile an expression.
+
+        Args:
+            source: Expression using numbers, variables, parentheses and
+                the operators + - * / **
+
+        Raises:
+            ValueError: If the expression is malformed or uses anything
+                other than the supported arithmetic
+        """
+        self.source = source
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression: {source!r}") from e
+
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant):
+                if type(node.value) not in (int, float):
+                    raise ValueError(f"Unsupported constant in expression: {node.value!r}")
+            elif not isinstance(node, _ALLOWED_NODES):
+                raise ValueError(f"Unsupported syntax in expression: {type(node).__name__}")
+            elif isinstance(node, ast.Name):
+                names.add(node.id)
+
+        self.variables = tuple(sorted(names))
+        function = ast.Expression(ast.Lambda(
+            args=ast.arguments(
+                posonlyargs=[], args=[ast.arg(arg=name) for name in self.variables],
+                kwonlyargs=[], kw_defaults=[], defaults=[],
+            ),
+            body=tree.body,
+        ))
+        ast.fix_missing_locations(function)
+        code = compile(function, "<expression>", "eval")
+        self._function = eval(code, {"__builtins__": {}})
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r})"
+
+    def _columns(self, variables: Mapping[str, Any]) -> List[Any]:
+        """Pick the expression's variables out of a mapping, in order."""
+        missing = [name for name in self.variables if name not in variables]
+        if missing:
+            raise ValueError(f"Missing value for variable(s): {', '.join(missing)}")
+        return [variables[name] for name in self.variables]
+
+    def evaluate(self, /, **variables: Any) -> Any:
+        """
+        Evaluate the expression for one set of variable values.
+
+        Args:
+            **variables: Value for every variable in the expression
+                (extra names are ignored)
+
+        Returns:
+            Result of the expression
+
+        Raises:
+            ValueError: If a variable is missing or a division by zero occurs
+        """
+        args = self._columns(variables)
+        try:
+            return self._function(*args)
+        except ZeroDivisionError as e:
+            raise ValueError("Cannot divide by zero") from e
+
+    def evaluate_many(self, bindings: Optional[Iterable[Mapping[str, Any]]] = None, /,
+                      **columns: Any) -> Any:
+        """
+        Evaluate the expression for many sets of variable values.
+
+        Values are given either as an iterable of mappings (one per
+        evaluation) or as one column per variable. A scalar given for a
+        variable is used in every evaluation. When any column is a NumPy
+        array, every column is converted to one and the whole batch is
+        computed in one vectorized call, returning an array. Operations
+        for which NumPy would produce NaN or infinity (division by zero,
+        a negative number to a fractional power) then raise ValueError.
+
+        Args:
+            bindings: Iterable of variable mappings
+            **columns: Sequence of values, or a single value, per variable
+
+        Returns:
+            List (or NumPy array) of results
+
+        Raises:
+            ValueError: If a variable is missing, columns differ in length
+                (or cannot be broadcast together) or a division by zero
+                occurs
+        """
+        try:
+            if bindings is not None:
+                function = self._function
+                return [function(*self._columns(row)) for row in bindings]
+
+            args = self._columns(columns)
+            if np is not None and any(hasattr(column, "__array__") for column in args):
+                return self._evaluate_arrays(args)
+            lengths = {len(column) for column in args if _is_column(column)}
+            if len(lengths) > 1:
+                raise ValueError(f"Column length mismatch: {sorted(lengths)}")
+            if not lengths:
+                # Only scalars: there is no column to size the batch by
+                return []
+            size = lengths.pop()
+            args = [column if _is_column(column) else repeat(column, size) for column in args]
+            return list(map(self._function, *args))
+        except ZeroDivisionError as e:
+            raise ValueError("Cannot divide by zero") from e
+
+    def _evaluate_arrays(self, args: List[Any]) -> Any:
+        """Evaluate columns as NumPy arrays in one vectorized call."""
+        # Lists would otherwise keep list semantics, e.g. + concatenating
+        args = [np.asarray(column) if _is_column(column) else column for column in args]
+        try:
+            with np.errstate(divide="raise", invalid="raise"):
+                return self._function(*args)
+        except FloatingPointError as e:
+            # 0 / 0 is reported as an invalid value, x / 0 as a division by zero
+            if "divide" in str(e):
+                raise ValueError("Cannot divide by zero") from e
+            raise ValueError(f"Invalid value in expression: {e}") from e
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(source: str) -> CompiledExpression:
+    """
+    Compile an expression, reusing a cached result for repeated sources.
+
+    Args:
+        source: Expression text
+
+    Returns:
+        CompiledExpression for source
+
+    Raises:
+        ValueError: If the expression is malformed or unsupported
+    """
+    return CompiledExpression(source)
+
+
+def cache_info() -> Dict[str, int]:
+    """
+    Get compiled-expression cache statistics.
+
+    Returns:
+        Dictionary with hits, misses, size and maxsize
+    """
+    info = compile_expression.cache_info()
+    return {'hits': info.hits, 'misses': info.misses,
+            'size': info.currsize, 'maxsize': info.maxsize}
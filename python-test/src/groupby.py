@@ -0,0 +1,254 @@
+"""
+Parallel group-by aggregation over CSV files.
+
+The data rows of a file are split into byte ranges. Each range is parsed
+and aggregated independently, in a process pool for large files, into
+one ``StreamingStats`` per group and column. The partial results are
+merged in the parent. Only these small partial aggregates cross process
+boundaries, never rows.
+
+Ranges are aligned to line breaks, so fields must not contain embedded
+newlines (the files written by ``DataProcessor.save_csv`` only do when
+the data itself contains them). Compressed files cannot be split and are
+streamed through a single decompressor in batches of rows instead.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import csv
+import io
+import os
+import re
+
+try:
+    from .compression import detect, open_file
+    from .quantiles import KLLSketch
+    from .stats import StreamingStats
+except ImportError:  # running as a script or with src/ on sys.path
+    from compression import detect, open_file
+    from quantiles import KLLSketch
+    from stats import StreamingStats
+
+AGGREGATIONS = ('count', 'sum', 'mean', 'min', 'max', 'variance', 'stdev', 'median')
+
+# Percentile aggregations such as 'p90' or 'p99.9'
+_PERCENTILE = re.compile(r"^p(\d+(?:\.\d+)?)$")
+
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+
+# Rows aggregated at a time when streaming a compressed file
+_BATCH_ROWS = 100_000
+
+Partials = Dict[Tuple[str, ...], List[StreamingStats]]
+
+
+def _parse_number(text: str) -> Optional[Union[int, float]]:
+    """Parse a cell as an int or float; None for empty or non-numeric cells."""
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return None
+
+
+def _check_aggregation(name: str) -> bool:
+    """
+    Validate an aggregation name.
+
+    Returns:
+        True if the aggregation needs a quantile sketch
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    match = _PERCENTILE.match(name)
+    if match:
+        if float(match.group(1)) > 100:
+            raise ValueError(f"Percentile out of range: {name!r}")
+        return True
+    if name not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation {name!r}; expected one of "
+                         f"{', '.join(AGGREGATIONS)} or a percentile like 'p90'")
+    return name == 'median'
+
+
+def _read_header(path: str) -> Tuple[List[str], int]:
+    """Return the column names and the byte offset of the first data row."""
+    with open_file(path, 'rb') as f:
+        line = f.readline()
+        header_end = f.tell()
+    columns = next(csv.reader([line.decode('utf-8-sig')]), [])
+    return columns, header_end
+
+
+def _byte_ranges(start: int, end: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    bounds = list(range(start, end, chunk_bytes)) + [end]
+    return list(zip(bounds, bounds[1:]))
+
+
+def _aggregate_range(path: str, header_end: int, key_indexes: Sequence[int],
+                     value_indexes: Sequence[int], sketch: bool,
+                     byte_range: Tuple[int, int]) -> Partials:
+    """
+    Aggregate the rows that start within a byte range of a CSV file.
+
+    A row belongs to the range its first byte falls in, so adjacent
+    ranges neither skip nor repeat the rows that straddle them.
+    """
+    start, end = byte_range
+    with open(path, 'rb') as f:
+        if start > header_end:
+            # Skip the tail of the row that started in the previous range
+            f.seek(start - 1)
+            f.readline()
+        else:
+            f.seek(start)
+        begin = f.tell()
+        if begin >= end:
+            return {}
+        data = f.read(end - begin)
+        if not data.endswith(b'\n'):
+            data += f.readline()
+
+    rows = csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+    return _aggregate_rows(rows, key_indexes, value_indexes, sketch)
+
+
+def _aggregate_rows(rows: Iterable[List[str]], key_indexes: Sequence[int],
+                    value_indexes: Sequence[int], sketch: bool) -> Partials:
+    """Aggregate parsed CSV rows into per-group statistics."""
+    # Buffer the values of each group, then summarize each buffer in one pass
+    buffers: Dict[Tuple[str, ...], List[List[Any]]] = {}
+    width = max(list(key_indexes) + list(value_indexes)) + 1
+    for row in rows:
+        if not row:
+            continue
+        if len(row) < width:
+            row += [''] * (width - len(row))
+        key = tuple(row[i] for i in key_indexes)
+        columns = buffers.get(key)
+        if columns is None:
+            columns = buffers[key] = [[] for _ in value_indexes]
+        for values, index in zip(columns, value_indexes):
+            value = _parse_number(row[index])
+            if value is not None:
+                values.append(value)
+
+    return {
+        key: [StreamingStats(values, keep_values=False, sketch=KLLSketch() if sketch else None)
+              for values in columns]
+        for key, columns in buffers.items()
+    }
+
+
+def _merge_partials(total: Partials, part: Partials) -> None:
+    for key, stats in part.items():
+        existing = total.get(key)
+        if existing is None:
+            total[key] = stats
+        else:
+            for mine, theirs in zip(existing, stats):
+                mine.merge(theirs)
+
+
+def _finalize(stats: StreamingStats, name: str) -> Any:
+    """Compute one aggregation from merged statistics."""
+    if name == 'count':
+        return stats.count
+    if name == 'sum':
+        return stats.sum
+    if stats.count == 0:
+        return None
+    match = _PERCENTILE.match(name)
+    if match:
+        return stats.quantile(float(match.group(1)) / 100)
+    return getattr(stats, name)
+
+
+def group_by(path: str, keys: Union[str, Sequence[str]],
+             aggregations: Dict[str, Union[str, Iterable[str]]],
+             max_workers: Optional[int] = None,
+             chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Dict[Any, Dict[str, Dict[str, Any]]]:
+    """
+    Group the rows of a CSV file and aggregate numeric columns per group.
+
+    Supported aggregations are count, sum, mean, min, max, variance
+    (population), stdev, median and percentiles such as 'p90'. count,
+    sum, mean, min, max, variance and stdev are exact. The median and
+    percentiles come from merged KLL sketches (about ±1.7% rank error).
+    Cells that are empty or not numbers are ignored and are not counted.
+
+    Args:
+        path: CSV file with a header row
+        keys: Column name or names to group by
+        aggregations: Column name -> aggregation name or names
+        max_workers: Worker processes (defaults to the CPU count); files
+            that fit in one chunk, compressed files, or max_workers=1 are
+            aggregated in this process
+        chunk_bytes: Approximate size of the byte range per task
+
+    Returns:
+        Group key (the value, or a tuple of values for several keys) ->
+        column -> aggregation -> result
+
+    Raises:
+        ValueError: If a column or aggregation is unknown
+        FileNotFoundError: If the file does not exist
+    """
+    key_names = [keys] if isinstance(keys, str) else list(keys)
+    requested = {column: [names] if isinstance(names, str) else list(names)
+                 for column, names in aggregations.items()}
+    if not key_names:
+        raise ValueError("At least one group key is required")
+    sketch = False
+    for names in requested.values():
+        for name in names:
+            sketch = _check_aggregation(name) or sketch
+
+    columns, header_end = _read_header(path)
+    missing = [name for name in key_names + list(requested) if name not in columns]
+    if missing:
+        raise ValueError(f"Unknown columns: {', '.join(missing)}")
+    key_indexes = [columns.index(name) for name in key_names]
+    value_indexes = [columns.index(name) for name in requested]
+
+    totals: Partials = {}
+    if detect(path) is not None:
+        with open_file(path, 'r', newline='', encoding='utf-8') as f:
+            rows = csv.reader(f)
+            next(rows, None)
+            while True:
+                batch = list(islice(rows, _BATCH_ROWS))
+                if not batch:
+                    break
+                _merge_partials(totals, _aggregate_rows(batch, key_indexes, value_indexes, sketch))
+        return _results(totals, requested)
+
+    ranges = _byte_ranges(header_end, os.path.getsize(path), max(1, chunk_bytes))
+    task = partial(_aggregate_range, path, header_end, key_indexes, value_indexes, sketch)
+    workers = max_workers or os.cpu_count() or 1
+    if len(ranges) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+            for part in pool.map(task, ranges):
+                _merge_partials(totals, part)
+    else:
+        for byte_range in ranges:
+            _merge_partials(totals, task(byte_range))
+    return _results(totals, requested)
+
+
+def _results(totals: Partials,
+             requested: Dict[str, List[str]]) -> Dict[Any, Dict[str, Dict[str, Any]]]:
+    """Compute the requested aggregations from the merged statistics."""
+    result = {}
+    for key, stats in totals.items():
+        group = key[0] if len(key) == 1 else key
+        result[group] = {
+            column: {name: _finalize(column_stats, name) for name in requested[column]}
+            for column, column_stats in zip(requested, stats)
+        }
+    return result
@@ -0,0 +1,395 @@
+"""
+Compact operation history for the calculator.
+
+Operations are stored as typed arrays (opcode, operands, result) in a
+fixed-capacity ring buffer instead of as formatted strings. Strings are
+only rendered when the history is read, so recording an operation costs
+a handful of array writes and no formatting.
+
+``ShardedHistory`` offers the same interface for calculators shared
+between threads: each thread writes to its own shard and the shards are
+merged in sequence order when the history is read.
+"""
+
+from array import array
+from heapq import merge
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import itertools
+import threading
+
+# Opcodes
+ADD = 0
+SUBTRACT = 1
+MULTIPLY = 2
+DIVIDE = 3
+POWER = 4
+EVALUATE = 5
+MOD_POWER = 6
+
+SYMBOLS = ("+", "-", "*", "/", "**")
+
+# Flag bits describing how a slot is stored
+A_INT = 1
+B_INT = 2
+RESULT_INT = 4
+BATCH = 8
+OBJECT = 16
+
+# Largest integer magnitude a double represents exactly
+_MAX_EXACT_INT = 2 ** 53
+
+# Integers above this size exceed Python's int-to-str digit limit (4300)
+_MAX_DISPLAY_BITS = 14_000
+
+DEFAULT_CAPACITY = 10_000
+
+
+def _storable(value: Any) -> bool:
+    """Return True if value round-trips exactly through a double."""
+    kind = type(value)
+    if kind is float:
+        return True
+    return kind is int and -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT
+
+
+def _display(value: Any) -> Any:
+    """Return value, or a placeholder for integers too long to print."""
+    if type(value) is int and value.bit_length() > _MAX_DISPLAY_BITS:
+        return f"<{value.bit_length()}-bit integer>"
+    return value
+
+
+def value_flags(a: Any, b: Any, result: Any) -> Optional[int]:
+    """
+    Get the flags for storing an operation as three doubles.
+
+    Returns:
+        Combination of A_INT, B_INT and RESULT_INT, or None if any value
+        does not round-trip exactly through a double
+    """
+    if _storable(a) and _storable(b) and _storable(result):
+        return ((type(a) is int) * A_INT
+                | (type(b) is int) * B_INT
+                | (type(result) is int) * RESULT_INT)
+    return None
+
+
+class OperationHistory:
+    """
+    Bounded ring buffer of calculator operations.
+
+    Once ``capacity`` entries are stored, each new entry evicts the oldest
+    one. Operands that do not fit exactly in a double (big integers,
+    complex results, other numeric types) are kept as Python objects in a
+    side table for their slot so rendering stays exact.
+    """
+
+    def __init__(self, capacity: Optional[int] = DEFAULT_CAPACITY) -> None:
+        """
+        Initialize an empty history.
+
+        Args:
+            capacity: Maximum number of entries kept, or None for unbounded
+
+        Raises:
+            ValueError: If capacity is not positive
+        """
+        if capacity is not None and capacity <= 0:
+            raise ValueError("History capacity must be positive")
+        self.capacity = capacity
+        self.evicted = 0
+        self._opcodes = array("B")
+        self._flags = array("B")
+        self._a = array("d")
+        self._b = array("d")
+        self._results = array("d")
+        self._objects: Dict[int, Tuple[Any, Any, Any]] = {}
+        self._start = 0
+
+    def __len__(self) -> int:
+        return len(self._opcodes)
+
+    def __iter__(self) -> Iterator[str]:
+        for slot in self._slots():
+            yield self._render(slot)
+
+    def _next_slot(self) -> int:
+        """Return the slot for a new entry, evicting the oldest if full."""
+        size = len(self._opcodes)
+        if self.capacity is None or size < self.capacity:
+            self._opcodes.append(0)
+            self._flags.append(0)
+            self._a.append(0.0)
+            self._b.append(0.0)
+            self._results.append(0.0)
+            return size
+
+        slot = self._start
+        self._start = (slot + 1) % self.capacity
+        self._objects.pop(slot, None)
+        self.evicted += 1
+        return slot
+
+    def _slots(self) -> Iterator[int]:
+        """Yield slot indices from oldest to newest."""
+        size = len(self._opcodes)
+        for i in range(size):
+            yield (self._start + i) % size
+
+    def record(self, opcode: int, a: Any, b: Any, result: Any) -> None:
+        """
+        Record a single operation.
+
+        Args:
+            opcode: One of the module-level opcodes (ADD, SUBTRACT, ...)
+            a: First operand
+            b: Second operand
+            result: Result of the operation
+        """
+        slot = self._next_slot()
+        self._opcodes[slot] = opcode
+        flags = value_flags(a, b, result)
+        if flags is not None:
+            self._flags[slot] = flags
+            self._a[slot] = a
+            self._b[slot] = b
+            self._results[slot] = result
+        else:
+            self._flags[slot] = OBJECT
+            self._objects[slot] = (a, b, result)
+
+    def record_batch(self, opcode: int, count: int) -> None:
+        """
+        Record a batch of ``count`` operations as a single entry.
+
+        Args:
+            opcode: One of the module-level opcodes (ADD, SUBTRACT, ...)
+            count: Number of operations in the batch
+        """
+        slot = self._next_slot()
+        self._opcodes[slot] = opcode
+        self._flags[slot] = BATCH
+        self._a[slot] = count
+
+    def record_expression(self, source: str, variables: Dict[str, Any], result: Any) -> None:
+        """
+        Record the evaluation of an expression.
+
+        Args:
+            source: Expression text
+            variables: Variable values used for the evaluation
+            result: Result of the expression
+        """
+        slot = self._next_slot()
+        self._opcodes[slot] = EVALUATE
+        self._flags[slot] = OBJECT
+        self._objects[slot] = (source, variables, result)
+
+    def record_expression_batch(self, source: str, count: int) -> None:
+        """
+        Record a batch of ``count`` evaluations of an expression.
+
+        Args:
+            source: Expression text
+            count: Number of evaluations in the batch
+        """
+        slot = self._next_slot()
+        self._opcodes[slot] = EVALUATE
+        self._flags[slot] = OBJECT | BATCH
+        self._objects[slot] = (source, count, None)
+
+    def record_mod_power(self, base: int, exponent: int, modulus: int, result: int) -> None:
+        """
+        Record a modular exponentiation.
+
+        Args:
+            base: Base
+            exponent: Exponent
+            modulus: Modulus
+            result: base ** exponent mod modulus
+        """
+        slot = self._next_slot()
+        self._opcodes[slot] = MOD_POWER
+        self._flags[slot] = OBJECT
+        self._objects[slot] = (base, exponent, result, modulus)
+
+    def _render_expression(self, slot: int) -> str:
+        """Format an expression entry stored in slot."""
+        source, variables, result = self._objects[slot]
+        if self._flags[slot] & BATCH:
+            return f"batch {source} x {variables}"
+        result = _display(result)
+        if not variables:
+            return f"{source} = {result}"
+        bindings = ", ".join(f"{name}={_display(value)}" for name, value in variables.items())
+        return f"{source} = {result} ({bindings})"
+
+    def _render(self, slot: int) -> str:
+        """Format the entry stored in slot."""
+        if self._opcodes[slot] == EVALUATE:
+            return self._render_expression(slot)
+        if self._opcodes[slot] == MOD_POWER:
+            base, exponent, result, modulus = map(_display, self._objects[slot])
+            return f"{base} ** {exponent} mod {modulus} = {result}"
+        symbol = SYMBOLS[self._opcodes[slot]]
+        flags = self._flags[slot]
+        if flags & BATCH:
+            return f"batch a {symbol} b x {int(self._a[slot])}"
+        if flags & OBJECT:
+            a, b, result = map(_display, self._objects[slot])
+        else:
+            a = int(self._a[slot]) if flags & A_INT else self._a[slot]
+            b = int(self._b[slot]) if flags & B_INT else self._b[slot]
+            result = (int(self._results[slot]) if flags & RESULT_INT
+                      else self._results[slot])
+        return f"{a} {symbol} {b} = {result}"
+
+    def render(self) -> List[str]:
+        """
+        Render all entries, oldest first.
+
+        Returns:
+            List of calculation strings
+        """
+        return list(self)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        for column in (self._opcodes, self._flags, self._a, self._b, self._results):
+            del column[:]
+        self._objects.clear()
+        self._start = 0
+
+
+class _Shard(OperationHistory):
+    """Per-thread history that tags every entry with a global sequence number."""
+
+    def __init__(self, capacity: Optional[int], sequence: Iterator[int]) -> None:
+        super().__init__(capacity)
+        self.lock = threading.Lock()
+        self._sequence_numbers = array("Q")
+        self._sequence = sequence
+
+    def _next_slot(self) -> int:
+        slot = super()._next_slot()
+        number = next(self._sequence)
+        if slot == len(self._sequence_numbers):
+            self._sequence_numbers.append(number)
+        else:
+            self._sequence_numbers[slot] = number
+        return slot
+
+    def snapshot(self) -> List[Tuple[int, str]]:
+        """Render the shard as (sequence number, entry) pairs, oldest first."""
+        with self.lock:
+            return [(self._sequence_numbers[slot], self._render(slot))
+                    for slot in self._slots()]
+
+    def clear(self) -> None:
+        with self.lock:
+            super().clear()
+            del self._sequence_numbers[:]
+
+
+class ShardedHistory:
+    """
+    Thread-safe operation history built from per-thread shards.
+
+    Each thread records into its own ``OperationHistory`` shard, guarded
+    by a lock that only readers ever contend for. Entries carry a global
+    sequence number, and reading the history merges the shards in that
+    order and keeps the newest ``capacity`` entries.
+    """
+
+    def __init__(self, capacity: Optional[int] = DEFAULT_CAPACITY) -> None:
+        """
+        Initialize an empty history.
+
+        Args:
+            capacity: Maximum number of entries kept per thread and in the
+                merged view, or None for unbounded
+
+        Raises:
+            ValueError: If capacity is not positive
+        """
+        if capacity is not None and capacity <= 0:
+            raise ValueError("History capacity must be positive")
+        self.capacity = capacity
+        # next() on itertools.count is atomic, so threads share one counter
+        self._sequence = itertools.count()
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        """Return the calling thread's shard, creating it on first use."""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard(self.capacity, self._sequence)
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    @property
+    def evicted(self) -> int:
+        """Number of entries evicted from the per-thread shards."""
+        return sum(shard.evicted for shard in self._shards)
+
+    def __len__(self) -> int:
+        total = sum(len(shard) for shard in self._shards)
+        return total if self.capacity is None else min(total, self.capacity)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.render())
+
+    def record(self, opcode: int, a: Any, b: Any, result: Any) -> None:
+        """Record a single operation (see ``OperationHistory.record``)."""
+        shard = self._shard()
+        with shard.lock:
+            shard.record(opcode, a, b, result)
+
+    def record_batch(self, opcode: int, count: int) -> None:
+        """Record a batch of operations (see ``OperationHistory.record_batch``)."""
+        shard = self._shard()
+        with shard.lock:
+            shard.record_batch(opcode, count)
+
+    def record_expression(self, source: str, variables: Dict[str, Any], result: Any) -> None:
+        """Record an expression evaluation (see ``OperationHistory.record_expression``)."""
+        shard = self._shard()
+        with shard.lock:
+            shard.record_expression(source, variables, result)
+
+    def record_expression_batch(self, source: str, count: int) -> None:
+        """Record a batch of evaluations (see ``OperationHistory.record_expression_batch``)."""
+        shard = self._shard()
+        with shard.lock:
+            shard.record_expression_batch(source, count)
+
+    def record_mod_power(self, base: int, exponent: int, modulus: int, result: int) -> None:
+        """Record a modular exponentiation (see ``OperationHistory.record_mod_power``)."""
+        shard = self._shard()
+        with shard.lock:
+            shard.record_mod_power(base, exponent, modulus, result)
+
+    def render(self) -> List[str]:
+        """
+        Render all entries across threads, oldest first.
+
+        Returns:
+            List of calculation strings
+        """
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged = [entry for _, entry in merge(*(shard.snapshot() for shard in shards))]
+        if self.capacity is not None and len(merged) > self.capacity:
+            merged = merged[-self.capacity:]
+        return merged
+
+    def clear(self) -> None:
+        """Remove all entries from every shard."""
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            shard.clear()
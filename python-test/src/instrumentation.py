@@ -0,0 +1,245 @@
+"""
+Pluggable instrumentation for calculator operations.
+
+Operations report to an ``Instrumentation`` object, which keeps
+per-operation counters and latency histograms and forwards a sample of
+operations to subscribed sinks (exporters, the logging sink, ...).
+Instrumentation is disabled by default; while disabled an operation pays
+for a single attribute check.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from time import perf_counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency buckets, in seconds (1us, 2us, 4us, ... ~1s)
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** i for i in range(21))
+
+
+class OperationEvent(NamedTuple):
+    """A single traced operation, as delivered to sinks."""
+    operation: str
+    args: tuple
+    result: Any
+    duration: float
+
+
+Sink = Callable[[OperationEvent], None]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram."""
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, duration: float) -> None:
+        """
+        Record one latency sample.
+
+        Args:
+            duration: Latency in seconds
+        """
+        self.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the histogram state.
+
+        Returns:
+            Dictionary with count, total, mean and max latency and the
+            per-bucket counts keyed by upper bound ("inf" for overflow)
+        """
+        bounds = [str(bound) for bound in LATENCY_BUCKETS] + ["inf"]
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'buckets': dict(zip(bounds, self.buckets)),
+        }
+
+
+class Instrumentation:
+    """
+    Per-operation counters, latency histograms and sampled tracing.
+
+    Callers time an operation only when ``enabled`` is set and then call
+    ``observe``. Every ``1 / sample_rate``-th observed operation is passed
+    to the subscribed sinks as an ``OperationEvent``.
+    """
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 0.0) -> None:
+        """
+        Initialize instrumentation.
+
+        Args:
+            enabled: Whether operations are counted and timed
+            sample_rate: Fraction of observed operations sent to sinks
+                (0 disables tracing, 1 traces every operation)
+        """
+        self.enabled = enabled
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._sinks: List[Sink] = []
+        self._sample_every = 0
+        self._since_sample = 0
+        self.set_sample_rate(sample_rate)
+
+    def enable(self) -> None:
+        """Start counting and timing operations."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop counting and timing operations."""
+        self.enabled = False
+
+    def set_sample_rate(self, sample_rate: float) -> None:
+        """
+        Set the fraction of observed operations sent to sinks.
+
+        Args:
+            sample_rate: Value between 0 and 1
+
+        Raises:
+            ValueError: If sample_rate is outside [0, 1]
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("Sample rate must be between 0 and 1")
+        self._sample_every = round(1 / sample_rate) if sample_rate else 0
+        self._since_sample = 0
+
+    def subscribe(self, sink: Sink) -> None:
+        """
+        Subscribe a sink to sampled operation events.
+
+        Args:
+            sink: Callable receiving an OperationEvent
+        """
+        self._sinks.append(sink)
+
+    def unsubscribe(self, sink: Sink) -> None:
+        """
+        Remove a previously subscribed sink.
+
+        Args:
+            sink: Sink to remove
+        """
+        self._sinks.remove(sink)
+
+    def observe(self, operation: str, start: float, args: tuple, result: Any = None) -> None:
+        """
+        Record a completed operation.
+
+        Args:
+            operation: Operation name (e.g. "add", "factorial")
+            start: ``perf_counter()`` value taken before the operation
+            args: Operation arguments
+            result: Operation result
+        """
+        duration = perf_counter() - start
+        self.counters[operation] += 1
+        histogram = self.histograms.get(operation)
+        if histogram is None:
+            histogram = self.histograms[operation] = LatencyHistogram()
+        histogram.observe(duration)
+
+        if self._sample_every:
+            self._since_sample += 1
+            if self._since_sample >= self._sample_every:
+                self._since_sample = 0
+                event = OperationEvent(operation, args, result, duration)
+                for sink in self._sinks:
+                    sink(event)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get counters and histograms for export.
+
+        Returns:
+            Dictionary with 'counters' and 'latency' per operation
+        """
+        return {
+            'counters': dict(self.counters),
+            'latency': {name: histogram.snapshot()
+                        for name, histogram in self.histograms.items()},
+        }
+
+    def reset(self) -> None:
+        """Clear all counters and histograms."""
+        self.counters.clear()
+        self.histograms.clear()
+        self._since_sample = 0
+
+
+class LoggingSink:
+    """Sink that writes operation events in the calculator's log format."""
+
+    # operation -> (format, whether the result is part of the message)
+    FORMATS = {
+        'add': ("Addition: %s + %s = %s", True),
+        'subtract': ("Subtraction: %s - %s = %s", True),
+        'multiply': ("Multiplication: %s * %s = %s", True),
+        'divide': ("Division: %s / %s = %s", True),
+        'power': ("Power: %s ** %s = %s", True),
+        'mod_power': ("Modular power: %s ** %s mod %s = %s", True),
+        'add_many': ("Batch addition: %s operations", False),
+        'subtract_many': ("Batch subtraction: %s operations", False),
+        'multiply_many': ("Batch multiplication: %s operations", False),
+        'divide_many': ("Batch division: %s operations", False),
+        'power_many': ("Batch power: %s operations", False),
+        'evaluate': ("Evaluation: %s = %s", True),
+        'evaluate_many': ("Batch evaluation: %s x %s", False),
+        'factorial': ("Factorial: %s! computed", False),
+        'fibonacci': ("Generated Fibonacci sequence with %s terms", False),
+        'fibonacci_nth': ("Fibonacci: computed F(%s)", False),
+        'factorial_mod': ("Factorial: %s! mod %s = %s", True),
+        'fibonacci_mod': ("Fibonacci: F(%s) mod %s = %s", True),
+    }
+
+    def __init__(self, log: Optional[logging.Logger] = None, level: int = logging.INFO) -> None:
+        """
+        Initialize the sink.
+
+        Args:
+            log: Logger to write to (defaults to this module's logger)
+            level: Log level for operation messages
+        """
+        self.log = log or logger
+        self.level = level
+
+    def __call__(self, event: OperationEvent) -> None:
+        """Log one operation event."""
+        if event.operation not in self.FORMATS:
+            self.log.log(self.level, "%s%r = %r", event.operation, event.args, event.result)
+            return
+        fmt, with_result = self.FORMATS[event.operation]
+        if with_result:
+            self.log.log(self.level, fmt, *event.args, event.result)
+        else:
+            self.log.log(self.level, fmt, *event.args)
+
+
+_default = Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    """
+    Get the shared instrumentation used when none is given explicitly.
+
+    Returns:
+        The process-wide default Instrumentation
+    """
+    return _default
@@ -0,0 +1,344 @@
+"""
+Persistent, memory-mapped journal of calculator history.
+
+Every recorded operation is appended to a binary file through an mmap,
+so appends are plain memory writes and the OS writes pages back in the
+background (call ``flush()`` to force them to disk). The journal can be
+replayed into a new history after a restart and compacted when it grows.
+
+File layout (little-endian)::
+
+    header: b"CALCJRN1" | end offset (u64)
+    record: payload length (u32) | opcode (u8) | flags (u8) | payload
+
+Operations whose operands round-trip through doubles store three f64
+values; batches store their count as u64. Anything else (big integers,
+complex numbers, expressions) is stored as a Python literal and read
+back with ``ast.literal_eval``.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import ast
+import mmap
+import os
+import struct
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; its scalars are only normalized if present
+    np = None
+
+try:
+    from . import history as ops
+except ImportError:  # running as a script or with src/ on sys.path
+    import history as ops
+
+MAGIC = b"CALCJRN1"
+_HEADER = struct.Struct("<8sQ")
+_RECORD = struct.Struct("<IBB")
+_VALUES = struct.Struct("<ddd")
+_COUNT = struct.Struct("<Q")
+
+# Opcode of the marker written by clear()
+CLEAR = 255
+
+DEFAULT_INITIAL_SIZE = 1 << 20
+
+
+def _literal(value: Any) -> str:
+    """Encode value as a Python literal that ast.literal_eval can read back."""
+    if np is not None and isinstance(value, np.generic):
+        # NumPy scalars repr as np.float64(1.5), which is not a literal
+        value = value.item()
+    if type(value) is int:
+        # Hex avoids the int-to-decimal-string digit limit for huge integers
+        return hex(value)
+    if type(value) in (float, complex):
+        text = repr(value)
+        # nan and inf are not literals; their display string renders the same
+        return repr(text) if "nan" in text or "inf" in text else text
+    if isinstance(value, (bool, str)) or value is None:
+        return repr(value)
+    if isinstance(value, tuple):
+        return "(" + "".join(_literal(item) + ", " for item in value) + ")"
+    if isinstance(value, dict):
+        items = ", ".join(f"{_literal(k)}: {_literal(v)}" for k, v in value.items())
+        return "{" + items + "}"
+    # Other numeric types are kept as their display string
+    return repr(str(value))
+
+
+class HistoryJournal:
+    """
+    Append-only, memory-mapped journal with replay and compaction.
+
+    The journal offers the same ``record*`` methods as
+    ``OperationHistory`` plus ``clear()``, which appends a marker rather
+    than erasing anything. Appends are serialized with a lock, so one
+    journal can back a thread-safe calculator.
+    """
+
+    def __init__(self, path: str, initial_size: int = DEFAULT_INITIAL_SIZE,
+                 max_records: Optional[int] = None) -> None:
+        """
+        Open or create a journal file.
+
+        Args:
+            path: Journal file path
+            initial_size: Bytes preallocated for a new journal
+            max_records: If set, the journal is compacted to the newest
+                ``max_records`` records once it holds twice as many
+
+        Raises:
+            ValueError: If the file exists but is not a history journal
+        """
+        self.path = str(path)
+        self.max_records = max_records
+        self._initial_size = max(initial_size, _HEADER.size)
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self) -> None:
+        """Map the journal file, initializing it if it is new or empty."""
+        open(self.path, "ab").close()
+        self._file = open(self.path, "r+b")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _HEADER.size:
+            self._file.truncate(self._initial_size)
+            self._map()
+            _HEADER.pack_into(self._mmap, 0, MAGIC, _HEADER.size)
+        else:
+            self._map()
+            magic, _ = _HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                self._close()
+                raise ValueError(f"Not a history journal: {self.path}")
+        self._end = _HEADER.unpack_from(self._mmap, 0)[1]
+        self._count = sum(1 for _ in self._spans())
+
+    def _map(self) -> None:
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+    def _close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "HistoryJournal":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size(self) -> int:
+        """Number of bytes used by the header and records."""
+        return self._end
+
+    def _append(self, opcode: int, flags: int, payload: bytes) -> None:
+        """Append one record and publish the new end offset."""
+        record = _RECORD.pack(len(payload), opcode, flags) + payload
+        with self._lock:
+            end = self._end + len(record)
+            if end > len(self._mmap):
+                self._mmap.close()
+                self._file.truncate(max(2 * end, self._initial_size))
+                self._map()
+            self._mmap[self._end:end] = record
+            _HEADER.pack_into(self._mmap, 0, MAGIC, end)
+            self._end = end
+            self._count += 1
+            compact = self.max_records is not None and self._count >= 2 * self.max_records
+        if compact:
+            self.compact(self.max_records)
+
+    def record(self, opcode: int, a: Any, b: Any, result: Any) -> None:
+        """Append a single operation (see ``OperationHistory.record``)."""
+        flags = ops.value_flags(a, b, result)
+        if flags is not None:
+            self._append(opcode, flags, _VALUES.pack(a, b, result))
+        else:
+            self._append(opcode, ops.OBJECT, _literal((a, b, result)).encode())
+
+    def record_batch(self, opcode: int, count: int) -> None:
+        """Append a batch of operations (see ``OperationHistory.record_batch``)."""
+        self._append(opcode, ops.BATCH, _COUNT.pack(count))
+
+    def record_expression(self, source: str, variables: Dict[str, Any], result: Any) -> None:
+        """Append an expression evaluation (see ``OperationHistory.record_expression``)."""
+        payload = _literal((source, variables, result)).encode()
+        self._append(ops.EVALUATE, ops.OBJECT, payload)
+
+    def record_expression_batch(self, source: str, count: int) -> None:
+        """Append a batch of evaluations (see ``OperationHistory.record_expression_batch``)."""
+        payload = _literal((source, count, None)).encode()
+        self._append(ops.EVALUATE, ops.OBJECT | ops.BATCH, payload)
+
+    def record_mod_power(self, base: int, exponent: int, modulus: int, result: int) -> None:
+        """Append a modular exponentiation (see ``OperationHistory.record_mod_power``)."""
+        payload = _literal((base, exponent, modulus, result)).encode()
+        self._append(ops.MOD_POWER, ops.OBJECT, payload)
+
+    def clear(self) -> None:
+        """Append a marker recording that the history was cleared."""
+        self._append(CLEAR, 0, b"")
+
+    def _spans(self) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) byte offsets of every record."""
+        offset = _HEADER.size
+        while offset < self._end:
+            length = _RECORD.unpack_from(self._mmap, offset)[0]
+            end = offset + _RECORD.size + length
+            yield offset, end
+            offset = end
+
+    def records(self) -> Iterator[Tuple[int, int, Any]]:
+        """
+        Decode all records, oldest first.
+
+        Returns:
+            Iterator of (opcode, flags, values) tuples, where values is
+            (a, b, result) for operations, (source, variables, result) for
+            expressions, (base, exponent, modulus, result) for modular
+            powers, the count for batches and None for clear markers
+        """
+        for start, end in list(self._spans()):
+            _, opcode, flags = _RECORD.unpack_from(self._mmap, start)
+            payload = self._mmap[start + _RECORD.size:end]
+            if opcode == CLEAR:
+                yield opcode, flags, None
+            elif flags & ops.OBJECT:
+                yield opcode, flags, ast.literal_eval(payload.decode())
+            elif flags & ops.BATCH:
+                yield opcode, flags, _COUNT.unpack(payload)[0]
+            else:
+                a, b, result = _VALUES.unpack(payload)
+                yield opcode, flags, (
+                    int(a) if flags & ops.A_INT else a,
+                    int(b) if flags & ops.B_INT else b,
+                    int(result) if flags & ops.RESULT_INT else result,
+                )
+
+    def replay(self, history: Any) -> None:
+        """
+        Re-record the journal into a history, honouring clear markers.
+
+        Args:
+            history: OperationHistory or ShardedHistory to fill
+        """
+        for opcode, flags, values in self.records():
+            if opcode == CLEAR:
+                history.clear()
+            elif opcode == ops.EVALUATE:
+                source, variables, result = values
+                if flags & ops.BATCH:
+                    history.record_expression_batch(source, variables)
+                else:
+                    history.record_expression(source, variables, result)
+            elif opcode == ops.MOD_POWER:
+                history.record_mod_power(*values)
+            elif flags & ops.BATCH:
+                history.record_batch(opcode, values)
+            else:
+                history.record(opcode, *values)
+
+    def compact(self, keep: Optional[int] = None) -> None:
+        """
+        Rewrite the journal without records that replay would discard.
+
+        Records before the last clear marker are dropped, and at most the
+        newest ``keep`` records are kept. The new file replaces the old
+        one atomically.
+
+        Args:
+            keep: Maximum number of records to keep, or None for all
+        """
+        with self._lock:
+            spans = list(self._spans())
+            for index in range(len(spans) - 1, -1, -1):
+                if _RECORD.unpack_from(self._mmap, spans[index][0])[1] == CLEAR:
+                    spans = spans[index + 1:]
+                    break
+            if keep is not None:
+                spans = spans[-keep:] if keep else []
+
+            body = b"".join(self._mmap[start:end] for start, end in spans)
+            end = _HEADER.size + len(body)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, end))
+                f.write(body)
+                f.truncate(max(2 * end, self._initial_size))
+            self._close()
+            os.replace(temp_path, self.path)
+            self._open()
+
+    def flush(self) -> None:
+        """Write pending changes to disk."""
+        with self._lock:
+            self._mmap.flush()
+
+    def close(self) -> None:
+        """Flush and close the journal."""
+        if not self._mmap.closed:
+            self._mmap.flush()
+            self._close()
+
+
+class JournaledHistory:
+    """
+    History that mirrors every recorded entry into a journal.
+
+    Reads (``render``, ``len`` and so on) go to the wrapped in-memory
+    history; ``record*`` and ``clear`` go to both.
+    """
+
+    def __init__(self, history: Any, journal: HistoryJournal) -> None:
+        """
+        Wrap a history.
+
+        Args:
+            history: OperationHistory or ShardedHistory
+            journal: Journal receiving a copy of every entry
+        """
+        self.history = history
+        self.journal = journal
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.history, name)
+
+    def __len__(self) -> int:
+        return len(self.history)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.history)
+
+    def record(self, opcode: int, a: Any, b: Any, result: Any) -> None:
+        self.history.record(opcode, a, b, result)
+        self.journal.record(opcode, a, b, result)
+
+    def record_batch(self, opcode: int, count: int) -> None:
+        self.history.record_batch(opcode, count)
+        self.journal.record_batch(opcode, count)
+
+    def record_expression(self, source: str, variables: Dict[str, Any], result: Any) -> None:
+        self.history.record_expression(source, variables, result)
+        self.journal.record_expression(source, variables, result)
+
+    def record_expression_batch(self, source: str, count: int) -> None:
+        self.history.record_expression_batch(source, count)
+        self.journal.record_expression_batch(source, count)
+
+    def record_mod_power(self, base: int, exponent: int, modulus: int, result: int) -> None:
+        self.history.record_mod_power(base, exponent, modulus, result)
+        self.journal.record_mod_power(base, exponent, modulus, result)
+
+    def render(self) -> List[str]:
+        return self.history.render()
+
+    def clear(self) -> None:
+        self.history.clear()
+        self.journal.clear()
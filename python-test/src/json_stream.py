@@ -0,0 +1,177 @@
+"""
+Incremental JSON reading.
+
+``iter_json_array`` walks a JSON document from a file object, reading it
+in chunks, and yields the items of one nested array (for example the
+``users`` list of a large export) one at a time. Only the current item
+and a small read buffer are ever held in memory; values outside the
+requested path are skipped without being decoded.
+"""
+
+from json import JSONDecodeError, JSONDecoder
+from typing import Any, Iterator, List, Sequence, TextIO, Union
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+class _JSONStream:
+    """Buffered cursor over a JSON text file."""
+
+    def __init__(self, f: TextIO, chunk_size: int) -> None:
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int = 0) -> bool:
+        """Append more text to the buffer, dropping what was consumed."""
+        if self._eof:
+            return False
+        data = self._f.read(max(size, self._chunk_size))
+        if not data:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at the end)."""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume char, which must be the next non-whitespace character."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found or 'end of input'!r}")
+        self._pos += 1
+
+    def decode_value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        extra = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except JSONDecodeError:
+                if not self._fill(extra):
+                    raise
+                extra *= 2
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and not self._eof and self._fill(extra):
+                extra *= 2
+                continue
+            self._pos = end
+            return value
+
+    def skip_value(self) -> None:
+        """Move past the next value without decoding containers."""
+        if self.peek() not in "[{":
+            self.decode_value()
+            return
+
+        depth = 0
+        in_string = escaped = False
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer):
+                char = buffer[pos]
+                pos += 1
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif char == "\\":
+                        escaped = True
+                    elif char == '"':
+                        in_string = False
+                elif char == '"':
+                    in_string = True
+                elif char in "[{":
+                    depth += 1
+                elif char in "]}":
+                    depth -= 1
+                    if depth == 0:
+                        self._pos = pos
+                        return
+            self._pos = pos
+            if not self._fill():
+                raise ValueError("Unexpected end of input")
+
+
+def _split_path(path: Union[str, Sequence[str], None]) -> List[str]:
+    if path is None or path == "":
+        return []
+    if isinstance(path, str):
+        return path.split(".")
+    return list(path)
+
+
+def iter_json_array(f: TextIO, path: Union[str, Sequence[str], None] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yield the items of a nested JSON array one at a time.
+
+    Args:
+        f: Text file object positioned at the start of the document
+        path: Object keys leading to the array, as a dotted string
+            ("data.users") or a sequence of keys; None or "" for a
+            top-level array
+        chunk_size: Number of characters read at a time
+
+    Returns:
+        Iterator over the decoded array items
+
+    Raises:
+        ValueError: If the document is malformed (including after the
+            array), the path does not exist or does not lead to an array
+    """
+    stream = _JSONStream(f, chunk_size)
+    keys = _split_path(path)
+    for key in keys:
+        stream.expect("{")
+        while True:
+            if stream.peek() == "}":
+                raise ValueError(f"Key not found in JSON document: {key!r}")
+            name = stream.decode_value()
+            stream.expect(":")
+            if name == key:
+                break
+            stream.skip_value()
+            if stream.peek() == ",":
+                stream.expect(",")
+
+    stream.expect("[")
+    if stream.peek() != "]":
+        while True:
+            yield stream.decode_value()
+            if stream.peek() == "]":
+                break
+            stream.expect(",")
+    stream.expect("]")
+
+    # Check the rest of the document, so a truncated file is an error
+    # rather than looking like a complete array
+    for _ in keys:
+        while stream.peek() == ",":
+            stream.expect(",")
+            stream.decode_value()
+            stream.expect(":")
+            stream.skip_value()
+        stream.expect("}")
+    if stream.peek():
+        raise ValueError("Unexpected data after the end of the JSON document")
@@ -0,0 +1,263 @@
+"""
+Mergeable approximate quantile sketch.
+
+``KLLSketch`` implements the KLL sketch (Karnin, Lang and Liberty,
+"Optimal Quantile Approximation in Streams", 2016). Items enter a stack
+of compactors. When a level fills up it is sorted and every other item
+(starting at a random offset) is promoted to the next level with twice
+the weight. Level capacities shrink geometrically (by 2/3) towards the
+bottom, so the sketch holds O(k) items no matter how long the stream
+is.
+
+Error bound: for the default k=200 the rank of the value returned for
+quantile q is within about ±1.7% of q·n with 99% probability. The error
+shrinks roughly in proportion to 1/k. Count, min and max are exact.
+
+Sketches with the same k can be merged, for example one per file or
+worker. They round-trip through ``to_dict``/``from_dict``, whose output
+is plain JSON.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import bisect
+import math
+import random
+
+DEFAULT_K = 200
+
+# Capacity ratio between neighbouring levels
+_SHRINK = 2.0 / 3.0
+
+# Smallest level capacity
+_MIN_CAPACITY = 2
+
+
+class KLLSketch:
+    """Approximate quantiles of a stream in bounded memory."""
+
+    def __init__(self, k: int = DEFAULT_K, seed: Optional[int] = None) -> None:
+        """
+        Initialize an empty sketch.
+
+        Args:
+            k: Accuracy parameter; the top level holds k items and the
+                sketch about 3k in total
+            seed: Seed for the compaction coin flips, for reproducibility
+
+        Raises:
+            ValueError: If k is smaller than 8
+        """
+        if k < 8:
+            raise ValueError("Sketch size k must be at least 8")
+        self.k = k
+        self.count = 0
+        self.min: Any = None
+        self.max: Any = None
+        self._levels: List[List[Any]] = [[]]
+        self._random = random.Random(seed)
+        self._size = 0
+        self._limit = self._capacity(0)
+
+    def __len__(self) -> int:
+        """Number of items retained (not the stream length; see ``count``)."""
+        return self._size
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(_MIN_CAPACITY, math.ceil(self.k * _SHRINK ** depth))
+
+    def _grow(self) -> None:
+        self._levels.append([])
+        self._limit = sum(self._capacity(level) for level in range(len(self._levels)))
+
+    def _compress(self) -> None:
+        """Compact full levels until the sketch fits its total capacity."""
+        for level in range(len(self._levels)):
+            items = self._levels[level]
+            if len(items) < self._capacity(level):
+                continue
+            if level + 1 == len(self._levels):
+                self._grow()
+            items.sort()
+            # An odd item out stays at this level
+            leftover = [items.pop()] if len(items) % 2 else []
+            self._levels[level + 1].extend(items[self._random.randrange(2)::2])
+            self._levels[level] = leftover
+            self._size = sum(len(items) for items in self._levels)
+            if self._size < self._limit:
+                return
+
+    def update(self, values: Iterable[Any]) -> "KLLSketch":
+        """
+        Add every number from an iterable.
+
+        Args:
+            values: Numbers to add
+
+        Returns:
+            self, for chaining
+        """
+        for value in values:
+            self.add(value)
+        return self
+
+    def add(self, value: Any) -> None:
+        """Add a single number."""
+        if self.count == 0:
+            self.min = self.max = value
+        elif value < self.min:
+            self.min = value
+        elif value > self.max:
+            self.max = value
+        self.count += 1
+        self._levels[0].append(value)
+        self._size += 1
+        if self._size >= self._limit:
+            self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """
+        Combine another sketch into this one.
+
+        Args:
+            other: Sketch with the same k
+
+        Returns:
+            self, for chaining
+
+        Raises:
+            ValueError: If the sketches have different k
+        """
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={self.k} and k={other.k}")
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.min, self.max = other.min, other.max
+        else:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.count += other.count
+        while len(self._levels) < len(other._levels):
+            self._grow()
+        for level, items in enumerate(other._levels):
+            self._levels[level].extend(items)
+        self._size = sum(len(items) for items in self._levels)
+        while self._size >= self._limit:
+            self._compress()
+        return self
+
+    def _weighted(self) -> tuple:
+        """Sorted retained items and their cumulative weights."""
+        pairs = sorted(
+            (value, 1 << level) for level, items in enumerate(self._levels) for value in items
+        )
+        values = [value for value, _ in pairs]
+        cumulative = []
+        total = 0
+        for _, weight in pairs:
+            total += weight
+            cumulative.append(total)
+        return values, cumulative
+
+    def quantile(self, q: float) -> Any:
+        """
+        Estimate the q-quantile.
+
+        Args:
+            q: Fraction between 0 and 1 (0.5 for the median)
+
+        Returns:
+            A retained value whose rank is approximately q·count; exactly
+            min for q=0 and max for q=1
+
+        Raises:
+            ValueError: If the sketch is empty or q is outside [0, 1]
+        """
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Sequence[float]) -> List[Any]:
+        """
+        Estimate several quantiles with one sort of the retained items.
+
+        Args:
+            qs: Fractions between 0 and 1
+
+        Returns:
+            Estimates in the order of qs
+
+        Raises:
+            ValueError: If the sketch is empty or a q is outside [0, 1]
+        """
+        if self.count == 0:
+            raise ValueError("Quantile of an empty sketch")
+        for q in qs:
+            if not 0 <= q <= 1:
+                raise ValueError(f"Quantile must be between 0 and 1, got {q}")
+        values, cumulative = self._weighted()
+        total = cumulative[-1]
+        results = []
+        for q in qs:
+            if q == 0:
+                results.append(self.min)
+            elif q == 1:
+                results.append(self.max)
+            else:
+                index = bisect.bisect_left(cumulative, q * total)
+                results.append(values[min(index, len(values) - 1)])
+        return results
+
+    def rank(self, value: Any) -> float:
+        """
+        Estimate the fraction of the stream that is <= value.
+
+        Raises:
+            ValueError: If the sketch is empty
+        """
+        if self.count == 0:
+            raise ValueError("Rank in an empty sketch")
+        values, cumulative = self._weighted()
+        index = bisect.bisect_right(values, value)
+        return cumulative[index - 1] / cumulative[-1] if index else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get a JSON-serializable representation of the sketch."""
+        return {
+            'k': self.k,
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'levels': [list(items) for items in self._levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], seed: Optional[int] = None) -> "KLLSketch":
+        """
+        Rebuild a sketch from ``to_dict`` output.
+
+        Args:
+            data: Dictionary produced by ``to_dict``
+            seed: Seed for future compactions
+
+        Returns:
+            New KLLSketch
+
+        Raises:
+            ValueError: If data is not a valid sketch
+        """
+        try:
+            sketch = cls(data['k'], seed)
+            sketch.count = data['count']
+            sketch.min = data['min']
+            sketch.max = data['max']
+            levels = [list(items) for items in data['levels']]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid sketch data: {e}") from e
+        if not levels:
+            raise ValueError("Invalid sketch data: no levels")
+        sketch._levels = [[]]
+        for _ in levels[1:]:
+            sketch._grow()
+        sketch._levels = levels
+        sketch._size = sum(len(items) for items in levels)
+        return sketch
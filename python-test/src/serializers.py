@@ -0,0 +1,147 @@
+"""
+Pluggable JSON serializer backends.
+
+``DataProcessor`` reads and writes JSON through a backend object with
+``dumps(data, pretty)`` and ``loads(data)`` working on UTF-8 bytes. The
+stdlib ``json`` module is always available; ``orjson`` and ``ujson`` are
+used when installed. ``get_backend()`` picks the fastest one present.
+
+Backends differ slightly at the edges: orjson only accepts string keys
+and 64-bit integers, writes NaN and infinity as ``null``, rejects them
+when reading and reads wider integers as floats; older ujson releases
+reject NaN, infinity and wide integers. The fast backends hand such data
+to the stdlib backend, so every backend saves and loads exactly what the
+stdlib does.
+"""
+
+from typing import Any, Dict, List, Optional
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # optional fast backend
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # optional fast backend
+    ujson = None
+
+
+class StdlibJSONBackend:
+    """Serializer using the standard library ``json`` module."""
+
+    name = 'json'
+
+    def dumps(self, data: Any, pretty: bool = True) -> bytes:
+        if pretty:
+            text = json.dumps(data, indent=2, ensure_ascii=False)
+        else:
+            text = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+        return text.encode('utf-8')
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+# A run of 20 digits may be an integer wider than 64 bits
+_WIDE_NUMBER = re.compile(rb'[0-9]{20}')
+
+
+class OrjsonBackend:
+    """Serializer using ``orjson``."""
+
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        self._fallback = StdlibJSONBackend()
+        # Leave types the stdlib cannot encode (datetimes, dataclasses) unsupported
+        self._options = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+                         | orjson.OPT_PASSTHROUGH_SUBCLASS)
+
+    def dumps(self, data: Any, pretty: bool = True) -> bytes:
+        option = self._options | orjson.OPT_INDENT_2 if pretty else self._options
+        try:
+            encoded = orjson.dumps(data, option=option)
+        except TypeError:
+            # Non-string keys, integers wider than 64 bits or unsupported types
+            return self._fallback.dumps(data, pretty)
+        if b'null' in encoded:
+            # Possibly NaN or infinity written as null; None encodes the same
+            return self._fallback.dumps(data, pretty)
+        return encoded
+
+    def loads(self, data: bytes) -> Any:
+        if _WIDE_NUMBER.search(data):
+            # orjson would read the number as a float
+            return self._fallback.loads(data)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN, infinity and out-of-range floats; really invalid data
+            # raises again from the stdlib
+            return self._fallback.loads(data)
+
+
+class UjsonBackend:
+    """Serializer using ``ujson``."""
+
+    name = 'ujson'
+
+    def __init__(self) -> None:
+        self._fallback = StdlibJSONBackend()
+
+    def dumps(self, data: Any, pretty: bool = True) -> bytes:
+        try:
+            text = ujson.dumps(data, indent=2 if pretty else 0, ensure_ascii=False)
+        except (TypeError, OverflowError, ValueError):
+            # Integers wider than 64 bits, NaN, infinity or unsupported types
+            return self._fallback.dumps(data, pretty)
+        return text.encode('utf-8')
+
+    def loads(self, data: bytes) -> Any:
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            # Older releases reject NaN, infinity and wide integers
+            return self._fallback.loads(data)
+
+
+# Backend name -> class, fastest first; only installed libraries are listed
+BACKENDS: Dict[str, type] = {}
+if orjson is not None:
+    BACKENDS['orjson'] = OrjsonBackend
+if ujson is not None:
+    BACKENDS['ujson'] = UjsonBackend
+BACKENDS['json'] = StdlibJSONBackend
+
+
+def available_backends() -> List[str]:
+    """Names of the installed backends, fastest first."""
+    return list(BACKENDS)
+
+
+def get_backend(name: Optional[str] = None) -> Any:
+    """
+    Get a serializer backend.
+
+    Args:
+        name: Backend name ("orjson", "ujson" or "json"), or None for the
+            fastest installed one
+
+    Returns:
+        Backend instance
+
+    Raises:
+        ValueError: If the named backend is unknown or not installed
+    """
+    if name is None:
+        name = next(iter(BACKENDS))
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown or unavailable JSON backend {name!r}; "
+            f"available: {', '.join(BACKENDS)}"
+        ) from None
@@ -0,0 +1,435 @@
+"""
+Single-pass, mergeable summary statistics.
+
+``StreamingStats`` consumes numbers from any iterable and maintains the
+count, sum, min, max, mean and variance in one pass using Welford's
+algorithm, which stays numerically stable where the textbook
+``sum(x**2)/n - mean**2`` formula cancels catastrophically. Partial
+results computed over separate chunks (or threads, or processes) combine
+exactly with ``merge``.
+
+The median needs the values themselves, so they are kept unless
+``keep_values=False``; it is then found by selection in O(n) expected
+time rather than by sorting. For streams too large to keep, attach a
+``KLLSketch`` to get approximate quantiles in bounded memory.
+
+Numbers that are already in a NumPy array or a numeric buffer such as
+``array('d')`` can instead be summarized with vectorized operations by
+``array_summary``, and numbers already in a list or other sized
+collection with C-level builtins by ``sequence_summary``.
+"""
+
+from array import array
+from typing import Any, Collection, Dict, Iterable, List, Optional, Sequence
+import math
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; array_summary is then unavailable
+    np = None
+
+try:
+    from .quantiles import KLLSketch
+except ImportError:  # running as a script or with src/ on sys.path
+    from quantiles import KLLSketch
+
+
+def _partition(values: List[Any], lo: int, hi: int, pivot: Any) -> tuple:
+    """
+    Three-way partition values[lo:hi] around pivot in place.
+
+    Returns:
+        (lt, gt) such that values[lo:lt] < pivot, values[lt:gt] == pivot
+        and values[gt:hi] > pivot
+    """
+    lt, i, gt = lo, lo, hi
+    while i < gt:
+        value = values[i]
+        if value < pivot:
+            values[lt], values[i] = value, values[lt]
+            lt += 1
+            i += 1
+        elif value > pivot:
+            gt -= 1
+            values[gt], values[i] = value, values[gt]
+        else:
+            i += 1
+    return lt, gt
+
+
+def select(values: List[Any], k: int) -> Any:
+    """
+    Return the k-th smallest value (0-based), reordering values in place.
+
+    Uses quickselect with random pivots and three-way partitioning, so
+    runs of equal values do not degrade it. Afterwards every element
+    before index k is <= the result and every element after it is >=.
+
+    Args:
+        values: List to select from; it is partially reordered
+        k: Rank of the value to find
+
+    Returns:
+        The value that would be at index k if values were sorted
+
+    Raises:
+        IndexError: If k is out of range
+    """
+    if not 0 <= k < len(values):
+        raise IndexError("Selection rank out of range")
+    lo, hi = 0, len(values)
+    while True:
+        lt, gt = _partition(values, lo, hi, values[random.randrange(lo, hi)])
+        if k < lt:
+            hi = lt
+        elif k >= gt:
+            lo = gt
+        else:
+            return values[k]
+
+
+def _nearest_rank(q: float, count: int) -> int:
+    """0-based index of the nearest-rank q-quantile among count values."""
+    if not 0 <= q <= 1:
+        raise ValueError(f"Quantile must be between 0 and 1, got {q}")
+    # Rounding first keeps e.g. 0.999 * 1000 from ceiling to 1000
+    return min(count - 1, max(0, math.ceil(round(q * count, 9)) - 1))
+
+
+def median(values: List[Any]) -> Any:
+    """
+    Exact median by selection, reordering values in place.
+
+    Args:
+        values: Non-empty list of numbers
+
+    Returns:
+        The middle value, or the mean of the two middle values
+    """
+    n = len(values)
+    upper = select(values, n // 2)
+    if n % 2:
+        return upper
+    # select() left everything below the upper middle in values[:n // 2]
+    return (max(values[:n // 2]) + upper) / 2
+
+
+class StreamingStats:
+    """Running count, sum, min, max, mean, variance and (optionally) quantiles."""
+
+    def __init__(self, values: Optional[Iterable[Any]] = None, keep_values: bool = True,
+                 sketch: Optional[KLLSketch] = None) -> None:
+        """
+        Initialize the statistics, optionally consuming values.
+
+        Args:
+            values: Numbers to add
+            keep_values: Keep the values so exact quantiles can be
+                computed; False makes memory use constant
+            sketch: Quantile sketch fed with every value, used for
+                quantiles when the values are not kept
+        """
+        self.count = 0
+        self.sum = 0
+        self.min: Any = None
+        self.max: Any = None
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._values: Optional[List[Any]] = [] if keep_values else None
+        self.sketch = sketch
+        if values is not None:
+            self.update(values)
+
+    def update(self, values: Iterable[Any]) -> "StreamingStats":
+        """
+        Add every number from an iterable, in a single pass.
+
+        Args:
+            values: Numbers to add (list, generator, array, column, ...)
+
+        Returns:
+            self, for chaining
+        """
+        count, total, mean, m2 = self.count, self.sum, self.mean, self._m2
+        low, high = self.min, self.max
+        keep = self._values.append if self._values is not None else None
+        sketch = self.sketch.add if self.sketch is not None else None
+        for value in values:
+            count += 1
+            total += value
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+            if low is None:
+                low = high = value
+            elif value < low:
+                low = value
+            elif value > high:
+                high = value
+            if keep is not None:
+                keep(value)
+            if sketch is not None:
+                sketch(value)
+        self.count, self.sum, self.mean, self._m2 = count, total, mean, m2
+        self.min, self.max = low, high
+        return self
+
+    def add(self, value: Any) -> None:
+        """Add a single number."""
+        self.update((value,))
+
+    def merge(self, other: "StreamingStats") -> "StreamingStats":
+        """
+        Combine the statistics of another chunk into this one.
+
+        The result equals what a single pass over both chunks would give
+        (up to floating-point rounding of the mean and variance).
+
+        Args:
+            other: Statistics of another chunk
+
+        Returns:
+            self, for chaining
+        """
+        if other.count == 0:
+            return self
+        if self.sketch is not None:
+            if other.sketch is not None:
+                self.sketch.merge(other.sketch)
+            elif other._values is not None:
+                self.sketch.update(other._values)
+            else:
+                self.sketch = None
+        if self.count == 0:
+            self.mean, self._m2 = other.mean, other._m2
+            self.min, self.max = other.min, other.max
+        else:
+            count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self._m2 += other._m2 + delta * delta * self.count * other.count / count
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.count += other.count
+        self.sum += other.sum
+        if self._values is not None:
+            if other._values is None:
+                self._values = None
+            else:
+                self._values.extend(other._values)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Population variance (0.0 for fewer than two values)."""
+        return self._m2 / self.count if self.count > 1 else 0.0
+
+    @property
+    def sample_variance(self) -> float:
+        """Sample variance with Bessel's correction (0.0 for fewer than two values)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """Population standard deviation."""
+        return math.sqrt(self.variance)
+
+    @property
+    def median(self) -> Any:
+        """
+        Median of the values added so far.
+
+        Exact if the values are kept, otherwise estimated by the sketch.
+
+        Raises:
+            ValueError: If no values were added or neither values nor a
+                sketch are kept
+        """
+        if self.count == 0:
+            raise ValueError("Median of no values")
+        if self._values is not None:
+            return median(self._values)
+        if self.sketch is not None:
+            return self.sketch.quantile(0.5)
+        raise ValueError("Median requires keep_values=True or a sketch")
+
+    def quantile(self, q: float) -> Any:
+        """
+        The q-quantile of the values added so far.
+
+        Exact (the nearest-rank value) if the values are kept, otherwise
+        estimated by the sketch.
+
+        Args:
+            q: Fraction between 0 and 1
+
+        Raises:
+            ValueError: If no values were added, q is outside [0, 1], or
+                neither values nor a sketch are kept
+        """
+        if self.count == 0:
+            raise ValueError("Quantile of no values")
+        rank = _nearest_rank(q, self.count)
+        if self._values is not None:
+            return select(self._values, rank)
+        if self.sketch is not None:
+            return self.sketch.quantile(q)
+        raise ValueError("Quantiles require keep_values=True or a sketch")
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get all statistics as a dictionary.
+
+        Returns:
+            Dictionary with count, sum, mean, min, max, variance, stdev and,
+            when values or a sketch are kept, median; empty if no values
+            were added
+        """
+        if self.count == 0:
+            return {}
+        result = {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            'variance': self.variance,
+            'stdev': self.stdev,
+        }
+        if self._values is not None or self.sketch is not None:
+            result['median'] = self.median
+        return result
+
+
+def as_numeric_array(values: Any) -> Any:
+    """
+    View values as a flat numeric NumPy array without copying, if possible.
+
+    Args:
+        values: Any object
+
+    Returns:
+        A NumPy array sharing memory with values if it is a NumPy array,
+        ``array.array`` or memoryview of numbers (bool, int or float);
+        otherwise None, as well as when NumPy is not installed
+    """
+    if np is None:
+        return None
+    if isinstance(values, np.ndarray):
+        result = values
+    elif isinstance(values, (array, memoryview)):
+        try:
+            result = np.asarray(memoryview(values))
+        except (TypeError, ValueError):
+            return None
+    else:
+        return None
+    if result.dtype.kind not in 'biuf':
+        return None
+    return result.reshape(-1)
+
+
+# Largest sum NumPy accumulates exactly for integer arrays
+_INT64_MAX = 2 ** 63 - 1
+
+
+def array_summary(values: Any, quantiles: Sequence[float] = ()) -> Dict[str, Any]:
+    """
+    Summarize a numeric array with vectorized NumPy operations.
+
+    The median and quantiles come from a single ``np.partition`` of one
+    copy of the data rather than a full sort. Results are Python scalars
+    and match ``StreamingStats(values).summary()``.
+
+    Args:
+        values: NumPy array or numeric buffer (see ``as_numeric_array``)
+        quantiles: Fractions between 0 and 1 to compute (nearest rank)
+
+    Returns:
+        Dictionary with count, sum, mean, min, max, variance, stdev and
+        median, plus 'quantiles' (a list in the order requested) if any
+        were requested; empty if values is empty
+
+    Raises:
+        TypeError: If values cannot be viewed as a numeric array
+        ValueError: If a quantile is outside [0, 1]
+    """
+    data = as_numeric_array(values)
+    if data is None:
+        raise TypeError("array_summary() requires NumPy and a numeric array or buffer")
+    count = data.size
+    if count == 0:
+        return {}
+    if data.dtype.kind == 'b':
+        data = data.view(np.uint8)
+
+    ranks = [_nearest_rank(q, count) for q in quantiles]
+    middle = [count // 2 - 1, count // 2] if count % 2 == 0 else [count // 2]
+    ordered = np.partition(data, sorted(set(middle + ranks)))
+    median_value = ordered[middle].mean() if len(middle) == 2 else ordered[middle[0]]
+
+    low, high = data.min().item(), data.max().item()
+    if data.dtype.kind in 'iu' and max(-low, high) * count > _INT64_MAX:
+        # NumPy's integer sum would wrap around silently; sum exactly instead
+        total = sum(data.tolist())
+        mean = total / count
+    else:
+        total = data.sum().item()
+        mean = float(data.mean())
+
+    variance = float(data.var())
+    result = {
+        'count': count,
+        'sum': total,
+        'mean': mean,
+        'min': low,
+        'max': high,
+        'variance': variance,
+        'stdev': math.sqrt(variance),
+        'median': median_value.item(),
+    }
+    if ranks:
+        result['quantiles'] = [ordered[rank].item() for rank in ranks]
+    return result
+
+
+def sequence_summary(values: Collection[Any], quantiles: Sequence[float] = ()) -> Dict[str, Any]:
+    """
+    Summarize numbers that are already in memory with C-level builtins.
+
+    ``sum``, ``min``, ``max`` and one ``sorted`` run in C, which is
+    several times faster on a list than the per-element Python loop of
+    ``StreamingStats``. The variance is not computed; use
+    ``StreamingStats`` for it.
+
+    Args:
+        values: List, tuple or other sized collection of numbers
+        quantiles: Fractions between 0 and 1 to compute (nearest rank)
+
+    Returns:
+        Dictionary with count, sum, mean, min, max and median, plus
+        'quantiles' (a list in the order requested) if any were
+        requested; empty if values is empty
+
+    Raises:
+        ValueError: If a quantile is outside [0, 1]
+    """
+    count = len(values)
+    if count == 0:
+        return {}
+    ordered = sorted(values)
+    # Sum in input order so float rounding matches a plain loop over values
+    total = sum(values)
+    middle = count // 2
+    result = {
+        'count': count,
+        'sum': total,
+        'mean': total / count,
+        'min': ordered[0],
+        'max': ordered[-1],
+        'median': ordered[middle] if count % 2 else (ordered[middle - 1] + ordered[middle]) / 2,
+    }
+    if quantiles:
+        result['quantiles'] = [ordered[_nearest_rank(q, count)] for q in quantiles]
+    return result
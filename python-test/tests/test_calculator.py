@@ -4,8 +4,19 @@ Tests for the calculator module.
 This demonstrates pytest usage and testing patterns.
 """
 
+import math
+import threading
+
 import pytest
-from src.calculator import Calculator, factorial, fibonacci
+from src import calculator
+from src.cache import ResultCache
+from src.journal import HistoryJournal
+from src.expression import cache_info, compile_expression
+from src.calculator import (
+    Calculator, Instrumentation, LoggingSink, factorial, factorial_mod,
+    fibonacci, fibonacci_mod, fibonacci_nth, get_instrumentation,
+    iter_fibonacci,
+)
 
 
 class TestCalculator:
@@ -80,6 +91,542 @@ class TestCalculator:
         assert len(self.calc.get_history()) == 1
 
 
+class TestCalculatorHistory:
+    """Test class for the bounded, lazily formatted history."""
+    
+    def test_history_format_preserved(self):
+        """Test that rendered entries match the eager string format."""
+        calc = Calculator()
+        calc.add(2, 3)
+        calc.add(2.0, 3)
+        calc.divide(7, 2)
+        calc.power(2, 100)
+        calc.power(-8, 0.5)
+        
+        assert calc.get_history() == [
+            "2 + 3 = 5",
+            "2.0 + 3 = 5.0",
+            "7 / 2 = 3.5",
+            f"2 ** 100 = {2 ** 100}",
+            f"-8 ** 0.5 = {(-8) ** 0.5}",
+        ]
+    
+    def test_history_huge_integers(self):
+        """Test that integers too long to print do not break rendering."""
+        calc = Calculator()
+        calc.power(2, 100000)
+        
+        assert calc.get_history() == ["2 ** 100000 = <100001-bit integer>"]
+    
+    def test_history_evicts_oldest(self):
+        """Test that the history keeps only the newest entries."""
+        calc = Calculator(history_size=3)
+        for i in range(5):
+            calc.add(i, 0)
+        
+        assert calc.get_history() == ["2 + 0 = 2", "3 + 0 = 3", "4 + 0 = 4"]
+        assert calc.history.evicted == 2
+    
+    def test_history_clear_after_wraparound(self):
+        """Test that clearing a wrapped buffer starts from scratch."""
+        calc = Calculator(history_size=2)
+        for i in range(3):
+            calc.power(10, 20 + i)
+        calc.clear_history()
+        calc.add(1, 1)
+        
+        assert calc.get_history() == ["1 + 1 = 2"]
+    
+    def test_unbounded_history(self):
+        """Test that history_size=None never evicts."""
+        calc = Calculator(history_size=None)
+        for i in range(100):
+            calc.multiply(i, 2)
+        
+        assert len(calc.get_history()) == 100
+    
+    def test_invalid_history_size(self):
+        """Test that a non-positive history size is rejected."""
+        with pytest.raises(ValueError, match="capacity must be positive"):
+            Calculator(history_size=0)
+
+
+class TestThreadSafeCalculator:
+    """Test class for the sharded, thread-safe history."""
+    
+    def test_concurrent_operations(self):
+        """Test that every thread's operations are recorded."""
+        calc = Calculator(history_size=None, thread_safe=True)
+        
+        def worker(offset):
+            for i in range(500):
+                calc.add(offset, i)
+        
+        threads = [threading.Thread(target=worker, args=(t * 1000,)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        history = calc.get_history()
+        assert len(history) == 8 * 500
+        assert len(set(history)) == 8 * 500
+    
+    def test_merged_history_keeps_call_order(self):
+        """Test that shards are merged in the order operations happened."""
+        calc = Calculator(thread_safe=True)
+        calc.add(1, 1)
+        thread = threading.Thread(target=calc.multiply, args=(2, 2))
+        thread.start()
+        thread.join()
+        calc.subtract(3, 3)
+        
+        assert calc.get_history() == ["1 + 1 = 2", "2 * 2 = 4", "3 - 3 = 0"]
+    
+    def test_sharded_history_capacity_and_clear(self):
+        """Test that the merged view keeps only the newest entries."""
+        calc = Calculator(history_size=2, thread_safe=True)
+        calc.add(1, 0)
+        thread = threading.Thread(target=calc.add, args=(2, 0))
+        thread.start()
+        thread.join()
+        calc.add(3, 0)
+        
+        assert calc.get_history() == ["2 + 0 = 2", "3 + 0 = 3"]
+        calc.clear_history()
+        assert calc.get_history() == []
+
+
+class TestHistoryJournal:
+    """Test class for the persistent history journal."""
+    
+    def test_history_survives_restart(self, tmp_path):
+        """Test that a new calculator reloads the journaled history."""
+        path = tmp_path / "history.journal"
+        with HistoryJournal(path) as journal:
+            calc = Calculator(journal=journal)
+            calc.add(2, 3)
+            calc.divide(7, 2)
+            calc.power(2, 100000)
+            calc.power(-8, 0.5)
+            calc.power(3, 200, mod=13)
+            calc.add_many([1, 2], [3, 4])
+            calc.evaluate("x * y", x=2, y=3.5)
+            calc.evaluate_many("x + 1", x=[1, 2, 3])
+            expected = calc.get_history()
+        
+        with HistoryJournal(path) as journal:
+            assert Calculator(journal=journal).get_history() == expected
+
+    def test_numpy_scalars_are_replayed(self, tmp_path):
+        """Test that NumPy scalar operands are journaled as plain numbers."""
+        np = pytest.importorskip("numpy")
+        path = tmp_path / "history.journal"
+        with HistoryJournal(path) as journal:
+            calc = Calculator(journal=journal)
+            calc.add(np.float64(1.5), 2)
+            calc.multiply(np.int64(3), 7)
+            calc.evaluate("x * 2", x=np.float32(0.5))
+            expected = calc.get_history()
+
+        with HistoryJournal(path) as journal:
+            assert Calculator(journal=journal).get_history() == expected
+
+    def test_clear_is_replayed(self, tmp_path):
+        """Test that clearing history is recorded and honoured on replay."""
+        path = tmp_path / "history.journal"
+        with HistoryJournal(path) as journal:
+            calc = Calculator(journal=journal)
+            calc.add(1, 1)
+            calc.clear_history()
+            calc.add(2, 2)
+            assert len(journal) == 3
+        
+        with HistoryJournal(path) as journal:
+            assert Calculator(journal=journal).get_history() == ["2 + 2 = 4"]
+    
+    def test_journal_grows_and_compacts(self, tmp_path):
+        """Test growing past the preallocated size and compacting."""
+        path = tmp_path / "history.journal"
+        with HistoryJournal(path, initial_size=64) as journal:
+            calc = Calculator(journal=journal)
+            for i in range(100):
+                calc.add(i, 1)
+            journal.compact(keep=3)
+            assert len(journal) == 3
+        
+        with HistoryJournal(path) as journal:
+            assert Calculator(journal=journal).get_history() == [
+                "97 + 1 = 98", "98 + 1 = 99", "99 + 1 = 100",
+            ]
+    
+    def test_automatic_compaction(self, tmp_path):
+        """Test that max_records bounds the journal."""
+        with HistoryJournal(tmp_path / "history.journal", max_records=10) as journal:
+            calc = Calculator(journal=journal)
+            for i in range(45):
+                calc.multiply(i, 2)
+            assert len(journal) < 20
+    
+    def test_rejects_foreign_file(self, tmp_path):
+        """Test that a file without the journal header is rejected."""
+        path = tmp_path / "not_a_journal"
+        path.write_bytes(b"x" * 64)
+        with pytest.raises(ValueError, match="Not a history journal"):
+            HistoryJournal(path)
+
+
+class TestInstrumentation:
+    """Test class for operation counters, histograms and tracing."""
+    
+    def test_disabled_by_default(self):
+        """Test that nothing is recorded unless instrumentation is enabled."""
+        instrumentation = Instrumentation()
+        calc = Calculator(instrumentation=instrumentation)
+        calc.add(1, 2)
+        
+        assert instrumentation.snapshot() == {'counters': {}, 'latency': {}}
+    
+    def test_counters_and_latency(self):
+        """Test per-operation counters and latency histograms."""
+        instrumentation = Instrumentation(enabled=True)
+        calc = Calculator(instrumentation=instrumentation)
+        calc.add(1, 2)
+        calc.add(3, 4)
+        calc.divide(1, 2)
+        calc.add_many([1, 2], [3, 4])
+        
+        snapshot = instrumentation.snapshot()
+        assert snapshot['counters'] == {'add': 2, 'divide': 1, 'add_many': 1}
+        assert snapshot['latency']['add']['count'] == 2
+        assert sum(snapshot['latency']['add']['buckets'].values()) == 2
+    
+    def test_sampled_tracing(self):
+        """Test that sinks receive every n-th operation."""
+        instrumentation = Instrumentation(enabled=True, sample_rate=0.5)
+        events = []
+        instrumentation.subscribe(events.append)
+        calc = Calculator(instrumentation=instrumentation)
+        for i in range(4):
+            calc.multiply(i, 2)
+        
+        assert [event.args for event in events] == [(1, 2), (3, 2)]
+        assert events[0].operation == "multiply"
+        assert events[0].result == 2
+    
+    def test_invalid_sample_rate(self):
+        """Test that sample rates outside [0, 1] are rejected."""
+        with pytest.raises(ValueError, match="Sample rate"):
+            Instrumentation(sample_rate=2)
+    
+    def test_logging_sink(self, caplog):
+        """Test that the logging sink reproduces the operation log format."""
+        instrumentation = Instrumentation(enabled=True, sample_rate=1.0)
+        instrumentation.subscribe(LoggingSink())
+        calc = Calculator(instrumentation=instrumentation)
+        
+        with caplog.at_level("INFO"):
+            calc.add(5, 3)
+            calc.power(2, 8)
+        
+        assert "Addition: 5 + 3 = 8" in caplog.messages
+        assert "Power: 2 ** 8 = 256" in caplog.messages
+    
+    def test_module_functions_use_shared_instrumentation(self):
+        """Test that factorial and fibonacci report to the shared instance."""
+        instrumentation = get_instrumentation()
+        instrumentation.reset()
+        instrumentation.enable()
+        try:
+            factorial(5)
+            fibonacci(10)
+            counters = instrumentation.snapshot()['counters']
+        finally:
+            instrumentation.disable()
+            instrumentation.reset()
+        
+        assert counters == {'factorial': 1, 'fibonacci': 1}
+
+
+class TestResultCache:
+    """Test class for memoized operation results."""
+    
+    def test_cached_operations_still_recorded(self):
+        """Test that cache hits are counted and still appear in history."""
+        cache = ResultCache(maxsize=8)
+        calc = Calculator(cache=cache)
+        assert calc.power(2, 10) == 1024
+        assert calc.power(2, 10) == 1024
+        assert calc.divide(1, 4) == 0.25
+        
+        assert cache.stats() == {
+            'hits': 1, 'misses': 2, 'evictions': 0, 'expirations': 0, 'size': 2, 'bytes': 0,
+        }
+        assert calc.get_history() == ["2 ** 10 = 1024", "2 ** 10 = 1024", "1 / 4 = 0.25"]
+    
+    def test_cache_keys_include_operand_types(self):
+        """Test that int and float operands are cached separately."""
+        calc = Calculator(cache=ResultCache())
+        calc.add(2, 3)
+        calc.add(2.0, 3)
+        
+        assert calc.get_history() == ["2 + 3 = 5", "2.0 + 3 = 5.0"]
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = ResultCache(maxsize=2)
+        calc = Calculator(cache=cache)
+        calc.multiply(1, 1)
+        calc.multiply(2, 2)
+        calc.multiply(1, 1)  # refresh 1 * 1
+        calc.multiply(3, 3)  # evicts 2 * 2
+        calc.multiply(2, 2)
+        
+        assert cache.stats()['evictions'] == 2
+        assert cache.hits == 1
+    
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL."""
+        now = [0.0]
+        cache = ResultCache(ttl=10, clock=lambda: now[0])
+        calc = Calculator(cache=cache)
+        calc.power(3, 3)
+        now[0] = 5.0
+        calc.power(3, 3)
+        now[0] = 20.0
+        calc.power(3, 3)
+        
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['expirations'] == 1
+    
+    def test_divide_by_zero_not_cached(self):
+        """Test that division by zero raises even with a cache."""
+        calc = Calculator(cache=ResultCache())
+        with pytest.raises(ValueError, match="Cannot divide by zero"):
+            calc.divide(1, 0)
+    
+    def test_invalid_cache_settings(self):
+        """Test that non-positive sizes and TTLs are rejected."""
+        with pytest.raises(ValueError):
+            ResultCache(maxsize=0)
+        with pytest.raises(ValueError):
+            ResultCache(ttl=0)
+
+
+class TestModularArithmetic:
+    """Test class for the modular power, factorial and Fibonacci variants."""
+    
+    def test_mod_power(self):
+        """Test modular exponentiation and its history entry."""
+        calc = Calculator()
+        assert calc.power(3, 200, mod=13) == pow(3, 200, 13)
+        assert calc.power(3, -1, mod=7) == 5
+        assert calc.power(2, 10 ** 12, mod=10 ** 9 + 7) == pow(2, 10 ** 12, 10 ** 9 + 7)
+        
+        assert calc.get_history()[0] == f"3 ** 200 mod 13 = {pow(3, 200, 13)}"
+    
+    def test_mod_power_invalid(self):
+        """Test that modular power rejects unusable operands."""
+        calc = Calculator()
+        with pytest.raises(ValueError, match="integer operands"):
+            calc.power(2.5, 3, mod=7)
+        with pytest.raises(ValueError, match="cannot be zero"):
+            calc.power(2, 3, mod=0)
+    
+    def test_mod_power_cached(self):
+        """Test that modular powers go through the result cache."""
+        cache = ResultCache()
+        calc = Calculator(cache=cache)
+        calc.power(5, 10 ** 6, mod=97)
+        calc.power(5, 10 ** 6, mod=97)
+        assert cache.hits == 1
+    
+    @pytest.mark.parametrize("n", [0, 1, 2, 10, 49, 50, 95, 96, 97, 200])
+    def test_factorial_mod(self, n):
+        """Test factorial mod p on both sides of p / 2 and beyond p."""
+        assert factorial_mod(n, 97) == naive_factorial(n) % 97
+    
+    def test_factorial_mod_invalid(self):
+        """Test factorial mod p input validation."""
+        with pytest.raises(ValueError):
+            factorial_mod(-1, 7)
+        with pytest.raises(ValueError):
+            factorial_mod(5, 1)
+    
+    @pytest.mark.parametrize("n, p", [(3, 4), (6, 8), (5, 9), (2, 561)])
+    def test_factorial_mod_composite(self, n, p):
+        """Test factorial mod p rejects composite moduli."""
+        with pytest.raises(ValueError):
+            factorial_mod(n, p)
+    
+    def test_fibonacci_mod(self):
+        """Test Fibonacci mod m against the exact values."""
+        for n in range(200):
+            assert fibonacci_mod(n, 1000) == fibonacci_nth(n) % 1000
+        assert fibonacci_mod(10 ** 18, 10 ** 9 + 7) == 209783453
+        with pytest.raises(ValueError):
+            fibonacci_mod(5, 0)
+
+
+class TestCalculatorBatch:
+    """Test class for the batch (``*_many``) operations."""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method."""
+        self.calc = Calculator()
+    
+    def test_batch_operations_on_lists(self):
+        """Test batch operations on plain sequences."""
+        assert self.calc.add_many([1, 2, 3], [4, 5, 6]) == [5, 7, 9]
+        assert self.calc.subtract_many([5, 5], [1, 2]) == [4, 3]
+        assert self.calc.multiply_many((2, 3), (4, 5)) == [8, 15]
+        assert self.calc.power_many([2, 3], [3, 2]) == [8, 9]
+    
+    def test_batch_scalar_broadcast(self):
+        """Test that a scalar operand is broadcast across the batch."""
+        assert self.calc.add_many([1, 2, 3], 10) == [11, 12, 13]
+        assert self.calc.power_many(2, [0, 1, 2]) == [1, 2, 4]
+    
+    def test_batch_length_mismatch(self):
+        """Test that sequences of different lengths are rejected."""
+        with pytest.raises(ValueError, match="length mismatch"):
+            self.calc.add_many([1, 2], [1, 2, 3])
+    
+    def test_batch_records_single_history_entry(self):
+        """Test that each batch is recorded as one history entry."""
+        self.calc.add_many(range(1000), range(1000))
+        self.calc.divide_many([1, 2], [1, 0])
+        
+        history = self.calc.get_history()
+        assert history == ["batch a + b x 1000", "batch a / b x 2"]
+    
+    def test_divide_many_zero_mask(self):
+        """Test that division by zero is reported per element."""
+        values, zero_mask = self.calc.divide_many([10, 7, 1], [2, 0, 4])
+        
+        assert zero_mask == [False, True, False]
+        assert values[0] == 5
+        assert math.isnan(values[1])
+        assert values[2] == 0.25
+    
+    def test_batch_numpy_arrays(self):
+        """Test batch operations computed on NumPy arrays."""
+        np = pytest.importorskip("numpy")
+        a = np.array([1.0, 2.0, 3.0])
+        b = np.array([4.0, 0.0, 6.0])
+        
+        assert isinstance(self.calc.add_many(a, b), np.ndarray)
+        assert self.calc.multiply_many(a, b).tolist() == [4.0, 0.0, 18.0]
+        
+        result = self.calc.divide_many(a, b)
+        assert result.zero_mask.tolist() == [False, True, False]
+        assert result.values[0] == 0.25
+        assert np.isnan(result.values[1])
+    
+    def test_batch_numpy_scalars(self):
+        """Test NumPy scalars and 0-d arrays as batch operands."""
+        np = pytest.importorskip("numpy")
+        
+        assert self.calc.add_many(np.int64(2), [1, 2]) == [3, 4]
+        assert self.calc.multiply_many([1, 2], np.float64(0.5)) == [0.5, 1.0]
+        
+        result = self.calc.divide_many(np.array(1.0), 0)
+        assert bool(result.zero_mask) and np.isnan(result.values)
+        assert self.calc.divide_many(np.array(3.0), 2).values == 1.5
+
+
+def naive_factorial(n):
+    """Reference factorial: multiply 2..n one at a time."""
+    result = 1
+    for i in range(2, n + 1):
+        result *= i
+    return result
+
+
+class TestExpressionEvaluation:
+    """Test class for compiled expression evaluation."""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method."""
+        self.calc = Calculator()
+    
+    def test_evaluate(self):
+        """Test evaluating expressions with and without variables."""
+        assert self.calc.evaluate("1 + 2 * 3") == 7
+        assert self.calc.evaluate("(a + b) * c ** 2", a=1, b=2, c=3) == 27
+        assert self.calc.evaluate("-x / 4", x=2) == -0.5
+    
+    def test_evaluate_records_history(self):
+        """Test that evaluations are recorded with their variables."""
+        self.calc.evaluate("x * y", x=2, y=3, unused=9)
+        self.calc.evaluate_many("x + 1", x=[1, 2, 3])
+        
+        assert self.calc.get_history() == ["x * y = 6 (x=2, y=3)", "batch x + 1 x 3"]
+    
+    def test_evaluate_many_bindings_and_columns(self):
+        """Test batch evaluation over rows and over columns."""
+        rows = [{"a": 1, "b": 2}, {"a": 3, "b": 4}]
+        assert self.calc.evaluate_many("a * b", rows) == [2, 12]
+        assert self.calc.evaluate_many("a * b", a=[1, 3], b=[2, 4]) == [2, 12]
+    
+    def test_evaluate_many_numpy_columns(self):
+        """Test that NumPy columns are evaluated in one vectorized call."""
+        np = pytest.importorskip("numpy")
+        result = self.calc.evaluate_many("a * 2 + b", a=np.arange(4), b=1)
+        assert result.tolist() == [1, 3, 5, 7]
+
+    def test_evaluate_many_mixed_numpy_and_list_columns(self):
+        """Test that list columns get array semantics next to NumPy columns."""
+        np = pytest.importorskip("numpy")
+        result = self.calc.evaluate_many("b + c + a", a=np.array([1, 1]), b=[1, 2], c=[3, 4])
+        assert result.tolist() == [5, 7]
+        with pytest.raises(ValueError):
+            self.calc.evaluate_many("b + c + a", a=np.ones(4), b=[1, 2], c=[3, 4])
+        with pytest.raises(ValueError, match="Cannot divide by zero"):
+            self.calc.evaluate_many("a / b", a=np.arange(3), b=[1, 0, 2])
+    
+    def test_evaluate_many_broadcasts_scalars(self):
+        """Test that a scalar column is used for every evaluation."""
+        assert self.calc.evaluate_many("a + b", a=[1, 2], b=5) == [6, 7]
+
+    def test_evaluate_variables_named_like_parameters(self):
+        """Test variables that share a name with evaluate's own parameters."""
+        assert self.calc.evaluate("expr * self", expr=2, self=3) == 6
+        assert self.calc.evaluate_many("bindings + expr", bindings=[1, 2], expr=[3, 4]) == [4, 6]
+
+    def test_expression_cache(self):
+        """Test that repeated expressions reuse the compiled form."""
+        compiled = compile_expression("p + q")
+        hits = cache_info()['hits']
+        self.calc.evaluate("p + q", p=1, q=2)
+        
+        assert compile_expression("p + q") is compiled
+        assert cache_info()['hits'] >= hits + 2
+        assert compiled.variables == ("p", "q")
+    
+    @pytest.mark.parametrize("expr", [
+        "__import__('os')",
+        "x.real",
+        "a if b else c",
+        "'text'",
+        "1 +",
+        "x // 2",
+    ])
+    def test_evaluate_rejects_unsupported_syntax(self, expr):
+        """Test that anything but plain arithmetic is rejected."""
+        with pytest.raises(ValueError):
+            self.calc.evaluate(expr, x=1, a=1, b=1, c=1)
+    
+    def test_evaluate_errors(self):
+        """Test missing variables, division by zero and length mismatches."""
+        with pytest.raises(ValueError, match="Missing value for variable"):
+            self.calc.evaluate("x + y", x=1)
+        with pytest.raises(ValueError, match="Cannot divide by zero"):
+            self.calc.evaluate("1 / x", x=0)
+        with pytest.raises(ValueError, match="length mismatch"):
+            self.calc.evaluate_many("x + y", x=[1, 2], y=[1])
+
+
 class TestFactorial:
     """Test class for factorial function."""
     
@@ -99,6 +646,31 @@ class TestFactorial:
         with pytest.raises(ValueError, match="Factorial is not defined for negative numbers"):
             factorial(-1)
     
+    @pytest.mark.parametrize("n", [0, 1, 2, 255, 256, 257, 1000, 4097])
+    def test_factorial_matches_naive(self, n):
+        """Test the fast factorial against a straightforward product."""
+        assert factorial(n) == naive_factorial(n)
+    
+    def test_large_factorial_matches_naive(self):
+        """Test the product-tree path on a large input."""
+        assert factorial(20000) == naive_factorial(20000)
+    
+    @pytest.mark.parametrize("n", [300, 3001, 20000])
+    def test_parallel_factorial(self, n, monkeypatch):
+        """Test the process-pool product tree against the naive product."""
+        monkeypatch.setattr(calculator, "PARALLEL_FACTORIAL_THRESHOLD", 0)
+        # Split every multiplication across the workers, however small
+        monkeypatch.setattr(calculator, "_PARALLEL_MULTIPLY_BITS", 0)
+        assert factorial(n, parallel=True, max_workers=2) == naive_factorial(n)
+    
+    def test_parallel_factorial_below_threshold(self, monkeypatch):
+        """Test that small inputs never start a process pool."""
+        def fail(*args, **kwargs):
+            raise AssertionError("process pool started")
+        
+        monkeypatch.setattr(calculator, "ProcessPoolExecutor", fail)
+        assert factorial(1000, parallel=True) == naive_factorial(1000)
+    
     @pytest.mark.parametrize("n,expected", [
         (0, 1),
         (1, 1),
@@ -149,6 +721,43 @@ class TestFibonacci:
         # Each number (after the first two) should be sum of previous two
         for i in range(2, len(sequence)):
             assert sequence[i] == sequence[i-1] + sequence[i-2]
+    
+    def test_fibonacci_beyond_cached_prefix(self):
+        """Test that long sequences past the cached prefix stay correct."""
+        sequence = fibonacci(1500)
+        assert len(sequence) == 1500
+        assert sequence[-1] == sequence[-2] + sequence[-3]
+        assert fibonacci(5) == [0, 1, 1, 2, 3]
+    
+    def test_iter_fibonacci(self):
+        """Test the lazy generator form."""
+        assert list(iter_fibonacci(10)) == fibonacci(10)
+        assert list(iter_fibonacci(0)) == []
+        
+        endless = iter_fibonacci()
+        assert [next(endless) for _ in range(5)] == [0, 1, 1, 2, 3]
+    
+    def test_iter_fibonacci_negative_input(self):
+        """Test the generator rejects a negative number of terms."""
+        with pytest.raises(ValueError, match="cannot be negative"):
+            iter_fibonacci(-1)
+    
+    @pytest.mark.parametrize("n", [0, 1, 2, 10, 999, 1000, 1001, 5000])
+    def test_fibonacci_nth(self, n):
+        """Test fast doubling and the cached prefix against the sequence."""
+        *_, expected = iter_fibonacci(n + 1)
+        assert fibonacci_nth(n) == expected
+    
+    def test_fibonacci_nth_large(self):
+        """Test F(n) for a large index via the doubling identity."""
+        n = 100_000
+        f_n, f_n1, f_2n = fibonacci_nth(n), fibonacci_nth(n + 1), fibonacci_nth(2 * n)
+        assert f_2n == f_n * (2 * f_n1 - f_n)
+    
+    def test_fibonacci_nth_negative_input(self):
+        """Test F(n) rejects a negative index."""
+        with pytest.raises(ValueError, match="index cannot be negative"):
+            fibonacci_nth(-1)
 
 
 @pytest.fixture
@@ -0,0 +1,79 @@
+"""
+Throughput benchmarks for the calculator module.
+
+Each benchmark measures ops/sec and retained memory per operation. Run
+``pytest tests/ --benchmark-compare`` to compare them against the
+baselines in benchmarks/baseline.json (see ``benchmark_baseline`` in
+conftest.py), and ``pytest tests/ --benchmark-update`` to record new
+baselines after an intended change.
+"""
+
+import os
+
+import pytest
+from src.calculator import (
+    Calculator, factorial, fibonacci, fibonacci_mod, fibonacci_nth,
+)
+
+
+@pytest.mark.parametrize("operation,a,b", [
+    ("add", 3, 4),
+    ("add", 3.5, 4.25),
+    ("subtract", 10, 4),
+    ("multiply", 6, 7),
+    ("divide", 15, 4),
+    ("power", 2, 64),
+    ("power", 3, 10_000),
+])
+def test_benchmark_scalar_operations(benchmark_baseline, operation, a, b):
+    """Benchmark the scalar Calculator operations."""
+    method = getattr(Calculator(), operation)
+    benchmark_baseline.check(f"calculator.{operation}({a!r}, {b!r})", lambda: method(a, b))
+
+
+@pytest.mark.parametrize("size", [100, 10_000])
+def test_benchmark_batch_operations(benchmark_baseline, size):
+    """Benchmark batch addition and division over lists."""
+    calc = Calculator()
+    a = list(range(size))
+    b = list(range(1, size + 1))
+    benchmark_baseline.check(f"calculator.add_many[{size}]", lambda: calc.add_many(a, b))
+    benchmark_baseline.check(f"calculator.divide_many[{size}]", lambda: calc.divide_many(a, b))
+
+
+def test_benchmark_evaluate(benchmark_baseline):
+    """Benchmark evaluating a cached expression."""
+    calc = Calculator()
+    benchmark_baseline.check(
+        "calculator.evaluate", lambda: calc.evaluate("(a + b) * c ** 2", a=1, b=2, c=3)
+    )
+
+
+@pytest.mark.parametrize("n", [100, 1_000, 20_000])
+def test_benchmark_factorial(benchmark_baseline, n):
+    """Benchmark factorial across input sizes."""
+    benchmark_baseline.check(f"factorial({n})", lambda: factorial(n))
+
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="needs more than one CPU")
+def test_benchmark_parallel_factorial_speedup(benchmark_baseline):
+    """Benchmark factorial on a process pool against the serial product tree."""
+    n = 200_000
+    workers = min(os.cpu_count(), 4)
+    # The speedup depends on the machine's cores, so it is checked against
+    # the serial run rather than a stored baseline
+    serial = benchmark_baseline.measure(lambda: factorial(n), repeat=2, memory_calls=1)
+    parallel = benchmark_baseline.measure(
+        lambda: factorial(n, parallel=True, max_workers=workers), repeat=2, memory_calls=1
+    )
+    if benchmark_baseline.compare:
+        # Pool start-up is included, so demand a clear margin rather than 2x
+        assert parallel['ops_per_sec'] >= 1.2 * serial['ops_per_sec']
+
+
+@pytest.mark.parametrize("n", [100, 5_000])
+def test_benchmark_fibonacci(benchmark_baseline, n):
+    """Benchmark the Fibonacci sequence, n-th term and modular variants."""
+    benchmark_baseline.check(f"fibonacci({n})", lambda: fibonacci(n))
+    benchmark_baseline.check(f"fibonacci_nth({n})", lambda: fibonacci_nth(n))
+    benchmark_baseline.check(f"fibonacci_mod({n})", lambda: fibonacci_mod(n, 1_000_000_007))
@@ -5,10 +5,16 @@ Tests for the data processor module.
 import pytest
 import json
 import csv
+import math
+from datetime import date
 from pathlib import Path
 import tempfile
 import shutil
+from src.cache import FrozenDict, FrozenList, ResultCache, thaw
 from src.data_processor import DataProcessor, create_sample_data
+from src.serializers import available_backends
+from src.quantiles import KLLSketch
+from src.stats import StreamingStats, array_summary, median, select, sequence_summary
 
 
 class TestDataProcessor:
@@ -61,6 +67,330 @@ class TestDataProcessor:
         success = self.processor.save_json(invalid_data, "invalid")
         assert success is False
     
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_json_backends_compact_and_pretty(self, backend):
+        """Test that every backend round-trips data in both modes."""
+        processor = DataProcessor(self.temp_dir, json_backend=backend, pretty_json=False)
+        data = create_sample_data()
+        data["metadata"]["note"] = "naïve café"
+        
+        assert processor.save_json(data, "compact")
+        assert processor.save_json(data, "pretty", pretty=True)
+        compact = Path(self.temp_dir) / "compact.json"
+        pretty = Path(self.temp_dir) / "pretty.json"
+        assert compact.stat().st_size < pretty.stat().st_size
+        assert b"\n" not in compact.read_bytes()
+        
+        assert processor.load_json("compact") == data
+        assert processor.load_json("pretty") == data
+        # Files written by one backend are readable by the others
+        assert self.processor.load_json("compact") == data
+    
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_json_backends_edge_cases(self, backend):
+        """Test values some fast backends cannot encode natively."""
+        import datetime
+        processor = DataProcessor(self.temp_dir, json_backend=backend)
+        
+        assert processor.save_json({"big": 2 ** 80 + 1, "n": [-1, 0.5, None]}, "big")
+        loaded = processor.load_json("big")
+        assert loaded == {"big": 2 ** 80 + 1, "n": [-1, 0.5, None]}
+        assert type(loaded["big"]) is int
+        assert processor.save_json({"nan": float("nan"), "inf": float("inf")}, "special")
+        special = processor.load_json("special")
+        assert math.isnan(special["nan"]) and math.isinf(special["inf"])
+        assert processor.save_json({"date": datetime.datetime.now()}, "invalid") is False
+        
+        (Path(self.temp_dir) / "broken.json").write_text('{"a": ')
+        assert processor.load_json("broken") is None
+    
+    def test_unknown_json_backend(self):
+        """Test that an unknown backend is rejected."""
+        with pytest.raises(ValueError, match="Unknown or unavailable"):
+            DataProcessor(self.temp_dir, json_backend="yaml")
+    
+    def test_load_cache_hits_and_invalidation(self):
+        """Test that unchanged files are served from the cache and changed ones re-read."""
+        cache = ResultCache(maxsize=None, max_bytes=1 << 20)
+        processor = DataProcessor(self.temp_dir, cache=cache)
+        processor.save_json({"version": 1, "items": [1, 2]}, "ref")
+        processor.save_csv([{"a": "1"}], "table")
+        
+        first = processor.load_json("ref")
+        assert processor.load_json("ref") is first
+        assert processor.load_csv("table") == processor.load_csv("table") == [{"a": "1"}]
+        assert (cache.hits, cache.misses) == (2, 2)
+        
+        processor.save_json({"version": 2, "items": []}, "ref")
+        assert processor.load_json("ref") == {"version": 2, "items": []}
+        assert cache.misses == 3
+        
+        loaded = processor.load_many(["ref", "missing"])
+        assert loaded["ref"].value == {"version": 2, "items": []}
+        assert isinstance(loaded["missing"].error, FileNotFoundError)
+        assert cache.hits == 3
+    
+    def test_load_cache_results_are_read_only(self):
+        """Test that callers cannot corrupt cached data."""
+        import copy
+        processor = DataProcessor(self.temp_dir, cache=ResultCache())
+        processor.save_json({"users": [{"name": "a"}]}, "ref")
+        
+        data = processor.load_json("ref")
+        assert isinstance(data, FrozenDict) and isinstance(data["users"], FrozenList)
+        with pytest.raises(TypeError, match="read-only"):
+            data["users"][0]["name"] = "b"
+        with pytest.raises(TypeError):
+            data["users"].append({})
+        with pytest.raises(TypeError):
+            data.update(extra=1)
+        
+        for mutable in (copy.deepcopy(data), thaw(data)):
+            mutable["users"][0]["name"] = "b"
+            assert type(mutable["users"]) is list
+        assert processor.load_json("ref") == {"users": [{"name": "a"}]}
+        assert json.loads(json.dumps(data)) == data
+    
+    def test_load_cache_memory_budget(self):
+        """Test LRU eviction by memory and that oversized files are not cached."""
+        cache = ResultCache(maxsize=None, max_bytes=20_000)
+        processor = DataProcessor(self.temp_dir, cache=cache)
+        for name in ("a", "b", "c"):
+            processor.save_json({"values": list(range(200))}, name)
+        processor.save_json({"values": list(range(5_000))}, "huge")
+        
+        for name in ("a", "b", "a", "c"):
+            processor.load_json(name)
+        assert cache.nbytes <= 20_000
+        assert cache.evictions >= 1
+        processor.load_json("a")
+        assert cache.stats()['hits'] == 2
+        
+        processor.load_json("huge")
+        processor.load_json("huge")
+        assert cache.stats()['misses'] == 5
+    
+    def test_iter_json_nested_array(self):
+        """Test streaming the items of a nested array."""
+        data = create_sample_data()
+        data["metadata"]["tags"] = ["a]", "{b", 'quote " inside']
+        self.processor.save_json(data, "sample")
+        
+        users = self.processor.iter_json("sample", "users", chunk_size=16)
+        assert next(users) == data["users"][0]
+        assert list(users) == data["users"][1:]
+    
+    def test_iter_json_paths(self):
+        """Test top-level arrays, dotted paths and empty arrays."""
+        self.processor.save_json([1, 2.5, {"x": [3]}], "top")
+        self.processor.save_json({"a": {"skip": [[1]], "b": [10, 20]}, "e": []}, "nested")
+        
+        assert list(self.processor.iter_json("top", chunk_size=2)) == [1, 2.5, {"x": [3]}]
+        assert list(self.processor.iter_json("nested", "a.b")) == [10, 20]
+        assert list(self.processor.iter_json("nested", "e")) == []
+    
+    def test_iter_json_large_numbers_across_chunks(self):
+        """Test that numbers split between reads are decoded whole."""
+        numbers = [123456789 * i for i in range(200)]
+        self.processor.save_json({"n": numbers}, "numbers")
+        
+        assert list(self.processor.iter_json("numbers", "n", chunk_size=7)) == numbers
+    
+    def test_iter_json_errors(self):
+        """Test missing files, missing keys and malformed documents."""
+        assert self.processor.iter_json("nonexistent", "users") is None
+        
+        self.processor.save_json({"other": []}, "no_users")
+        with pytest.raises(ValueError, match="Key not found"):
+            list(self.processor.iter_json("no_users", "users"))
+        
+        (Path(self.temp_dir) / "broken.json").write_text('{"users": [1, 2, }')
+        items = self.processor.iter_json("broken", "users")
+        assert [next(items), next(items)] == [1, 2]
+        with pytest.raises(ValueError):
+            next(items)
+        
+        (Path(self.temp_dir) / "truncated.json").write_text('{"users": [1, 2], "more": [')
+        with pytest.raises(ValueError, match="end of input"):
+            list(self.processor.iter_json("truncated", "users"))
+        
+        (Path(self.temp_dir) / "trailing.json").write_text('[1, 2] [3]')
+        with pytest.raises(ValueError, match="after the end"):
+            list(self.processor.iter_json("trailing"))
+    
+    def test_get_rows(self):
+        """Test random access to row ranges through the row index."""
+        rows = [{"id": str(i), "name": f"user {i}"} for i in range(1000)]
+        self.processor.save_csv(rows, "users")
+        
+        assert self.processor.get_rows("users", 500, 503) == rows[500:503]
+        assert self.processor.get_rows("users", -2, 1000) == rows[-2:]
+        assert self.processor.get_rows("users", 990, 5000) == rows[990:]
+        assert self.processor.get_rows("users", 10, 10) == []
+        assert (Path(self.temp_dir) / "users.csv.idx").exists()
+        assert self.processor.get_rows("nonexistent", 0, 1) is None
+    
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_row_index_quoted_newlines(self, monkeypatch, use_numpy):
+        """Test that newlines inside quoted fields do not split rows."""
+        import src.csv_index as csv_index
+        if use_numpy:
+            pytest.importorskip("numpy")
+        else:
+            monkeypatch.setattr(csv_index, "np", None)
+        rows = [{"id": str(i), "text": f'line {i}\n"quoted"\nend' if i % 3 else "plain"}
+                for i in range(30)]
+        self.processor.save_csv(rows, "notes")
+        
+        assert self.processor.build_row_index("notes") == 30
+        assert self.processor.get_rows("notes", 0, 30) == rows
+        assert self.processor.get_rows("notes", 7, 9) == rows[7:9]
+    
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_row_index_skips_empty_lines(self, monkeypatch, use_numpy):
+        """Test that empty lines, which load_csv skips, are not indexed as rows."""
+        import src.csv_index as csv_index
+        if use_numpy:
+            pytest.importorskip("numpy")
+        else:
+            monkeypatch.setattr(csv_index, "np", None)
+        path = Path(self.temp_dir) / "gaps.csv"
+        path.write_bytes(b"a,b\n1,x\n\n2,z\r\n\r\n3,w\n  \n\n")
+        rows = self.processor.load_csv("gaps")
+        
+        assert self.processor.build_row_index("gaps") == len(rows) == 4
+        assert self.processor.get_rows("gaps", 1, 2) == rows[1:2]
+        assert self.processor.get_rows("gaps", -1, 4) == rows[-1:]
+        assert self.processor.get_rows("gaps", 0, 4) == rows
+    
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_row_index_stray_quotes(self, monkeypatch, use_numpy):
+        """Test that quotes inside unquoted fields do not start a quoted field."""
+        import src.csv_index as csv_index
+        if use_numpy:
+            pytest.importorskip("numpy")
+        else:
+            monkeypatch.setattr(csv_index, "np", None)
+        path = Path(self.temp_dir) / "sizes.csv"
+        path.write_bytes(b'name,size\npipe,12"\nbolt,3\nnut,4\n"wa""sher",5\n')
+        rows = self.processor.load_csv("sizes")
+        
+        assert self.processor.build_row_index("sizes") == len(rows) == 4
+        assert self.processor.get_rows("sizes", 0, 4) == rows
+        assert self.processor.get_rows("sizes", 3, 4) == [{"name": 'wa"sher', "size": "5"}]
+    
+    def test_row_index_invalidation(self):
+        """Test that the sidecar is reused while current and rebuilt after changes."""
+        self.processor.save_csv([{"v": str(i)} for i in range(10)], "values")
+        assert self.processor.get_rows("values", 0, 1) == [{"v": "0"}]
+        index_path = Path(self.temp_dir) / "values.csv.idx"
+        built = index_path.stat().st_mtime_ns
+        
+        other = DataProcessor(self.temp_dir)
+        assert other.get_rows("values", 9, 10) == [{"v": "9"}]
+        assert index_path.stat().st_mtime_ns == built
+        
+        self.processor.save_csv([{"v": "new"}], "values")
+        assert other.get_rows("values", 0, 10) == [{"v": "new"}]
+        
+        index_path.write_bytes(b"garbage")
+        assert DataProcessor(self.temp_dir).get_rows("values", -1, 1) == [{"v": "new"}]
+    
+    @pytest.mark.parametrize("codec,magic", [
+        ("gzip", b"\x1f\x8b"), ("bz2", b"BZh"), ("lzma", b"\xfd7zXZ\x00"),
+    ])
+    def test_compressed_files(self, codec, magic):
+        """Test that every format round-trips through each codec."""
+        processor = DataProcessor(self.temp_dir, compression=codec, compression_level=1)
+        data = create_sample_data()
+        rows = [{"k": "a" if i % 2 else "b", "v": str(i)} for i in range(100)]
+        
+        assert processor.save_json(data, "sample")
+        assert processor.save_csv(rows, "rows")
+        extension = {"gzip": ".gz", "bz2": ".bz2", "lzma": ".xz"}[codec]
+        compressed = Path(self.temp_dir) / f"sample.json{extension}"
+        assert compressed.read_bytes().startswith(magic)
+        assert not (Path(self.temp_dir) / "sample.json").exists()
+        
+        # A processor without compression still finds and reads the files
+        for reader in (processor, self.processor):
+            assert reader.load_json("sample") == data
+            assert reader.load_csv("rows") == rows
+            assert list(reader.iter_json("sample", "users")) == data["users"]
+            assert list(reader.iter_csv("rows")) == rows
+        assert list(processor.load_csv_columns("rows", use_numpy=False)["v"]) == list(range(100))
+        assert processor.group_by("rows", "k", {"v": "sum"})["a"]["v"]["sum"] == 2500
+        assert processor.load_many(["sample"])["sample"].value == data
+        assert processor.get_rows("rows", 0, 1) is None
+    
+    def test_compression_detected_from_magic_bytes(self):
+        """Test that compressed content is detected regardless of the file name."""
+        import gzip
+        (Path(self.temp_dir) / "disguised.json").write_bytes(gzip.compress(b'{"a": [1, 2]}'))
+        
+        assert self.processor.load_json("disguised") == {"a": [1, 2]}
+        with pytest.raises(ValueError, match="Unknown compression"):
+            DataProcessor(self.temp_dir, compression="zip")
+    
+    def test_compression_level(self):
+        """Test that the compression level is applied."""
+        data = {"values": [i % 97 for i in range(20_000)]}
+        sizes = {}
+        for level in (1, 9):
+            processor = DataProcessor(self.temp_dir, compression="gzip", compression_level=level)
+            processor.save_json(data, f"level{level}")
+            sizes[level] = (Path(self.temp_dir) / f"level{level}.json.gz").stat().st_size
+            assert processor.load_json(f"level{level}") == data
+        assert sizes[9] < sizes[1]
+    
+    def test_save_many_and_load_many_json(self):
+        """Test bulk JSON saving and loading with per-file results."""
+        items = {f"record_{i}": {"id": i, "values": list(range(i))} for i in range(50)}
+        
+        saved = self.processor.save_many(items, max_workers=4)
+        assert set(saved) == set(items)
+        assert all(result.ok for result in saved.values())
+        assert saved["record_3"].value == Path(self.temp_dir) / "record_3.json"
+        
+        loaded = self.processor.load_many(list(items) + ["missing"], max_workers=4)
+        assert {name: result.value for name, result in loaded.items() if result.ok} == items
+        assert isinstance(loaded["missing"].error, FileNotFoundError)
+        assert loaded["missing"].value is None
+    
+    def test_save_many_and_load_many_csv(self):
+        """Test bulk CSV saving and loading with per-file errors."""
+        items = {
+            "a": [{"x": "1", "y": "2"}],
+            "b": [{"x": "3", "y": "4"}, {"x": "5", "y": "6"}],
+            "empty": [],
+        }
+        
+        saved = self.processor.save_many(items, file_format="csv")
+        assert saved["a"].ok and saved["b"].ok
+        assert isinstance(saved["empty"].error, ValueError)
+        assert not (Path(self.temp_dir) / "empty.csv").exists()
+        
+        loaded = self.processor.load_many(["a", "b"], file_format="csv")
+        assert loaded["b"].value == items["b"]
+        
+        with pytest.raises(ValueError, match="Unsupported file format"):
+            self.processor.load_many(["a"], file_format="xml")
+    
+    def test_failed_save_is_atomic(self):
+        """Test that a failed write keeps the previous file and no temp files."""
+        import datetime
+        self.processor.save_json({"version": 1}, "config")
+        
+        results = self.processor.save_many({"config": {"when": datetime.datetime.now()}})
+        assert isinstance(results["config"].error, TypeError)
+        assert self.processor.load_json("config") == {"version": 1}
+        
+        rows = [{"a": 1}, {"b": 2}]  # second row has a field not in the header
+        assert self.processor.save_csv([{"a": 0}], "table")
+        assert self.processor.save_csv(rows, "table") is False
+        assert self.processor.load_csv("table") == [{"a": "0"}]
+        assert sorted(p.name for p in Path(self.temp_dir).iterdir()) == ["config.json", "table.csv"]
+    
     def test_save_and_load_csv(self):
         """Test saving and loading CSV data."""
         test_data = [
@@ -87,6 +417,202 @@ class TestDataProcessor:
         result = self.processor.load_csv("nonexistent")
         assert result is None
     
+    def test_iter_csv_rows(self):
+        """Test lazily iterating over CSV rows."""
+        test_data = [{"id": str(i), "name": f"User{i}"} for i in range(5)]
+        self.processor.save_csv(test_data, "rows")
+        
+        rows = self.processor.iter_csv("rows")
+        assert next(rows) == test_data[0]
+        assert list(rows) == test_data[1:]
+    
+    def test_iter_csv_chunks(self):
+        """Test iterating over a CSV file in fixed-size chunks."""
+        test_data = [{"id": str(i)} for i in range(7)]
+        self.processor.save_csv(test_data, "chunks")
+        
+        chunks = list(self.processor.iter_csv("chunks", chunk_size=3))
+        assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+        assert [row for chunk in chunks for row in chunk] == test_data
+    
+    def test_iter_csv_nonexistent(self):
+        """Test that a missing file is reported like load_csv does."""
+        assert self.processor.iter_csv("nonexistent") is None
+    
+    def test_iter_csv_read_error_is_raised(self):
+        """Test that a read error mid-file is not mistaken for the end."""
+        path = Path(self.temp_dir) / "bad_bytes.csv"
+        path.write_bytes(b"id\n1\n2\n\xff\n3\n")
+        
+        rows = self.processor.iter_csv("bad_bytes")
+        with pytest.raises(UnicodeDecodeError):
+            list(rows)
+    
+    def test_iter_csv_invalid_chunk_size(self):
+        """Test that a non-positive chunk size is rejected."""
+        with pytest.raises(ValueError, match="chunk_size"):
+            self.processor.iter_csv("rows", chunk_size=0)
+    
+    def test_load_csv_columns_inferred(self):
+        """Test loading typed columns with an inferred schema."""
+        test_data = [
+            {"id": 1, "score": 2.5, "active": True, "joined": "2024-01-31", "name": "Alice"},
+            {"id": 2, "score": "", "active": False, "joined": "2024-02-29", "name": "Bob"},
+        ]
+        self.processor.save_csv(test_data, "typed")
+        
+        table = self.processor.load_csv_columns("typed", use_numpy=False)
+        assert table.schema == {
+            "id": "int", "score": "float", "active": "bool", "joined": "date", "name": "str",
+        }
+        assert table["id"].typecode == "q"
+        assert list(table["id"]) == [1, 2]
+        assert table["score"][0] == 2.5 and math.isnan(table["score"][1])
+        assert table.to_rows()[1]["joined"] == date(2024, 2, 29)
+        assert table.to_rows()[0]["active"] is True
+    
+    def test_load_csv_columns_explicit_schema(self):
+        """Test that an explicit schema overrides inference."""
+        self.processor.save_csv([{"code": 7}, {"code": 42}], "codes")
+        
+        table = self.processor.load_csv_columns("codes", schema={"code": "str"})
+        assert table["code"] == ["7", "42"]
+    
+    def test_load_csv_columns_short_row(self):
+        """Test that cells missing from a short row load as empty values."""
+        (Path(self.temp_dir) / "short.csv").write_text("a,b,c\n1,2.5,x\n3\n")
+        
+        table = self.processor.load_csv_columns("short", use_numpy=False)
+        assert table.schema == {"a": "int", "b": "float", "c": "str"}
+        assert table["b"][0] == 2.5 and math.isnan(table["b"][1])
+        assert table["c"] == ["x", ""]
+    
+    def test_load_csv_columns_invalid(self):
+        """Test that values not matching the schema are reported as None."""
+        self.processor.save_csv([{"n": "x"}], "bad")
+        assert self.processor.load_csv_columns("bad", schema={"n": "int"}) is None
+        assert self.processor.load_csv_columns("nonexistent") is None
+    
+    def test_load_csv_columns_read_error(self):
+        """Test that a read error mid-file fails the load like load_csv."""
+        rows = b"".join(b"%d\n" % i for i in range(5000))
+        (Path(self.temp_dir) / "bad_bytes.csv").write_bytes(b"n\n" + rows + b"\xff\n" + rows)
+        
+        assert self.processor.load_csv("bad_bytes") is None
+        assert self.processor.load_csv_columns("bad_bytes") is None
+        assert self.processor.load_csv_columns("bad_bytes", schema={"n": "int"}) is None
+    
+    def test_load_csv_columns_to_analyze_numbers(self):
+        """Test passing a typed column straight to analyze_numbers."""
+        self.processor.save_csv([{"v": v} for v in [3, 1, 2]], "values")
+        
+        table = self.processor.load_csv_columns("values", use_numpy=False)
+        assert table.nbytes == 3 * 8
+        assert self.processor.analyze_numbers(table["v"])["median"] == 2
+    
+    @pytest.mark.parametrize("use_numpy", [False, True])
+    def test_save_and_load_columnar(self, use_numpy):
+        """Test the binary columnar round trip from CSV columns."""
+        if use_numpy:
+            pytest.importorskip("numpy")
+        rows = [{"id": i, "score": i / 4, "active": i % 2 == 0,
+                 "day": f"2024-01-{i % 28 + 1:02d}", "name": f"naïve {i}" * (i % 3)}
+                for i in range(100)]
+        self.processor.save_csv(rows, "people")
+        table = self.processor.load_csv_columns("people", use_numpy=use_numpy)
+        
+        assert self.processor.save_columnar(table, "people")
+        loaded = self.processor.load_columnar("people", use_numpy=use_numpy)
+        assert loaded.schema == table.schema
+        assert loaded.to_rows() == table.to_rows()
+        assert loaded["name"][-2:] == ["naïve 98naïve 98", ""]
+        assert self.processor.analyze_numbers(loaded["score"])["max"] == 24.75
+    
+    def test_load_columnar_is_zero_copy(self):
+        """Test that numeric columns are aligned, read-only views of the file."""
+        from array import array
+        from src.columnar import ALIGNMENT, ColumnTable
+        table = ColumnTable({"v": "float", "n": "int"},
+                            {"v": array("d", [1.5, 2.5, 3.5]), "n": array("q", [1, 2, 3])})
+        self.processor.save_columnar(table, "values")
+        
+        loaded = self.processor.load_columnar("values", use_numpy=False)
+        column = loaded["v"]
+        assert isinstance(column, memoryview) and column.readonly
+        assert column.tolist() == [1.5, 2.5, 3.5]
+        assert list(loaded["n"]) == [1, 2, 3]
+        raw = (Path(self.temp_dir) / "values.col").read_bytes()
+        for name in ("v", "n"):
+            data = loaded[name].tobytes()
+            assert raw.index(data) % ALIGNMENT == 0
+        
+        np = pytest.importorskip("numpy")
+        values = self.processor.load_columnar("values", use_numpy=True)["v"]
+        assert not values.flags.writeable and not values.flags.owndata
+        assert values.sum() == 7.5
+    
+    def test_load_columnar_errors(self):
+        """Test missing and invalid columnar files."""
+        assert self.processor.load_columnar("nonexistent") is None
+        (Path(self.temp_dir) / "bad.col").write_bytes(b"not a columnar file at all")
+        assert self.processor.load_columnar("bad") is None
+    
+    def test_load_csv_columns_numpy(self):
+        """Test that columns become NumPy arrays when requested."""
+        np = pytest.importorskip("numpy")
+        self.processor.save_csv([{"v": 1.5, "d": "2020-01-01"}], "np_values")
+        
+        table = self.processor.load_csv_columns("np_values", use_numpy=True)
+        assert table["v"].dtype == np.float64
+        assert table["d"][0] == np.datetime64("2020-01-01")
+        assert table.to_rows() == [{"v": 1.5, "d": date(2020, 1, 1)}]
+    
+    def test_group_by(self):
+        """Test grouping with exact and sketch-based aggregations."""
+        rows = [{"dept": "a" if i % 3 else "b", "level": i % 2, "salary": i, "bonus": ""}
+                for i in range(300)]
+        self.processor.save_csv(rows, "staff")
+        
+        result = self.processor.group_by("staff", "dept", {
+            "salary": ["count", "sum", "min", "max", "mean", "median", "p90"],
+            "bonus": "count",
+        })
+        a_salaries = [i for i in range(300) if i % 3]
+        assert set(result) == {"a", "b"}
+        assert result["a"]["salary"]["count"] == len(a_salaries)
+        assert result["a"]["salary"]["sum"] == sum(a_salaries)
+        assert (result["b"]["salary"]["min"], result["b"]["salary"]["max"]) == (0, 297)
+        assert result["a"]["salary"]["mean"] == pytest.approx(sum(a_salaries) / len(a_salaries))
+        assert abs(result["a"]["salary"]["median"] - 150) <= 6
+        assert result["b"]["bonus"] == {"count": 0}
+        
+        by_two = self.processor.group_by("staff", ["dept", "level"], {"salary": "count"})
+        assert by_two[("b", "1")]["salary"]["count"] == 50
+    
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_group_by_chunks(self, max_workers):
+        """Test that tiny byte ranges, serial or in a process pool, lose no rows."""
+        rows = [{"k": f"g{i % 4}", "v": i * 0.5, "note": "x, \"y\""} for i in range(200)]
+        self.processor.save_csv(rows, "chunks")
+        
+        result = self.processor.group_by("chunks", "k", {"v": ["count", "sum", "variance"]},
+                                         max_workers=max_workers, chunk_bytes=97)
+        whole = self.processor.group_by("chunks", "k", {"v": ["count", "sum", "variance"]})
+        assert sum(group["v"]["count"] for group in result.values()) == 200
+        for key, group in whole.items():
+            assert result[key]["v"]["count"] == group["v"]["count"]
+            assert result[key]["v"]["sum"] == pytest.approx(group["v"]["sum"])
+            assert result[key]["v"]["variance"] == pytest.approx(group["v"]["variance"])
+    
+    def test_group_by_errors(self):
+        """Test missing files, unknown columns and unknown aggregations."""
+        self.processor.save_csv([{"k": "a", "v": 1}], "small")
+        
+        assert self.processor.group_by("nonexistent", "k", {"v": "sum"}) is None
+        assert self.processor.group_by("small", "missing", {"v": "sum"}) is None
+        assert self.processor.group_by("small", "k", {"v": "mode"}) is None
+        assert self.processor.group_by("small", "k", {"v": "p101"}) is None
+    
     def test_analyze_numbers_basic(self):
         """Test basic number analysis."""
         numbers = [1, 2, 3, 4, 5]
@@ -110,6 +636,84 @@ class TestDataProcessor:
         
         assert result['median'] == 2.5  # (2 + 3) / 2
     
+    def test_analyze_numbers_iterable(self):
+        """Test analyzing a generator without materializing it first."""
+        result = self.processor.analyze_numbers(x * 0.5 for x in range(10, 0, -1))
+        
+        assert result['count'] == 10
+        assert result['sum'] == 27.5
+        assert result['min'] == 0.5 and result['max'] == 5.0
+        assert result['median'] == 2.75
+        assert self.processor.analyze_numbers(iter([])) == {}
+    
+    def test_analyze_numbers_percentiles(self):
+        """Test exact and sketch-based percentiles."""
+        numbers = list(range(1, 1001))
+        
+        exact = self.processor.analyze_numbers(numbers, percentiles=(50, 90, 99.9))
+        assert (exact['p50'], exact['p90'], exact['p99.9']) == (500, 900, 999)
+        assert exact['median'] == 500.5
+        
+        approx = self.processor.analyze_numbers(iter(numbers), (90,), approximate=True)
+        assert approx['count'] == 1000 and approx['sum'] == 500500
+        assert abs(approx['median'] - 500) <= 30
+        assert abs(approx['p90'] - 900) <= 30
+    
+    @pytest.mark.parametrize("typecode", ["d", "q", "b"])
+    def test_analyze_numbers_vectorized(self, typecode):
+        """Test that arrays and buffers match the pure-Python results."""
+        pytest.importorskip("numpy")
+        from array import array
+        import random
+        rng = random.Random(typecode)
+        values = array(typecode, (rng.randint(-100, 100) for _ in range(1001)))
+        
+        vectorized = self.processor.analyze_numbers(values, percentiles=(10, 99))
+        pure = self.processor.analyze_numbers(list(values), percentiles=(10, 99))
+        assert vectorized.keys() == pure.keys()
+        for key, expected in pure.items():
+            assert math.isclose(vectorized[key], expected), key
+        assert self.processor.analyze_numbers(values[:2]) == self.processor.analyze_numbers(list(values[:2]))
+        assert self.processor.analyze_numbers(array(typecode)) == {}
+    
+    def test_array_summary(self):
+        """Test the NumPy summary against StreamingStats, without copying inputs."""
+        np = pytest.importorskip("numpy")
+        data = np.array([[4.0, 1.0], [3.0, 2.0]])
+        
+        summary = array_summary(data, quantiles=(0.25, 1.0))
+        assert summary.pop('quantiles') == [1.0, 4.0]
+        assert summary == pytest.approx(StreamingStats(data.ravel().tolist()).summary())
+        assert data.tolist() == [[4.0, 1.0], [3.0, 2.0]]
+        with pytest.raises(TypeError):
+            array_summary(["a", "b"])
+    
+    def test_array_summary_integer_overflow(self):
+        """Test that integer sums wider than int64 are exact."""
+        from array import array
+        pytest.importorskip("numpy")
+        values = array('q', [2 ** 62] * 4)
+        
+        summary = self.processor.analyze_numbers(values)
+        assert summary['sum'] == 2 ** 64 and type(summary['sum']) is int
+        assert summary['mean'] == 2.0 ** 62
+        assert array_summary(array('q', [-2 ** 63, -1]))['sum'] == -2 ** 63 - 1
+    
+    def test_sequence_summary(self):
+        """Test the list summary against StreamingStats, leaving the input unsorted."""
+        values = [5, 1, 4, 2, 3, 3]
+        
+        summary = sequence_summary(values, quantiles=(0.0, 0.5, 1.0))
+        assert summary.pop('quantiles') == [1, 3, 5]
+        expected = StreamingStats(values).summary()
+        assert summary == pytest.approx({key: expected[key] for key in summary})
+        assert values == [5, 1, 4, 2, 3, 3]
+        # Floats are summed in input order, like a plain loop
+        assert sequence_summary([0.1, 1e16, -1e16, 0.2, 3.0])['sum'] == 3.2
+        assert sequence_summary(()) == {}
+        with pytest.raises(ValueError):
+            sequence_summary(values, quantiles=(1.5,))
+    
     def test_analyze_empty_numbers(self):
         """Test analyzing empty list of numbers."""
         result = self.processor.analyze_numbers([])
@@ -178,6 +782,114 @@ def test_create_sample_data():
     assert 'active_users' in stats
 
 
+class TestStreamingStats:
+    """Test class for the streaming statistics engine."""
+    
+    def test_matches_two_pass_statistics(self):
+        """Test the single-pass results against the statistics module."""
+        import random
+        import statistics
+        rng = random.Random(7)
+        values = [rng.gauss(1e6, 3.0) for _ in range(1001)]
+        
+        stats = StreamingStats(iter(values))
+        assert stats.count == 1001
+        assert stats.min == min(values) and stats.max == max(values)
+        assert math.isclose(stats.mean, statistics.fmean(values), rel_tol=1e-12)
+        assert math.isclose(stats.variance, statistics.pvariance(values), rel_tol=1e-9)
+        assert math.isclose(stats.sample_variance, statistics.variance(values), rel_tol=1e-9)
+        assert stats.median == statistics.median(values)
+    
+    def test_merge_chunks(self):
+        """Test that merged chunk statistics equal one pass over all data."""
+        values = [5, 1, 9, 3, 3, 8, 2, 7, 6, 4, 0]
+        merged = StreamingStats()
+        for start in range(0, len(values), 3):
+            merged.merge(StreamingStats(values[start:start + 3]))
+        merged.merge(StreamingStats())
+        
+        whole = StreamingStats(values)
+        assert merged.count == whole.count and merged.sum == whole.sum
+        assert (merged.min, merged.max, merged.median) == (0, 9, 4)
+        assert math.isclose(merged.mean, whole.mean)
+        assert math.isclose(merged.variance, whole.variance)
+    
+    def test_without_values(self):
+        """Test constant-memory mode, which has no median."""
+        stats = StreamingStats(range(100), keep_values=False)
+        stats.add(100)
+        
+        assert stats.summary()['mean'] == 50
+        assert 'median' not in stats.summary()
+        with pytest.raises(ValueError):
+            stats.median
+        assert StreamingStats().summary() == {}
+    
+    @pytest.mark.parametrize("values", [
+        [3], [2, 1], [1, 1, 1, 1], [4, 4, 1, 4, 2, 4], list(range(100, 0, -1)),
+    ])
+    def test_select_and_median(self, values):
+        """Test selection against sorting, including repeated values."""
+        ordered = sorted(values)
+        for k in range(len(values)):
+            assert select(list(values), k) == ordered[k]
+        n = len(values)
+        expected = ordered[n // 2] if n % 2 else (ordered[n // 2 - 1] + ordered[n // 2]) / 2
+        assert median(list(values)) == expected
+
+
+class TestKLLSketch:
+    """Test class for the approximate quantile sketch."""
+    
+    @staticmethod
+    def rank_error(ordered, value, q):
+        import bisect
+        return abs(bisect.bisect_left(ordered, value) / len(ordered) - q)
+    
+    def test_quantiles_within_error_bound(self):
+        """Test that estimates stay within the documented rank error."""
+        import random
+        rng = random.Random(1)
+        values = [rng.expovariate(1.0) for _ in range(50_000)]
+        ordered = sorted(values)
+        
+        sketch = KLLSketch(seed=3).update(values)
+        assert sketch.count == 50_000 and len(sketch) < 4 * sketch.k
+        assert sketch.quantile(0) == ordered[0] and sketch.quantile(1) == ordered[-1]
+        for q, value in zip((0.1, 0.5, 0.9, 0.99), sketch.quantiles((0.1, 0.5, 0.9, 0.99))):
+            assert self.rank_error(ordered, value, q) < 0.017
+        assert abs(sketch.rank(ordered[25_000]) - 0.5) < 0.017
+    
+    def test_merge_and_serialize(self):
+        """Test combining per-chunk sketches, including through JSON."""
+        values = list(range(20_000))
+        chunks = [KLLSketch(seed=i).update(values[i::4]) for i in range(4)]
+        restored = [KLLSketch.from_dict(json.loads(json.dumps(c.to_dict()))) for c in chunks]
+        
+        merged = KLLSketch()
+        for sketch in restored:
+            merged.merge(sketch)
+        assert (merged.count, merged.min, merged.max) == (20_000, 0, 19_999)
+        assert self.rank_error(values, merged.quantile(0.5), 0.5) < 0.017
+        
+        with pytest.raises(ValueError, match="different k|k=200 and k=100"):
+            merged.merge(KLLSketch(k=100))
+        with pytest.raises(ValueError):
+            KLLSketch.from_dict({"k": 200})
+    
+    def test_streaming_stats_with_sketch(self):
+        """Test sketch-backed quantiles in constant-memory statistics."""
+        left = StreamingStats(range(500), keep_values=False, sketch=KLLSketch(seed=1))
+        right = StreamingStats(range(500, 1000), keep_values=False, sketch=KLLSketch(seed=2))
+        left.merge(right)
+        
+        assert left.count == 1000
+        assert abs(left.median - 500) <= 20
+        assert abs(left.quantile(0.99) - 990) <= 20
+        with pytest.raises(ValueError):
+            KLLSketch().quantile(0.5)
+
+
 class TestDataProcessorIntegration:
     """Integration tests for DataProcessor."""
     
@@ -0,0 +1,86 @@
+"""
+Throughput benchmarks for the data processor module.
+
+See ``benchmark_baseline`` in conftest.py for how results are compared
+against stored baselines. The compression benchmark also records the
+file size and compression ratio of each codec as test properties, which
+``pytest --junitxml=report.xml`` writes to the report.
+"""
+
+import pytest
+from src.data_processor import DataProcessor
+from src.serializers import available_backends, get_backend
+
+
+@pytest.fixture(scope="module")
+def large_payload():
+    """A payload of 5,000 user records, similar to a large export."""
+    return {
+        "users": [
+            {
+                "id": i,
+                "name": f"User {i}",
+                "email": f"user{i}@example.com",
+                "age": 20 + i % 50,
+                "score": i * 0.37,
+                "active": i % 3 == 0,
+                "tags": ["alpha", "beta", "gamma"][: i % 4],
+            }
+            for i in range(5_000)
+        ],
+        "metadata": {"total_users": 5_000, "version": "1.0"},
+    }
+
+
+@pytest.mark.parametrize("pretty", [False, True], ids=["compact", "pretty"])
+@pytest.mark.parametrize("backend", available_backends())
+def test_benchmark_json_backends(benchmark_baseline, large_payload, backend, pretty):
+    """Benchmark encoding and decoding a large payload with each backend."""
+    serializer = get_backend(backend)
+    encoded = serializer.dumps(large_payload, pretty)
+    mode = "pretty" if pretty else "compact"
+    benchmark_baseline.check(
+        f"json.{backend}.dumps[{mode}]",
+        lambda: serializer.dumps(large_payload, pretty), memory_calls=20,
+    )
+    benchmark_baseline.check(
+        f"json.{backend}.loads[{mode}]",
+        lambda: serializer.loads(encoded), memory_calls=20,
+    )
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_benchmark_save_and_load_json(benchmark_baseline, large_payload, tmp_path, backend):
+    """Benchmark the file round trip through DataProcessor in compact mode."""
+    processor = DataProcessor(str(tmp_path), json_backend=backend, pretty_json=False)
+    benchmark_baseline.check(
+        f"data_processor.save_json[{backend}]",
+        lambda: processor.save_json(large_payload, "large"), memory_calls=20,
+    )
+    benchmark_baseline.check(
+        f"data_processor.load_json[{backend}]",
+        lambda: processor.load_json("large"), memory_calls=20,
+    )
+
+
+@pytest.mark.parametrize("codec", [None, "gzip", "bz2", "lzma"])
+def test_benchmark_compression(benchmark_baseline, large_payload, tmp_path, record_property, codec):
+    """Benchmark compressed save/load speed and record the file size per codec."""
+    processor = DataProcessor(str(tmp_path), json_backend="json", pretty_json=False,
+                              compression=codec)
+    name = codec or "none"
+    benchmark_baseline.check(
+        f"data_processor.save_json[compression={name}]",
+        lambda: processor.save_json(large_payload, "large"), memory_calls=1,
+    )
+    benchmark_baseline.check(
+        f"data_processor.load_json[compression={name}]",
+        lambda: processor.load_json("large"), memory_calls=1,
+    )
+    
+    size = sum(path.stat().st_size for path in tmp_path.iterdir())
+    record_property("file_bytes", size)
+    if codec is not None:
+        plain = len(processor.json_backend.dumps(large_payload, pretty=False))
+        record_property("compression_ratio", round(plain / size, 2))
+        assert size < plain / 2